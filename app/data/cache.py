@@ -0,0 +1,82 @@
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Iterable, Optional, Union
+import pandas as pd
+from app.db.psql.init_data import standardize_data, TRANSFORM_VERSION
+from app.utils.csv_reader import read_and_process_files, BASE_PATH, GTD_FILE, RAND_FILE, GTD_DTYPE_MAPPING
+
+CACHE_DIR = Path(__file__).resolve().parent / "cache"
+CACHE_SUFFIX = ".arrow"
+HASH_BLOCK_SIZE = 1 << 20
+
+def file_hash(path: Union[str, Path]) -> str:
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def cache_key(paths: Iterable[Union[str, Path]]) -> str:
+    digest = hashlib.blake2b(digest_size=16)
+    for path in paths:
+        digest.update(file_hash(path).encode())
+    digest.update(json.dumps(GTD_DTYPE_MAPPING, sort_keys=True).encode())
+    digest.update(str(TRANSFORM_VERSION).encode())
+    return digest.hexdigest()
+
+def cache_path(key: str) -> Path:
+    return CACHE_DIR / f"{key}{CACHE_SUFFIX}"
+
+def read_cache(key: str) -> Optional[pd.DataFrame]:
+    path = cache_path(key)
+    if not path.exists():
+        return None
+    try:
+        from pyarrow import feather
+        return feather.read_table(path, memory_map=True).to_pandas()
+    except ImportError:
+        print("pyarrow is not installed, skipping data cache")
+    except Exception as e:
+        print(f"Error reading data cache {path}: {e}")
+    return None
+
+def write_cache(key: str, df: pd.DataFrame):
+    path = cache_path(key)
+    tmp_path = path.with_suffix('.tmp')
+    try:
+        import pyarrow as pa
+        from pyarrow import feather
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        feather.write_feather(table, tmp_path, compression='uncompressed')
+        os.replace(tmp_path, path)
+    except ImportError:
+        print("pyarrow is not installed, skipping data cache")
+    except Exception as e:
+        print(f"Error writing data cache {path}: {e}")
+        tmp_path.unlink(missing_ok=True)
+
+def evict_stale(key: str):
+    if not CACHE_DIR.exists():
+        return
+    for path in CACHE_DIR.glob(f"*{CACHE_SUFFIX}"):
+        if path.stem != key:
+            print(f"Evicting stale data cache {path.name}")
+            path.unlink(missing_ok=True)
+
+def load_standardized_data(force_rebuild: bool = False, keep_nan: bool = False) -> pd.DataFrame:
+    key = cache_key([BASE_PATH / GTD_FILE, BASE_PATH / RAND_FILE])
+    if not force_rebuild:
+        cached = read_cache(key)
+        if cached is not None:
+            print(f"Loaded {len(cached)} rows from data cache {key}")
+            return cached
+    print("Reading and processing files...")
+    df_gtd, df_rand = read_and_process_files(keep_nan=keep_nan)
+    print("Standardizing data...")
+    df_merged = standardize_data(df_gtd, df_rand)
+    write_cache(key, df_merged)
+    evict_stale(key)
+    return df_merged
@@ -1,6 +1,7 @@
 from pydantic_settings import BaseSettings
 from dotenv import load_dotenv
 import os
+import tempfile
 
 load_dotenv(verbose=True)
 
@@ -11,9 +12,74 @@ class Settings(BaseSettings):
     ES_INDEX_FOR_TERROR: str = os.getenv('ES_INDEX_FOR_TERROR', 'terror_index')
     FETCH_INTERVAL_MINUTES: int = 2
     MAX_ARTICLES_PER_FETCH: int = 100
-    ES_HOST: str = "http://localhost:9200"
-    ES_USER: str = "elastic"
-    ES_PASSWORD: str = "123456"
+    NEWS_API_URL: str = os.getenv('NEWS_API_URL', 'https://eventregistry.org/api/v1/article/getArticles')
+    NEWS_FETCH_PAGES: int = int(os.getenv('NEWS_FETCH_PAGES', 3))
+    NEWS_HTTP_CONCURRENCY: int = int(os.getenv('NEWS_HTTP_CONCURRENCY', 10))
+    NEWS_HTTP_TIMEOUT: float = float(os.getenv('NEWS_HTTP_TIMEOUT', 30))
+    NEWS_HTTP_RETRIES: int = int(os.getenv('NEWS_HTTP_RETRIES', 3))
+    NEWS_HTTP_BACKOFF: float = float(os.getenv('NEWS_HTTP_BACKOFF', 1.0))
+    NEWS_QUEUE_SIZE: int = int(os.getenv('NEWS_QUEUE_SIZE', 200))
+    NEWS_CLASSIFY_CONCURRENCY: int = int(os.getenv('NEWS_CLASSIFY_CONCURRENCY', 4))
+    NEWS_CLASSIFY_BATCH_SIZE: int = int(os.getenv('NEWS_CLASSIFY_BATCH_SIZE', 10))
+    NEWS_CYCLE_BUDGET_SECONDS: float = float(os.getenv('NEWS_CYCLE_BUDGET_SECONDS', 90))
+    NEWS_SCHEDULER_ENABLED: bool = os.getenv('NEWS_SCHEDULER_ENABLED', 'true').lower() == 'true'
+    GROQ_API_URL: str = os.getenv('GROQ_API_URL', 'https://api.groq.com/openai/v1/chat/completions')
+    GROQ_MODEL: str = os.getenv('GROQ_MODEL', 'llama-3.1-8b-instant')
+    NEWS_MEMO_ENABLED: bool = os.getenv('NEWS_MEMO_ENABLED', 'true').lower() == 'true'
+    NEWS_MEMO_PATH: str = os.getenv('NEWS_MEMO_PATH', os.path.join(tempfile.gettempdir(), 'gtd_init', 'news_memo.sqlite'))
+    NEWS_MEMO_MEMORY_SIZE: int = int(os.getenv('NEWS_MEMO_MEMORY_SIZE', 10000))
+    NEWS_MEMO_MAX_ROWS: int = int(os.getenv('NEWS_MEMO_MAX_ROWS', 500000))
+    CLASSIFICATION_MEMO_TTL: float = float(os.getenv('CLASSIFICATION_MEMO_TTL', 7 * 24 * 3600))
+    GEOCODE_MEMO_TTL: float = float(os.getenv('GEOCODE_MEMO_TTL', 30 * 24 * 3600))
+    GEOCODE_NEGATIVE_TTL: float = float(os.getenv('GEOCODE_NEGATIVE_TTL', 24 * 3600))
+    ES_HOST: str = os.getenv('ES_HOST', 'http://localhost:9200')
+    ES_USER: str = os.getenv('ES_USER', 'elastic')
+    ES_PASSWORD: str = os.getenv('ES_PASSWORD', '123456')
+    ES_VERIFY_CERTS: bool = os.getenv('ES_VERIFY_CERTS', 'false').lower() == 'true'
+    ES_CONNECTIONS_PER_NODE: int = int(os.getenv('ES_CONNECTIONS_PER_NODE', 10))
+    ES_REQUEST_TIMEOUT: float = float(os.getenv('ES_REQUEST_TIMEOUT', 30))
+    ES_MAX_RETRIES: int = int(os.getenv('ES_MAX_RETRIES', 3))
+    ES_HTTP_COMPRESS: bool = os.getenv('ES_HTTP_COMPRESS', 'true').lower() == 'true'
+    PSQL_URL: str = os.getenv('PSQL_URL', '')
+    PSQL_POOL_SIZE: int = int(os.getenv('PSQL_POOL_SIZE', 5))
+    PSQL_MAX_OVERFLOW: int = int(os.getenv('PSQL_MAX_OVERFLOW', 10))
+    PSQL_POOL_TIMEOUT: float = float(os.getenv('PSQL_POOL_TIMEOUT', 30))
+    PSQL_POOL_RECYCLE: int = int(os.getenv('PSQL_POOL_RECYCLE', 1800))
+    PSQL_POOL_PRE_PING: bool = os.getenv('PSQL_POOL_PRE_PING', 'true').lower() == 'true'
+    ES_BULK_THREADS: int = int(os.getenv('ES_BULK_THREADS', 4))
+    ES_BULK_CHUNK_SIZE: int = int(os.getenv('ES_BULK_CHUNK_SIZE', 1000))
+    ES_BULK_MAX_BYTES: int = int(os.getenv('ES_BULK_MAX_BYTES', 10 * 1024 * 1024))
+    ES_BULK_MAX_RETRIES: int = int(os.getenv('ES_BULK_MAX_RETRIES', 5))
+    ES_BULK_INITIAL_BACKOFF: float = float(os.getenv('ES_BULK_INITIAL_BACKOFF', 1.0))
+    ES_BULK_MAX_BACKOFF: float = float(os.getenv('ES_BULK_MAX_BACKOFF', 60.0))
+    ES_INDEX_SHARDS: int = int(os.getenv('ES_INDEX_SHARDS', 1))
+    ES_INDEX_REPLICAS: int = int(os.getenv('ES_INDEX_REPLICAS', 1))
+    ES_REFRESH_INTERVAL: str = os.getenv('ES_REFRESH_INTERVAL', '1s')
+    ES_INDEX_VERSIONS_TO_KEEP: int = int(os.getenv('ES_INDEX_VERSIONS_TO_KEEP', 2))
+    ES_FORCEMERGE_TIMEOUT: int = int(os.getenv('ES_FORCEMERGE_TIMEOUT', 600))
+    ES_STREAM_BATCH_SIZE: int = int(os.getenv('ES_STREAM_BATCH_SIZE', 2000))
+    SEED_MODE: str = os.getenv('SEED_MODE', 'bulk')
+    SEED_BATCH_SIZE: int = int(os.getenv('SEED_BATCH_SIZE', 5000))
+    SEED_RESUME: bool = os.getenv('SEED_RESUME', 'false').lower() == 'true'
+    SEED_WORKERS: int = int(os.getenv('SEED_WORKERS', os.cpu_count() or 1))
+    CSV_CHUNK_SIZE: int = int(os.getenv('CSV_CHUNK_SIZE', 50000))
+    SCHEMA_LAYOUT: str = os.getenv('SCHEMA_LAYOUT', 'normalized')
+    DEDUP_ENABLED: bool = os.getenv('DEDUP_ENABLED', 'true').lower() == 'true'
+    DEDUP_THRESHOLD: float = float(os.getenv('DEDUP_THRESHOLD', 0.6))
+    COMPACT_FRAMES: bool = os.getenv('COMPACT_FRAMES', 'true').lower() == 'true'
+    DATA_CACHE_ENABLED: bool = os.getenv('DATA_CACHE_ENABLED', 'true').lower() == 'true'
+    INCREMENTAL_DELETE_MISSING: bool = os.getenv('INCREMENTAL_DELETE_MISSING', 'false').lower() == 'true'
+    REBUILD_DATA_CACHE: bool = os.getenv('REBUILD_DATA_CACHE', 'false').lower() == 'true'
+    ROLLUP_PATH: str = os.getenv('ROLLUP_PATH', os.path.join(tempfile.gettempdir(), 'gtd_init', 'rollup.npz'))
+    ROLLUP_CACHE_SIZE: int = int(os.getenv('ROLLUP_CACHE_SIZE', 256))
+    ROLLUP_CACHE_TTL: float = float(os.getenv('ROLLUP_CACHE_TTL', 300))
+    SPATIAL_INDEX_PATH: str = os.getenv('SPATIAL_INDEX_PATH', os.path.join(tempfile.gettempdir(), 'gtd_init', 'spatial.npz'))
+    SPATIAL_CELL_DEGREES: float = float(os.getenv('SPATIAL_CELL_DEGREES', 0.5))
+    SPATIAL_CLUSTERS_PER_TILE: int = int(os.getenv('SPATIAL_CLUSTERS_PER_TILE', 8))
+    EXPORT_BATCH_SIZE: int = int(os.getenv('EXPORT_BATCH_SIZE', 10000))
+    SEARCH_SLOW_QUERY_MS: float = float(os.getenv('SEARCH_SLOW_QUERY_MS', 250))
+    METRICS_REPORT_DIR: str = os.getenv('METRICS_REPORT_DIR', os.path.join(tempfile.gettempdir(), 'gtd_init', 'reports'))
+    INIT_STATE_DIR: str = os.getenv('INIT_STATE_DIR', os.path.join(tempfile.gettempdir(), 'gtd_init'))
 
     class Config:
         env_file = '.env'
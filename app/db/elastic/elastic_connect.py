@@ -1,7 +1,35 @@
-from elasticsearch import Elasticsearch
+import threading
+from typing import Optional, TYPE_CHECKING
+from app.db.elastic.config import settings
 
-elastic_client = Elasticsearch(
-    "http://localhost:9200",
-    basic_auth=("elastic", "123456"),
-    verify_certs=False
-)
+if TYPE_CHECKING:
+    from elasticsearch import Elasticsearch
+
+_client_lock = threading.Lock()
+_client: Optional['Elasticsearch'] = None
+
+def get_elastic_client() -> 'Elasticsearch':
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                from elasticsearch import Elasticsearch
+                # connections are kept alive per node and reused across requests and bulk threads
+                _client = Elasticsearch(
+                    settings.ES_HOST,
+                    basic_auth=(settings.ES_USER, settings.ES_PASSWORD) if settings.ES_USER else None,
+                    verify_certs=settings.ES_VERIFY_CERTS,
+                    connections_per_node=settings.ES_CONNECTIONS_PER_NODE,
+                    request_timeout=settings.ES_REQUEST_TIMEOUT,
+                    max_retries=settings.ES_MAX_RETRIES,
+                    retry_on_timeout=True,
+                    http_compress=settings.ES_HTTP_COMPRESS
+                )
+    return _client
+
+def reset_elastic_client():
+    global _client
+    with _client_lock:
+        if _client is not None:
+            _client.close()
+        _client = None
@@ -0,0 +1,385 @@
+from dataclasses import dataclass, field
+from typing import Dict, List, Tuple, Any, Optional, Iterable, Callable
+import numpy as np
+import pandas as pd
+from sqlalchemy import Table, insert, select, delete
+from sqlalchemy.orm import Session
+from app.db.psql.models import (
+    AttackType, TargetType, Casualties, Event, Location,
+    City, Country, Region, TerroristGroup
+)
+from app.db.psql.checkpoints import POSTGRES_STAGE, SourceRange, dead_letter_frame, fact_batches, record_batch
+from app.db.psql.database import open_session
+from app.db.psql.fingerprint import add_fingerprints
+from app.db.psql.schema_layout import LOCATION_KEY_COLUMNS, compact_layout
+from app.utils.memory import MemoryReport
+from app.utils.metrics import metrics, timed_stage
+
+FACT_BATCH_SIZE = 5000
+DIMENSION_BATCH_SIZE = 1000
+
+LOCATION_COLUMNS = ['latitude', 'longitude', 'country_id', 'city_id', 'region_id']
+CASUALTIES_COLUMNS = ['killed', 'wounded', 'property_damage', 'property_value']
+EVENT_COLUMNS = [
+    'year', 'month', 'day', 'summary', 'success', 'suicide',
+    'attack_type_id', 'target_type_id', 'group_id',
+    'source_db', 'merged_sources', 'source_key', 'fingerprint'
+]
+
+@dataclass
+class SeedReport:
+    total_rows: int = 0
+    inserted: int = 0
+    failed_rows: List[Tuple[Any, str]] = field(default_factory=list)
+    progress: Optional[Callable[[int, Optional[int]], None]] = field(default=None, repr=False)
+
+    def record_inserted(self, count: int):
+        self.inserted += count
+        metrics.inc('seed_rows_inserted_total', count)
+
+    def record_failures(self, failures: List[Tuple[Any, str]]):
+        self.failed_rows.extend(failures)
+        metrics.inc('seed_rows_failed_total', len(failures))
+
+    def notify_progress(self):
+        if self.progress:
+            self.progress(self.inserted + len(self.failed_rows), self.total_rows)
+
+    def print_summary(self, max_failures: int = 20):
+        print(f"Seeded {self.inserted}/{self.total_rows} rows, {len(self.failed_rows)} failed")
+        for idx, error in self.failed_rows[:max_failures]:
+            print(f"Error processing row {idx}: {error}")
+        if len(self.failed_rows) > max_failures:
+            print(f"... {len(self.failed_rows) - max_failures} more failed rows")
+
+def empty_lookups() -> Dict[str, Dict]:
+    return {
+        'regions': {},
+        'countries': {},
+        'cities': {},
+        'attack_types': {},
+        'target_types': {},
+        'terrorist_groups': {},
+        'locations': {}
+    }
+
+def to_records(df: pd.DataFrame) -> List[Dict[str, Any]]:
+    return df.astype(object).where(df.notna(), None).to_dict('records')
+
+def execute_isolating_failures(
+        session: Session,
+        stmt,
+        rows: List[Dict[str, Any]],
+        positions: List[Any]
+) -> Tuple[List[Tuple[Any, Any]], List[Tuple[Any, str]]]:
+    if not rows:
+        return [], []
+    try:
+        with session.begin_nested():
+            result = session.execute(stmt, rows).all()
+        return list(zip(positions, result)), []
+    except Exception as e:
+        if len(rows) == 1:
+            return [], [(positions[0], str(e).splitlines()[0])]
+        mid = len(rows) // 2
+        left_ok, left_failed = execute_isolating_failures(session, stmt, rows[:mid], positions[:mid])
+        right_ok, right_failed = execute_isolating_failures(session, stmt, rows[mid:], positions[mid:])
+        return left_ok + right_ok, left_failed + right_failed
+
+def _load_existing(session: Session, table: Table, key_columns: List[str], lookup: Dict):
+    columns = [table.c[col] for col in key_columns]
+    for row in session.execute(select(*columns, table.c.id)):
+        lookup[tuple(row[:-1]) if len(key_columns) > 1 else row[0]] = row[-1]
+
+def _resolve_dimension(
+        session: Session,
+        table: Table,
+        key_columns: List[str],
+        candidates: pd.DataFrame,
+        lookup: Dict,
+        report: SeedReport
+):
+    if not lookup:
+        _load_existing(session, table, key_columns, lookup)
+    candidates = candidates.dropna(subset=key_columns).drop_duplicates(subset=key_columns)
+    keys = list(candidates[key_columns].itertuples(index=False, name=None))
+    if len(key_columns) == 1:
+        keys = [key[0] for key in keys]
+    missing = candidates[[key not in lookup for key in keys]]
+    if missing.empty:
+        return
+    returning = [table.c[col] for col in key_columns] + [table.c.id]
+    records = to_records(missing)
+    with_id = [row for row in records if row.get('id') is not None]
+    without_id = [{k: v for k, v in row.items() if k != 'id'} for row in records if row.get('id') is None]
+    for rows in (with_id, without_id):
+        for start in range(0, len(rows), DIMENSION_BATCH_SIZE):
+            chunk = rows[start:start + DIMENSION_BATCH_SIZE]
+            stmt = insert(table).returning(*returning)
+            inserted, failed = execute_isolating_failures(
+                session, stmt, chunk, [f"{table.name}:{row[key_columns[0]]}" for row in chunk]
+            )
+            for _, row in inserted:
+                lookup[tuple(row[:-1]) if len(key_columns) > 1 else row[0]] = row[-1]
+            report.record_failures(failed)
+
+def _map_composite(keys: pd.DataFrame, lookup: Dict[Tuple, int]) -> pd.Series:
+    table = pd.DataFrame(
+        [(*key, value) for key, value in lookup.items()],
+        columns=[*keys.columns, '_id']
+    )
+    for col in keys.columns:
+        if pd.api.types.is_numeric_dtype(keys[col]):
+            table[col] = table[col].astype(keys[col].dtype)
+    merged = keys.merge(table, how='left', on=list(keys.columns))
+    return pd.Series(merged['_id'].to_numpy(), index=keys.index).astype('Int64')
+
+def resolve_locations(session: Session, facts: pd.DataFrame, lookup: Dict, report: SeedReport) -> pd.Series:
+    if not lookup:
+        _load_existing(session, Location.__table__, LOCATION_KEY_COLUMNS, lookup)
+    keys = facts[LOCATION_KEY_COLUMNS]
+    location_ids = _map_composite(keys, lookup)
+    missing = facts.loc[location_ids.isna(), LOCATION_COLUMNS].drop_duplicates(subset=LOCATION_KEY_COLUMNS)
+    errors = {}
+    if len(missing):
+        returning = [Location.__table__.c[col] for col in LOCATION_KEY_COLUMNS] + [Location.__table__.c.id]
+        records = to_records(missing)
+        positions = missing.index.tolist()
+        for start in range(0, len(records), DIMENSION_BATCH_SIZE):
+            inserted, failed = execute_isolating_failures(
+                session,
+                insert(Location.__table__).returning(*returning),
+                records[start:start + DIMENSION_BATCH_SIZE],
+                positions[start:start + DIMENSION_BATCH_SIZE]
+            )
+            for _, row in inserted:
+                lookup[tuple(row[:-1])] = row[-1]
+            errors.update(failed)
+        location_ids = _map_composite(keys, lookup)
+    unresolved = facts.index[location_ids.isna()]
+    report.record_failures([(idx, errors.get(idx, "Location insert failed")) for idx in unresolved])
+    return location_ids
+
+def _map_names(values: pd.Series, lookup: Dict) -> pd.Series:
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        ids = pd.Series(values.cat.categories).map(lookup).to_numpy(dtype='float64', na_value=np.nan)
+        ids = np.append(ids, np.nan)
+        return pd.Series(ids[values.cat.codes.to_numpy()], index=values.index).astype('Int64')
+    return values.map(lookup).astype('Int64')
+
+def _to_float(values: pd.Series) -> pd.Series:
+    return pd.to_numeric(values, errors='coerce').astype('float64')
+
+def resolve_dimensions(session: Session, df: pd.DataFrame, lookups: Dict, report: SeedReport) -> pd.DataFrame:
+    facts = pd.DataFrame(index=df.index)
+
+    regions = pd.DataFrame({'name': df['region_txt']})
+    _resolve_dimension(session, Region.__table__, ['name'], regions, lookups['regions'], report)
+    facts['region_id'] = _map_names(df['region_txt'], lookups['regions'])
+
+    countries = pd.DataFrame({'name': df['country_txt'], 'region_id': facts['region_id']})
+    _resolve_dimension(session, Country.__table__, ['name'], countries, lookups['countries'], report)
+    facts['country_id'] = _map_names(df['country_txt'], lookups['countries'])
+
+    cities = pd.DataFrame({
+        'name': df['city'],
+        'country_id': facts['country_id'],
+        'province': df['provstate']
+    })
+    _resolve_dimension(session, City.__table__, ['name', 'country_id'], cities, lookups['cities'], report)
+    facts['city_id'] = _map_composite(cities[['name', 'country_id']], lookups['cities'])
+
+    groups = pd.DataFrame({'group_name': df['gname']})
+    _resolve_dimension(
+        session, TerroristGroup.__table__, ['group_name'], groups, lookups['terrorist_groups'], report
+    )
+    facts['group_id'] = _map_names(df['gname'], lookups['terrorist_groups'])
+
+    attack_types = pd.DataFrame({'id': df['attack_type_id'], 'name': df['standardized_attack_type']})
+    _resolve_dimension(session, AttackType.__table__, ['name'], attack_types, lookups['attack_types'], report)
+    facts['attack_type_id'] = _map_names(df['standardized_attack_type'], lookups['attack_types'])
+
+    target_types = pd.DataFrame({'id': df['targtype1'], 'name': df['targtype1_txt']})
+    _resolve_dimension(session, TargetType.__table__, ['name'], target_types, lookups['target_types'], report)
+    facts['target_type_id'] = _map_names(df['targtype1_txt'], lookups['target_types'])
+
+    unresolved = facts.isna().any(axis=1)
+    report.record_failures([
+        (idx, f"Unresolved dimension: {', '.join(facts.columns[facts.loc[idx].isna()])}")
+        for idx in facts.index[unresolved]
+    ])
+
+    facts['latitude'] = _to_float(df['latitude'])
+    facts['longitude'] = _to_float(df['longitude'])
+    facts['killed'] = _to_float(df['nkill']).fillna(0)
+    facts['wounded'] = _to_float(df['nwound']).fillna(0)
+    facts['property_damage'] = (df['property'] == 1).fillna(False).astype(bool)
+    facts['property_value'] = _to_float(df['propvalue'])
+    facts['year'] = pd.to_numeric(df['iyear'], errors='coerce').astype('Int64')
+    facts['month'] = pd.to_numeric(df['imonth'], errors='coerce').astype('Int64')
+    facts['day'] = pd.to_numeric(df['iday'], errors='coerce').astype('Int64')
+    facts['summary'] = df['summary']
+    facts['success'] = pd.to_numeric(df['success'], errors='coerce').astype('boolean')
+    facts['suicide'] = pd.to_numeric(df['suicide'], errors='coerce').astype('boolean')
+    facts['source_db'] = df['source_db'].astype(object)
+    facts['merged_sources'] = (df['merged_sources'] if 'merged_sources' in df.columns else df['source_db']).astype(object)
+    facts['source_key'] = df['source_key']
+    facts['fingerprint'] = df['fingerprint']
+    facts = facts[~unresolved]
+    if compact_layout():
+        facts = facts.assign(location_id=resolve_locations(session, facts, lookups['locations'], report))
+        facts = facts[facts['location_id'].notna()]
+    return facts
+
+def _insert_compact_batch(session: Session, batch: pd.DataFrame, report: SeedReport) -> int:
+    events, events_failed = execute_isolating_failures(
+        session,
+        insert(Event.__table__).returning(Event.__table__.c.id, sort_by_parameter_order=True),
+        to_records(batch[EVENT_COLUMNS + CASUALTIES_COLUMNS + ['location_id']]),
+        batch.index.tolist()
+    )
+    report.record_failures(events_failed)
+    return len(events)
+
+def insert_fact_batch(session: Session, batch: pd.DataFrame, report: SeedReport) -> int:
+    if 'location_id' in batch.columns:
+        return _insert_compact_batch(session, batch, report)
+    positions = batch.index.tolist()
+    locations, location_failed = execute_isolating_failures(
+        session,
+        insert(Location.__table__).returning(Location.__table__.c.id, sort_by_parameter_order=True),
+        to_records(batch[LOCATION_COLUMNS]),
+        positions
+    )
+    report.record_failures(location_failed)
+    location_ids = {idx: row[0] for idx, row in locations}
+
+    batch = batch.loc[list(location_ids)]
+    casualties, casualties_failed = execute_isolating_failures(
+        session,
+        insert(Casualties.__table__).returning(Casualties.__table__.c.id, sort_by_parameter_order=True),
+        to_records(batch[CASUALTIES_COLUMNS]),
+        batch.index.tolist()
+    )
+    report.record_failures(casualties_failed)
+    casualties_ids = {idx: row[0] for idx, row in casualties}
+
+    batch = batch.loc[list(casualties_ids)]
+    event_rows = to_records(batch[EVENT_COLUMNS])
+    for idx, row in zip(batch.index, event_rows):
+        row['casualties_id'] = casualties_ids[idx]
+        row['location_id'] = location_ids[idx]
+    events, events_failed = execute_isolating_failures(
+        session,
+        insert(Event.__table__).returning(Event.__table__.c.id, sort_by_parameter_order=True),
+        event_rows,
+        batch.index.tolist()
+    )
+    report.record_failures(events_failed)
+
+    orphans = [idx for idx, _ in events_failed]
+    orphan_casualties = [casualties_ids[idx] for idx in orphans]
+    orphan_locations = [location_ids[idx] for idx in orphans]
+    orphan_locations += [location_ids[idx] for idx, _ in casualties_failed]
+    if orphan_casualties:
+        session.execute(delete(Casualties.__table__).where(Casualties.__table__.c.id.in_(orphan_casualties)))
+    if orphan_locations:
+        session.execute(delete(Location.__table__).where(Location.__table__.c.id.in_(orphan_locations)))
+    return len(events)
+
+def commit_fact_batch(
+        session: Session,
+        batch: pd.DataFrame,
+        source: pd.DataFrame,
+        covered: SourceRange,
+        known_failures: Dict[Any, str],
+        report: SeedReport,
+        checkpoint: bool = True
+) -> int:
+    mark = len(report.failed_rows)
+    try:
+        inserted = insert_fact_batch(session, batch, report) if len(batch) else 0
+        record_batch(
+            session, POSTGRES_STAGE, source, covered,
+            {**known_failures, **dict(report.failed_rows[mark:])}, checkpoint
+        )
+        session.commit()
+    except Exception as e:
+        session.rollback()
+        inserted = 0
+        report.record_failures([(idx, f"Batch failed: {str(e)}") for idx in batch.index])
+        record_batch(
+            session, POSTGRES_STAGE, source, covered,
+            {**known_failures, **dict(report.failed_rows[mark:])}, checkpoint
+        )
+        session.commit()
+    report.record_inserted(inserted)
+    return inserted
+
+def seed_frame(
+        session: Session,
+        df: pd.DataFrame,
+        lookups: Dict,
+        report: SeedReport,
+        batch_size: int,
+        checkpoint: bool = True
+):
+    if df.empty:
+        return
+    if 'fingerprint' not in df.columns:
+        df = add_fingerprints(df)
+    mark = len(report.failed_rows)
+    facts = resolve_dimensions(session, df, lookups, report)
+    session.commit()
+    unresolved = dict(report.failed_rows[mark:])
+    total_rows = len(facts)
+    done = 0
+    for batch, covered in fact_batches(df, facts, batch_size):
+        if len(batch):
+            done += len(batch)
+            print(f"Processing rows {batch.index[0]}-{batch.index[-1]} ({done}/{total_rows})")
+        commit_fact_batch(session, batch, df, covered, unresolved, report, checkpoint)
+        report.notify_progress()
+
+@timed_stage('seed_database')
+def seed_database_bulk(
+        df: pd.DataFrame,
+        batch_size: int = FACT_BATCH_SIZE,
+        lookups: Optional[Dict] = None,
+        progress: Optional[Callable[[int, Optional[int]], None]] = None
+) -> SeedReport:
+    report = SeedReport(total_rows=len(df), progress=progress)
+    lookups = lookups if lookups is not None else empty_lookups()
+    with open_session() as session:
+        print("Resolving dimensions...")
+        seed_frame(session, df, lookups, report, batch_size)
+    report.print_summary()
+    return report
+
+@timed_stage('seed_database')
+def seed_database_stream(
+        chunks: Iterable[pd.DataFrame],
+        batch_size: int = FACT_BATCH_SIZE,
+        memory_report: Optional[MemoryReport] = None,
+        progress: Optional[Callable[[int, Optional[int]], None]] = None
+) -> SeedReport:
+    report = SeedReport(progress=progress)
+    lookups = empty_lookups()
+    with open_session() as session:
+        for chunk in chunks:
+            report.total_rows += len(chunk)
+            seed_frame(session, chunk, lookups, report, batch_size)
+            if memory_report:
+                memory_report.sample('seed')
+    report.print_summary()
+    return report
+
+@timed_stage('reprocess_dead_letters')
+def reprocess_dead_letters(batch_size: int = FACT_BATCH_SIZE) -> SeedReport:
+    with open_session() as session:
+        df = dead_letter_frame(session, POSTGRES_STAGE)
+        report = SeedReport(total_rows=len(df))
+        print(f"Reprocessing {len(df)} dead-lettered rows...")
+        seed_frame(session, df, empty_lookups(), report, batch_size, checkpoint=False)
+    report.print_summary()
+    return report
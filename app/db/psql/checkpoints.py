@@ -0,0 +1,189 @@
+import argparse
+import json
+import sys
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from app.db.psql.database import get_engine
+from app.db.psql.fingerprint import add_fingerprints
+from app.db.psql.models import SeedCheckpoint, SeedDeadLetter
+from app.utils.metrics import metrics
+
+POSTGRES_STAGE = 'postgres'
+ELASTIC_STAGE = 'elasticsearch'
+STAGES = (POSTGRES_STAGE, ELASTIC_STAGE)
+
+class CheckpointMismatch(Exception):
+    def __init__(self, checkpoint: SeedCheckpoint):
+        super().__init__(
+            f"Source rows {checkpoint.first_offset}-{checkpoint.last_offset} no longer match "
+            f"checkpoint {checkpoint.id}; run a full load instead of resuming"
+        )
+
+@dataclass
+class SourceRange:
+    first_offset: int
+    last_offset: int
+    rows: int
+    fingerprint: Optional[int] = None
+
+def batch_fingerprint(fingerprints: pd.Series) -> int:
+    values = pd.to_numeric(fingerprints).to_numpy(dtype=np.int64)
+    return int(np.bitwise_xor.reduce(values)) if len(values) else 0
+
+def source_range(rows: pd.DataFrame) -> SourceRange:
+    return SourceRange(int(rows.index[0]), int(rows.index[-1]), len(rows), batch_fingerprint(rows['fingerprint']))
+
+def fact_batches(source: pd.DataFrame, facts: pd.DataFrame, batch_size: int) -> Iterator[Tuple[pd.DataFrame, SourceRange]]:
+    # every source row belongs to exactly one batch range, including rows that never became facts
+    position = 0
+    for start in range(0, max(len(facts), 1), batch_size):
+        batch = facts.iloc[start:start + batch_size]
+        if start + batch_size >= len(facts):
+            end = len(source)
+        else:
+            end = int(source.index.searchsorted(batch.index[-1], side='right'))
+        yield batch, source_range(source.iloc[position:end])
+        position = end
+
+def _payloads(rows: pd.DataFrame) -> List[Dict[str, Any]]:
+    return json.loads(rows.to_json(orient='records'))
+
+def record_dead_letters(session: Session, stage: str, failures: List[Tuple[int, str]], rows: Optional[pd.DataFrame] = None):
+    if not failures:
+        return
+    offsets = [offset for offset, _ in failures]
+    payloads = _payloads(rows.loc[offsets]) if rows is not None else [None] * len(offsets)
+    source_keys = rows.loc[offsets, 'source_key'].tolist() if rows is not None else [None] * len(offsets)
+    session.execute(insert(SeedDeadLetter.__table__), [
+        {
+            'stage': stage,
+            'source_offset': int(offset),
+            'source_key': int(source_key) if source_key is not None else None,
+            'error': error,
+            'payload': payload
+        }
+        for (offset, error), source_key, payload in zip(failures, source_keys, payloads)
+    ])
+    metrics.inc('seed_dead_letters_total', len(failures), stage=stage)
+
+def record_checkpoint(session: Session, stage: str, covered: SourceRange, target: Optional[str] = None):
+    session.execute(insert(SeedCheckpoint.__table__).values(
+        stage=stage,
+        target=target,
+        first_offset=covered.first_offset,
+        last_offset=covered.last_offset,
+        rows=covered.rows,
+        fingerprint=covered.fingerprint
+    ))
+
+def record_batch(
+        session: Session,
+        stage: str,
+        source: pd.DataFrame,
+        covered: SourceRange,
+        failures: Dict[Any, str],
+        checkpoint: bool = True
+):
+    letters = SeedDeadLetter.__table__
+    session.execute(
+        delete(letters)
+        .where(letters.c.stage == stage)
+        .where(letters.c.source_offset.between(covered.first_offset, covered.last_offset))
+    )
+    record_dead_letters(session, stage, [
+        (offset, error) for offset, error in failures.items()
+        if not isinstance(offset, str) and covered.first_offset <= offset <= covered.last_offset
+    ], source)
+    if checkpoint:
+        record_checkpoint(session, stage, covered)
+
+def load_checkpoints(engine: Engine, stage: str) -> List[SeedCheckpoint]:
+    with Session(engine) as session:
+        return list(session.scalars(
+            select(SeedCheckpoint).where(SeedCheckpoint.stage == stage).order_by(SeedCheckpoint.id)
+        ))
+
+def last_checkpoint(engine: Engine, stage: str) -> Optional[SeedCheckpoint]:
+    checkpoints = load_checkpoints(engine, stage)
+    return checkpoints[-1] if checkpoints else None
+
+def clear_stage(engine: Engine, stage: str):
+    with engine.begin() as conn:
+        conn.execute(delete(SeedCheckpoint.__table__).where(SeedCheckpoint.__table__.c.stage == stage))
+        conn.execute(delete(SeedDeadLetter.__table__).where(SeedDeadLetter.__table__.c.stage == stage))
+
+def remaining_rows(df: pd.DataFrame, checkpoints: List[SeedCheckpoint]) -> pd.DataFrame:
+    if 'fingerprint' not in df.columns:
+        df = add_fingerprints(df)
+    if not checkpoints or df.empty:
+        return df
+    latest = checkpoints[-1]
+    if latest.fingerprint is not None and df.index[0] <= latest.first_offset and latest.last_offset <= df.index[-1]:
+        covered = df.loc[latest.first_offset:latest.last_offset]
+        if len(covered) != latest.rows or batch_fingerprint(covered['fingerprint']) != latest.fingerprint:
+            raise CheckpointMismatch(latest)
+    ranges = sorted((c.first_offset, c.last_offset) for c in checkpoints)
+    firsts = np.array([first for first, _ in ranges])
+    lasts = np.array([last for _, last in ranges])
+    offsets = df.index.to_numpy()
+    slot = np.searchsorted(firsts, offsets, side='right') - 1
+    done = (slot >= 0) & (offsets <= lasts[np.clip(slot, 0, None)])
+    return df[~done]
+
+def dead_letter_frame(session: Session, stage: str = POSTGRES_STAGE) -> pd.DataFrame:
+    rows = session.execute(
+        select(SeedDeadLetter.source_offset, SeedDeadLetter.payload)
+        .where(SeedDeadLetter.stage == stage, SeedDeadLetter.payload.isnot(None))
+        .order_by(SeedDeadLetter.source_offset)
+    ).all()
+    return pd.DataFrame(
+        [payload for _, payload in rows],
+        index=pd.Index([offset for offset, _ in rows], dtype='int64')
+    )
+
+def dead_letter_offsets(session: Session, stage: str) -> List[int]:
+    return list(session.scalars(
+        select(SeedDeadLetter.source_offset).where(SeedDeadLetter.stage == stage).order_by(SeedDeadLetter.source_offset)
+    ))
+
+def progress_summary(engine: Engine) -> Dict[str, Dict[str, Any]]:
+    summary = {}
+    with Session(engine) as session:
+        for stage in STAGES:
+            checkpoints = session.execute(
+                select(func.count(), func.sum(SeedCheckpoint.rows), func.max(SeedCheckpoint.last_offset))
+                .where(SeedCheckpoint.stage == stage)
+            ).one()
+            dead_letters = session.scalar(
+                select(func.count()).select_from(SeedDeadLetter).where(SeedDeadLetter.stage == stage)
+            )
+            summary[stage] = {
+                'checkpoints': checkpoints[0],
+                'rows': checkpoints[1] or 0,
+                'last_offset': checkpoints[2],
+                'dead_letters': dead_letters
+            }
+    return summary
+
+def main(argv: Optional[list] = None) -> int:
+    parser = argparse.ArgumentParser(description="Inspect seeding checkpoints or reprocess dead-lettered rows")
+    parser.add_argument('command', choices=['status', 'reprocess'])
+    parser.add_argument('--stage', choices=STAGES, default=POSTGRES_STAGE)
+    args = parser.parse_args(argv)
+    if args.command == 'reprocess':
+        if args.stage == POSTGRES_STAGE:
+            from app.db.psql.bulk_seed import reprocess_dead_letters
+            reprocess_dead_letters()
+        else:
+            from app.service.sql_to_elastic_service import reindex_dead_letters
+            reindex_dead_letters()
+    print(json.dumps(progress_summary(get_engine()), indent=2))
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
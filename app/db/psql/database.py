@@ -1,10 +1,52 @@
-import os
-from dotenv import load_dotenv
+import threading
+from typing import Any, Dict, Optional
 from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.orm import Session, sessionmaker
+from app.db.elastic.config import settings
+from app.utils.metrics import instrument_engine
 
-load_dotenv(verbose=True)
-db_url = os.getenv("PSQL_URL")
+_engine_lock = threading.Lock()
+_engine: Optional[Engine] = None
+_session_maker: Optional[sessionmaker] = None
 
-engine = create_engine(db_url)
-session_maker = sessionmaker(bind=engine)
+def _pool_options(db_url: str) -> Dict[str, Any]:
+    options = {
+        'pool_pre_ping': settings.PSQL_POOL_PRE_PING,
+        'pool_recycle': settings.PSQL_POOL_RECYCLE
+    }
+    # SQLite (used by the tests and benchmarks) has no server-side connection limit to size a pool for
+    if make_url(db_url).get_backend_name() != 'sqlite':
+        options.update(
+            pool_size=settings.PSQL_POOL_SIZE,
+            max_overflow=settings.PSQL_MAX_OVERFLOW,
+            pool_timeout=settings.PSQL_POOL_TIMEOUT
+        )
+    return options
+
+def get_engine() -> Engine:
+    global _engine, _session_maker
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                if not settings.PSQL_URL:
+                    raise RuntimeError("PSQL_URL is not configured")
+                engine = create_engine(settings.PSQL_URL, **_pool_options(settings.PSQL_URL))
+                instrument_engine(engine)
+                _session_maker = sessionmaker(bind=engine)
+                _engine = engine
+    return _engine
+
+def get_session_maker() -> sessionmaker:
+    get_engine()
+    return _session_maker
+
+def reset_engine():
+    global _engine, _session_maker
+    with _engine_lock:
+        if _engine is not None:
+            _engine.dispose()
+        _engine, _session_maker = None, None
+
+def open_session() -> Session:
+    return get_session_maker()()
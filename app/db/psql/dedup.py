@@ -0,0 +1,127 @@
+import time
+from dataclasses import dataclass
+import numpy as np
+import pandas as pd
+from app.utils.metrics import metrics, timed_stage
+
+DATE_WINDOW_DAYS = 1
+UNKNOWN_VALUES = {'', 'unknown', 'none', 'nan'}
+FILL_COLUMNS = ['summary', 'nkill', 'nwound', 'city', 'provstate', 'latitude', 'longitude']
+SCORE_WEIGHTS = {
+    'city': 0.35,
+    'group': 0.25,
+    'killed': 0.2,
+    'wounded': 0.1,
+    'same_day': 0.1
+}
+
+@dataclass
+class DedupReport:
+    rows_in: int = 0
+    candidate_pairs: int = 0
+    collapsed: int = 0
+    seconds: float = 0.0
+
+    @property
+    def rows_out(self) -> int:
+        return self.rows_in - self.collapsed
+
+    def print_summary(self):
+        print(
+            f"Deduplication finished in {self.seconds:.1f}s: {self.rows_in} rows, "
+            f"{self.candidate_pairs} candidate pairs scored, {self.collapsed} RAND rows "
+            f"collapsed into GTD incidents, {self.rows_out} rows remain"
+        )
+
+def _normalize_text(values: pd.Series) -> pd.Series:
+    normalized = values.astype(object).where(values.notna(), '').astype(str).str.strip().str.lower()
+    return normalized.where(~normalized.isin(UNKNOWN_VALUES))
+
+def _day_number(df: pd.DataFrame) -> pd.Series:
+    # nullable integer columns from the compact frame would make to_datetime cast NA to int64
+    dates = pd.to_datetime(pd.DataFrame({
+        'year': pd.to_numeric(df['iyear'], errors='coerce').astype('float64'),
+        'month': pd.to_numeric(df['imonth'], errors='coerce').astype('float64'),
+        'day': pd.to_numeric(df['iday'], errors='coerce').astype('float64')
+    }), errors='coerce')
+    days = pd.Series(dates.to_numpy(dtype='datetime64[D]').astype('int64'), index=df.index)
+    return days.where(dates.notna())
+
+def _block_frame(df: pd.DataFrame, mask: pd.Series, country: pd.Series, day: pd.Series, prefix: str) -> pd.DataFrame:
+    valid = mask & country.notna() & day.notna()
+    return pd.DataFrame({
+        prefix: df.index[valid],
+        'country': country[valid].astype('int64').to_numpy(),
+        'day': day[valid].astype('int64').to_numpy()
+    })
+
+def _close(left: np.ndarray, right: np.ndarray) -> np.ndarray:
+    tolerance = np.maximum(1.0, 0.1 * np.fmax(left, right))
+    return np.abs(left - right) <= tolerance
+
+def candidate_pairs(df: pd.DataFrame) -> pd.DataFrame:
+    codes, _ = pd.factorize(_normalize_text(df['country_txt']))
+    country = pd.Series(codes, index=df.index).where(codes >= 0)
+    day = _day_number(df)
+    gtd = _block_frame(df, df['source_db'] == 'GTD', country, day, 'gtd')
+    rand = _block_frame(df, df['source_db'] == 'RAND', country, day, 'rand')
+    shifted = pd.concat([
+        rand.assign(day=rand['day'] + offset, shift=abs(offset))
+        for offset in range(-DATE_WINDOW_DAYS, DATE_WINDOW_DAYS + 1)
+    ], ignore_index=True)
+    return gtd.merge(shifted, on=['country', 'day'])
+
+def score_pairs(df: pd.DataFrame, pairs: pd.DataFrame) -> pd.Series:
+    killed = pd.to_numeric(df['nkill'], errors='coerce')
+    wounded = pd.to_numeric(df['nwound'], errors='coerce')
+    gtd, rand = pairs['gtd'], pairs['rand']
+
+    def same(values: pd.Series) -> np.ndarray:
+        left = _normalize_text(values.loc[gtd]).to_numpy()
+        right = _normalize_text(values.loc[rand]).to_numpy()
+        return pd.notna(left) & (left == right)
+
+    score = (
+        SCORE_WEIGHTS['city'] * same(df['city'])
+        + SCORE_WEIGHTS['group'] * same(df['gname'])
+        + SCORE_WEIGHTS['killed'] * _close(killed.loc[gtd].to_numpy(), killed.loc[rand].to_numpy())
+        + SCORE_WEIGHTS['wounded'] * _close(wounded.loc[gtd].to_numpy(), wounded.loc[rand].to_numpy())
+        + SCORE_WEIGHTS['same_day'] * (pairs['shift'].to_numpy() == 0)
+    )
+    return pd.Series(score, index=pairs.index)
+
+def _fill_survivors(df: pd.DataFrame, matches: pd.DataFrame) -> pd.DataFrame:
+    survivors = df.loc[matches['gtd']].copy()
+    duplicates = df.loc[matches['rand']].set_axis(survivors.index)
+    for col in FILL_COLUMNS:
+        missing = survivors[col].isna()
+        if survivors[col].dtype == object:
+            missing |= _normalize_text(survivors[col]).isna()
+        survivors[col] = survivors[col].where(~missing, duplicates[col])
+    survivors['merged_sources'] = 'GTD+RAND'
+    return survivors
+
+@timed_stage('deduplicate')
+def deduplicate_events(df: pd.DataFrame, threshold: float) -> pd.DataFrame:
+    started = time.perf_counter()
+    report = DedupReport(rows_in=len(df))
+    result = df.assign(merged_sources=df['source_db'])
+    pairs = candidate_pairs(df)
+    report.candidate_pairs = len(pairs)
+    if len(pairs):
+        pairs['score'] = score_pairs(df, pairs)
+        matches = (
+            pairs[pairs['score'] >= threshold]
+            .sort_values(['score', 'shift'], ascending=[False, True], kind='stable')
+            .drop_duplicates(subset='rand')
+            .drop_duplicates(subset='gtd')
+        )
+        if len(matches):
+            survivors = _fill_survivors(result, matches)
+            result.loc[survivors.index, survivors.columns] = survivors
+            result = result.drop(index=matches['rand'])
+            report.collapsed = len(matches)
+    report.seconds = time.perf_counter() - started
+    metrics.inc('dedup_rows_collapsed_total', report.collapsed)
+    report.print_summary()
+    return result
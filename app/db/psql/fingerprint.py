@@ -0,0 +1,37 @@
+import pandas as pd
+
+NUMERIC_COLUMNS = [
+    'iyear', 'imonth', 'iday', 'latitude', 'longitude', 'nkill', 'nwound',
+    'attack_type_id', 'success', 'suicide', 'targtype1', 'property', 'propvalue'
+]
+TEXT_COLUMNS = [
+    'country_txt', 'city', 'provstate', 'region_txt', 'summary', 'gname',
+    'standardized_attack_type', 'targtype1_txt', 'source_db'
+]
+IDENTITY_COLUMNS = ['source_db', 'iyear', 'imonth', 'iday', 'country_txt', 'city', 'gname']
+SINGLE_PRECISION_COLUMNS = ['nkill', 'nwound']
+
+def _normalize(df: pd.DataFrame, columns) -> pd.DataFrame:
+    normalized = {}
+    for col in columns:
+        values = df[col] if col in df.columns else pd.Series(None, index=df.index, dtype=object)
+        if col in NUMERIC_COLUMNS:
+            numeric = pd.to_numeric(values, errors='coerce')
+            if col in SINGLE_PRECISION_COLUMNS:
+                numeric = numeric.astype('float32')
+            normalized[col] = numeric.astype('float64')
+        else:
+            normalized[col] = values.astype(object).where(values.notna(), '').astype(str)
+    return pd.DataFrame(normalized, index=df.index)
+
+def _hash(frame: pd.DataFrame) -> pd.Series:
+    hashes = pd.util.hash_pandas_object(frame, index=False).to_numpy()
+    return pd.Series(hashes.view('int64'), index=frame.index)
+
+def add_fingerprints(df: pd.DataFrame) -> pd.DataFrame:
+    identity = _normalize(df, IDENTITY_COLUMNS)
+    identity['occurrence'] = identity.groupby(IDENTITY_COLUMNS, sort=False, dropna=False).cumcount()
+    return df.assign(
+        source_key=_hash(identity),
+        fingerprint=_hash(_normalize(df, NUMERIC_COLUMNS + TEXT_COLUMNS))
+    )
@@ -0,0 +1,153 @@
+import time
+from dataclasses import dataclass, field
+from typing import List, Tuple, Any, Callable, Optional
+import pandas as pd
+from sqlalchemy import bindparam, delete, exists, select, text, update
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from app.db.psql.bulk_seed import (
+    SeedReport, FACT_BATCH_SIZE, LOCATION_COLUMNS, CASUALTIES_COLUMNS, EVENT_COLUMNS,
+    empty_lookups, resolve_dimensions, seed_frame, to_records
+)
+from app.db.psql.database import open_session
+from app.db.psql.fingerprint import add_fingerprints
+from app.db.psql.models import Casualties, Event, Location
+from app.db.psql.schema_layout import INLINE_CASUALTY_COLUMNS, add_missing_columns
+from app.utils.metrics import timed_stage
+
+DELTA_COLUMNS = {
+    'source_db': 'VARCHAR',
+    'merged_sources': 'VARCHAR',
+    'source_key': 'BIGINT',
+    'fingerprint': 'BIGINT'
+}
+
+@dataclass
+class DeltaReport:
+    inserted: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    deleted: int = 0
+    seconds: float = 0.0
+    failed_rows: List[Tuple[Any, str]] = field(default_factory=list)
+
+    def print_summary(self):
+        print(
+            f"Incremental load finished in {self.seconds:.1f}s: "
+            f"{self.inserted} inserted, {self.updated} updated, "
+            f"{self.unchanged} unchanged, {self.deleted} deleted, "
+            f"{len(self.failed_rows)} failed"
+        )
+
+def ensure_delta_columns(engine: Engine):
+    add_missing_columns(engine, 'events', {**DELTA_COLUMNS, **INLINE_CASUALTY_COLUMNS})
+    with engine.begin() as conn:
+        conn.execute(text("CREATE INDEX IF NOT EXISTS ix_events_source_key ON events (source_key)"))
+
+def _load_existing_events(session: Session) -> pd.DataFrame:
+    events = Event.__table__
+    rows = session.execute(
+        select(
+            events.c.id, events.c.source_key, events.c.fingerprint,
+            events.c.casualties_id, events.c.location_id
+        ).where(events.c.source_key.isnot(None))
+    ).all()
+    existing = pd.DataFrame(rows, columns=['id', 'source_key', 'existing_fingerprint', 'casualties_id', 'location_id'])
+    return existing.drop_duplicates(subset='source_key', keep='last')
+
+def _update_rows(session: Session, table, rows: List[dict]):
+    if not rows:
+        return
+    columns = [col for col in rows[0] if col != '_id']
+    stmt = update(table).where(table.c.id == bindparam('_id')).values(
+        {col: bindparam(col) for col in columns}
+    )
+    session.execute(stmt, rows)
+
+def _apply_updates(session: Session, changed: pd.DataFrame, lookups, report: SeedReport, batch_size: int) -> int:
+    facts = resolve_dimensions(session, changed, lookups, report)
+    compact = 'location_id' in facts.columns
+    if compact:
+        facts = facts.join(changed[['id']])
+    else:
+        facts = facts.join(changed[['id', 'casualties_id', 'location_id']])
+    updated = 0
+    for start in range(0, len(facts), batch_size):
+        batch = facts.iloc[start:start + batch_size]
+        try:
+            if compact:
+                events = to_records(
+                    batch[EVENT_COLUMNS + CASUALTIES_COLUMNS + ['location_id']].assign(_id=batch['id'])
+                )
+                _update_rows(session, Event.__table__, events)
+            else:
+                events = to_records(batch[EVENT_COLUMNS].assign(_id=batch['id']))
+                casualties = to_records(batch[CASUALTIES_COLUMNS].assign(_id=batch['casualties_id']).dropna(subset=['_id']))
+                locations = to_records(batch[LOCATION_COLUMNS].assign(_id=batch['location_id']).dropna(subset=['_id']))
+                _update_rows(session, Event.__table__, events)
+                _update_rows(session, Casualties.__table__, casualties)
+                _update_rows(session, Location.__table__, locations)
+            session.commit()
+            updated += len(batch)
+        except Exception as e:
+            session.rollback()
+            report.record_failures([(idx, f"Update failed: {str(e)}") for idx in batch.index])
+    return updated
+
+def _delete_events(session: Session, removed: pd.DataFrame, batch_size: int) -> int:
+    for start in range(0, len(removed), batch_size):
+        batch = removed.iloc[start:start + batch_size]
+        event_ids = batch['id'].tolist()
+        casualties_ids = batch['casualties_id'].dropna().astype(int).tolist()
+        location_ids = batch['location_id'].dropna().astype(int).tolist()
+        session.execute(delete(Event.__table__).where(Event.__table__.c.id.in_(event_ids)))
+        session.execute(delete(Casualties.__table__).where(Casualties.__table__.c.id.in_(casualties_ids)))
+        session.execute(
+            delete(Location.__table__)
+            .where(Location.__table__.c.id.in_(location_ids))
+            .where(~exists().where(Event.__table__.c.location_id == Location.__table__.c.id))
+        )
+        session.commit()
+    return len(removed)
+
+@timed_stage('seed_database')
+def load_incremental(
+        df: pd.DataFrame,
+        delete_missing: bool = False,
+        batch_size: int = FACT_BATCH_SIZE,
+        progress: Optional[Callable[[int, Optional[int]], None]] = None
+) -> DeltaReport:
+    started = time.perf_counter()
+    report = DeltaReport()
+    seed_report = SeedReport(progress=progress)
+    incoming = add_fingerprints(df)
+    lookups = empty_lookups()
+    with open_session() as session:
+        existing = _load_existing_events(session)
+        print(f"Comparing {len(incoming)} incoming rows against {len(existing)} stored events...")
+        merged = incoming.join(existing.set_index('source_key'), on='source_key')
+        is_new = merged['id'].isna()
+        is_changed = ~is_new & (merged['fingerprint'] != merged['existing_fingerprint'])
+        report.unchanged = int((~is_new & ~is_changed).sum())
+
+        new_rows = incoming[is_new]
+        if len(new_rows):
+            print(f"Inserting {len(new_rows)} new events...")
+            seed_report.total_rows = len(new_rows)
+            seed_frame(session, new_rows, lookups, seed_report, batch_size)
+            report.inserted = seed_report.inserted
+
+        changed = merged[is_changed]
+        if len(changed):
+            print(f"Updating {len(changed)} changed events...")
+            report.updated = _apply_updates(session, changed, lookups, seed_report, batch_size)
+
+        if delete_missing:
+            removed = existing[~existing['source_key'].isin(incoming['source_key'])]
+            if len(removed):
+                print(f"Deleting {len(removed)} events missing from the source...")
+                report.deleted = _delete_events(session, removed, batch_size)
+    report.failed_rows = seed_report.failed_rows
+    report.seconds = time.perf_counter() - started
+    report.print_summary()
+    return report
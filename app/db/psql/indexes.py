@@ -0,0 +1,34 @@
+from typing import List
+from sqlalchemy import Index, text
+from sqlalchemy.engine import Engine
+from app.db.psql.models import Base
+from app.db.psql.models.event_search import DROP_SEARCH_INDEX_DDL, SEARCH_INDEX_DDL
+from app.utils.metrics import timed_stage
+
+def deferred_indexes() -> List[Index]:
+    return [
+        index
+        for table in Base.metadata.sorted_tables
+        for index in sorted(table.indexes, key=lambda index: index.name)
+        if not index.unique
+    ]
+
+def drop_secondary_indexes(engine: Engine):
+    indexes = deferred_indexes()
+    print(f"Dropping {len(indexes)} secondary indexes until the load finishes...")
+    for index in indexes:
+        index.drop(bind=engine, checkfirst=True)
+    if engine.dialect.name == 'postgresql':
+        with engine.begin() as conn:
+            conn.execute(text(DROP_SEARCH_INDEX_DDL))
+
+@timed_stage('build_indexes')
+def create_secondary_indexes(engine: Engine):
+    indexes = deferred_indexes()
+    print(f"Building {len(indexes)} secondary indexes...")
+    for index in indexes:
+        index.create(bind=engine, checkfirst=True)
+    if engine.dialect.name == 'postgresql':
+        with engine.begin() as conn:
+            conn.execute(text(SEARCH_INDEX_DDL))
+            conn.execute(text("ANALYZE"))
@@ -1,59 +1,155 @@
-from typing import Dict
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, Optional, Union
+import numpy as np
 import pandas as pd
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from app.db.psql.models import (
     AttackType, TargetType, Casualties, Event, Location,
     City, Country, Region, TerroristGroup
 )
-from app.db.psql.database import session_maker
+from app.db.psql.checkpoints import POSTGRES_STAGE, record_batch, source_range
+from app.db.psql.database import open_session
+from app.db.psql.fingerprint import add_fingerprints
+from app.db.psql.schema_layout import compact_layout
+from app.utils.csv_reader import stream_files, transform_worldwide_terrorism_data
+from app.utils.memory import MemoryReport
+from app.utils.metrics import timed_stage
 
-def standardize_data(df_gtd: pd.DataFrame, df_rand: pd.DataFrame) -> pd.DataFrame:
-    df_gtd['source_db'] = 'GTD'
-    attack_type_mapping = {
-        'Firearms': ('Armed Assault', 2),
-        'Explosives/Bombs/Dynamite': ('Bombing/Explosion', 3),
-        'Incendiary': ('Facility/Infrastructure Attack', 7),
-        'Chemical': ('Facility/Infrastructure Attack', 7),
-        'Unknown': ('Unknown', 9),
-        'Other': ('Unknown', 9),
-        'Vehicle': ('Armed Assault', 2),
-        'Sabotage Equipment': ('Facility/Infrastructure Attack', 7),
-        'Melee': ('Armed Assault', 2)
-    }
-    df_gtd['standardized_attack_type'] = df_gtd.get('attacktype1_txt', 'Unknown')
-    df_gtd['attack_type_id'] = df_gtd.get('attacktype1', 9)
-    df_rand['attack_type_tuple'] = df_rand['weaptype1_txt'].map(
-        lambda x: attack_type_mapping.get(x, ('Unknown', 9))
-    )
-    df_rand['standardized_attack_type'] = df_rand['attack_type_tuple'].apply(lambda x: x[0])
-    df_rand['attack_type_id'] = df_rand['attack_type_tuple'].apply(lambda x: x[1])
-    df_rand.drop('attack_type_tuple', axis=1, inplace=True)
-    df_rand = df_rand.assign(
-        success=1,
-        suicide=0,
-        targtype1=14,
-        targtype1_txt='Private Citizens & Property',
-        property=0,
-        propvalue=None
-    )
-    common_columns = [
-        'iyear', 'imonth', 'iday', 'country_txt', 'city', 'provstate',
-        'region_txt', 'latitude', 'longitude', 'nkill', 'nwound',
-        'summary', 'gname', 'standardized_attack_type', 'attack_type_id',
-        'success', 'suicide', 'targtype1', 'targtype1_txt',
-        'property', 'propvalue', 'source_db'
+TRANSFORM_VERSION = 2
+
+ATTACK_TYPE_MAPPING = {
+    'Firearms': ('Armed Assault', 2),
+    'Explosives/Bombs/Dynamite': ('Bombing/Explosion', 3),
+    'Incendiary': ('Facility/Infrastructure Attack', 7),
+    'Chemical': ('Facility/Infrastructure Attack', 7),
+    'Unknown': ('Unknown', 9),
+    'Other': ('Unknown', 9),
+    'Vehicle': ('Armed Assault', 2),
+    'Sabotage Equipment': ('Facility/Infrastructure Attack', 7),
+    'Melee': ('Armed Assault', 2)
+}
+UNMAPPED_ATTACK_TYPE = ('Unknown', 9)
+
+COMMON_COLUMNS = [
+    'iyear', 'imonth', 'iday', 'country_txt', 'city', 'provstate',
+    'region_txt', 'latitude', 'longitude', 'nkill', 'nwound',
+    'summary', 'gname', 'standardized_attack_type', 'attack_type_id',
+    'success', 'suicide', 'targtype1', 'targtype1_txt',
+    'property', 'propvalue', 'source_db'
+]
+UNKNOWN_FILLED_COLUMNS = ['country_txt', 'city', 'region_txt', 'gname', 'summary']
+
+@dataclass(frozen=True)
+class FromColumn:
+    name: str
+    default: Any = None
+
+@dataclass(frozen=True)
+class Constant:
+    value: Any
+
+@dataclass(frozen=True)
+class WeaponMapping:
+    field: int
+
+ColumnRule = Union[FromColumn, Constant, WeaponMapping]
+
+# how every output column is derived per source; columns not listed are copied through by name
+GTD_PLAN: Dict[str, ColumnRule] = {
+    'source_db': Constant('GTD'),
+    'standardized_attack_type': FromColumn('attacktype1_txt', 'Unknown'),
+    'attack_type_id': FromColumn('attacktype1', 9)
+}
+RAND_PLAN: Dict[str, ColumnRule] = {
+    'standardized_attack_type': WeaponMapping(0),
+    'attack_type_id': WeaponMapping(1),
+    'success': Constant(1),
+    'suicide': Constant(0),
+    'targtype1': Constant(14),
+    'targtype1_txt': Constant('Private Citizens & Property'),
+    'property': Constant(0),
+    'propvalue': Constant(None)
+}
+
+_WEAPON_CATEGORIES = pd.Index(list(ATTACK_TYPE_MAPPING))
+# position -1 (weapons missing from the mapping) picks the trailing unmapped entry
+_WEAPON_LOOKUPS = [
+    np.array([mapped[field] for mapped in ATTACK_TYPE_MAPPING.values()] + [UNMAPPED_ATTACK_TYPE[field]], dtype=dtype)
+    for field, dtype in ((0, object), (1, np.int64))
+]
+
+def _weapon_codes(df: pd.DataFrame) -> np.ndarray:
+    return _WEAPON_CATEGORIES.get_indexer(df['weaptype1_txt'])
+
+def _planned_column(df: pd.DataFrame, column: str, rule: Optional[ColumnRule], codes: Optional[np.ndarray]) -> pd.Series:
+    if rule is None:
+        rule = FromColumn(column)
+    if isinstance(rule, FromColumn):
+        if rule.name in df.columns:
+            return df[rule.name]
+        rule = Constant(rule.default)
+    if isinstance(rule, WeaponMapping):
+        return pd.Series(_WEAPON_LOOKUPS[rule.field][codes], index=df.index)
+    return pd.Series(rule.value, index=df.index, dtype=object if rule.value is None else None)
+
+def _plan_columns(df: pd.DataFrame, plan: Dict[str, ColumnRule]) -> Dict[str, pd.Series]:
+    codes = _weapon_codes(df) if any(isinstance(rule, WeaponMapping) for rule in plan.values()) else None
+    return {column: _planned_column(df, column, plan.get(column), codes) for column in COMMON_COLUMNS}
+
+def _fill_unknown(columns: Dict[str, pd.Series]) -> pd.DataFrame:
+    for column in UNKNOWN_FILLED_COLUMNS:
+        columns[column] = columns[column].fillna('Unknown')
+    return pd.DataFrame(columns, copy=False)
+
+def _aligned_parts(column: str, planned) -> list:
+    # an all-null constant takes the other source's dtype, so e.g. propvalue stays float64 after the merge
+    typed = [columns[column].dtype for columns, plan in planned if plan.get(column) != Constant(None)]
+    return [
+        columns[column].astype(typed[0]) if plan.get(column) == Constant(None) and typed else columns[column]
+        for columns, plan in planned
     ]
-    for df in [df_gtd, df_rand]:
-        for col in common_columns:
-            if col not in df.columns:
-                df[col] = None
-    df_merged = pd.concat([
-        df_gtd[common_columns],
-        df_rand[common_columns]
-    ], ignore_index=True)
-    for col in ['country_txt', 'city', 'region_txt', 'gname', 'summary']:
-        df_merged[col] = df_merged[col].fillna('Unknown')
-    return df_merged
+
+@timed_stage('standardize_data')
+def standardize_gtd(df_gtd: pd.DataFrame) -> pd.DataFrame:
+    return _fill_unknown({
+        column: values.copy() for column, values in _plan_columns(df_gtd, GTD_PLAN).items()
+    })
+
+@timed_stage('standardize_data')
+def standardize_rand(df_rand: pd.DataFrame) -> pd.DataFrame:
+    return _fill_unknown({
+        column: values.copy() for column, values in _plan_columns(df_rand, RAND_PLAN).items()
+    })
+
+@timed_stage('standardize_data')
+def standardize_data(df_gtd: pd.DataFrame, df_rand: pd.DataFrame) -> pd.DataFrame:
+    # each merged column is built by a single concatenation of the planned source columns
+    planned = [(_plan_columns(df_gtd, GTD_PLAN), GTD_PLAN), (_plan_columns(df_rand, RAND_PLAN), RAND_PLAN)]
+    return _fill_unknown({
+        column: pd.concat(_aligned_parts(column, planned), ignore_index=True) for column in COMMON_COLUMNS
+    })
+
+def stream_standardized_data(
+        chunk_size: int,
+        memory_report: Optional[MemoryReport] = None
+) -> Iterator[pd.DataFrame]:
+    offset = 0
+    for source, chunk in stream_files(chunk_size):
+        if memory_report:
+            memory_report.sample('read')
+        if source == 'RAND':
+            chunk = transform_worldwide_terrorism_data(chunk)
+            if memory_report:
+                memory_report.sample('transform')
+            chunk = standardize_rand(chunk)
+        else:
+            chunk = standardize_gtd(chunk)
+        if memory_report:
+            memory_report.sample('standardize')
+        chunk.index = pd.RangeIndex(offset, offset + len(chunk))
+        offset += len(chunk)
+        yield chunk
 
 def create_or_get_region(session: Session, region_name: str, lookups: Dict) -> int:
     if region_name not in lookups['regions']:
@@ -104,73 +200,132 @@ def create_or_get_target_type(session: Session, name: str, target_id: int, looku
         lookups['target_types'][name] = target_type.id
     return lookups['target_types'][name]
 
+def create_or_get_location(
+        session: Session,
+        latitude: float,
+        longitude: float,
+        city_id: int,
+        country_id: int,
+        region_id: int,
+        lookups: Dict
+) -> int:
+    location_key = (latitude, longitude, city_id, region_id)
+    if compact_layout() and location_key in lookups['locations']:
+        return lookups['locations'][location_key]
+    location = Location(
+        latitude=latitude,
+        longitude=longitude,
+        country_id=country_id,
+        city_id=city_id,
+        region_id=region_id
+    )
+    session.add(location)
+    session.flush()
+    if compact_layout():
+        lookups['locations'][location_key] = location.id
+    return location.id
+
+def load_lookups(session: Session) -> Dict:
+    lookups = {
+        'regions': dict(session.execute(select(Region.name, Region.id)).all()),
+        'countries': dict(session.execute(select(Country.name, Country.id)).all()),
+        'cities': {
+            f"{name}_{country_id}": city_id
+            for name, country_id, city_id in session.execute(select(City.name, City.country_id, City.id))
+        },
+        'attack_types': dict(session.execute(select(AttackType.name, AttackType.id)).all()),
+        'target_types': dict(session.execute(select(TargetType.name, TargetType.id)).all()),
+        'terrorist_groups': dict(session.execute(select(TerroristGroup.group_name, TerroristGroup.id)).all()),
+        'locations': {}
+    }
+    if compact_layout():
+        for location_id, *key in session.execute(
+                select(Location.id, Location.latitude, Location.longitude, Location.city_id, Location.region_id)
+        ):
+            lookups['locations'][tuple(key)] = location_id
+    return lookups
+
+def _forget_new_lookups(lookups: Dict, sizes: Dict[str, int]):
+    # ids flushed inside a rolled back savepoint no longer exist
+    for name, size in sizes.items():
+        for key in list(lookups[name])[size:]:
+            del lookups[name][key]
+
+def _commit_rows(session: Session, rows: pd.DataFrame, failures: Dict):
+    if not rows.empty:
+        record_batch(session, POSTGRES_STAGE, rows, source_range(rows), failures)
+    session.commit()
+
+@timed_stage('seed_database')
 def seed_database(df: pd.DataFrame):
-    with session_maker() as session:
-        lookups = {
-            'regions': {},
-            'countries': {},
-            'cities': {},
-            'attack_types': {},
-            'target_types': {},
-            'terrorist_groups': {}
-        }
+    if 'fingerprint' not in df.columns:
+        df = add_fingerprints(df)
+    df = df.astype(object).where(df.notna(), None)
+    with open_session() as session:
+        lookups = load_lookups(session)
         total_rows = len(df)
-        for idx, row in df.iterrows():
+        batch_start = 0
+        failures = {}
+        for position, (idx, row) in enumerate(df.iterrows()):
+            if position % 100 == 0:
+                print(f"Processing row {idx}/{total_rows}")
+                _commit_rows(session, df.iloc[batch_start:position], failures)
+                batch_start = position
+                failures = {}
+            sizes = {name: len(values) for name, values in lookups.items()}
             try:
-                if idx % 100 == 0:
-                    print(f"Processing row {idx}/{total_rows}")
-                    session.commit()
-                region_id = create_or_get_region(session, row['region_txt'], lookups)
-                country_id = create_or_get_country(session, row['country_txt'], region_id, lookups)
-                city_id = create_or_get_city(session, row['city'], country_id, row['provstate'], lookups)
-                location = Location(
-                    latitude=row['latitude'],
-                    longitude=row['longitude'],
-                    country_id=country_id,
-                    city_id=city_id,
-                    region_id=region_id
-                )
-                session.add(location)
-                session.flush()
-                group_id = create_or_get_terrorist_group(session, row['gname'], lookups)
-                attack_type_id = create_or_get_attack_type(
-                    session, row['standardized_attack_type'], row['attack_type_id'], lookups
-                )
-                target_type_id = create_or_get_target_type(
-                    session, row['targtype1_txt'], row['targtype1'], lookups
-                )
-                casualties = Casualties(
-                    killed=row['nkill'] or 0,
-                    wounded=row['nwound'] or 0,
-                    property_damage=row['property'] == 1,
-                    property_value=row['propvalue']
-                )
-                session.add(casualties)
-                session.flush()
-                event = Event(
-                    year=row['iyear'] if row['iyear'] != 2068 else 1968,
-                    month=row['imonth'],
-                    day=row['iday'],
-                    summary=row['summary'],
-                    success=row['success'],
-                    suicide=row['suicide'],
-                    attack_type_id=attack_type_id,
-                    target_type_id=target_type_id,
-                    casualties_id=casualties.id,
-                    location_id=location.id,
-                    group_id=group_id
-                )
-                session.add(event)
-                if idx % 100 == 99:
-                    session.commit()
+                with session.begin_nested():
+                    region_id = create_or_get_region(session, row['region_txt'], lookups)
+                    country_id = create_or_get_country(session, row['country_txt'], region_id, lookups)
+                    city_id = create_or_get_city(session, row['city'], country_id, row['provstate'], lookups)
+                    location_id = create_or_get_location(
+                        session, row['latitude'], row['longitude'], city_id, country_id, region_id, lookups
+                    )
+                    group_id = create_or_get_terrorist_group(session, row['gname'], lookups)
+                    attack_type_id = create_or_get_attack_type(
+                        session, row['standardized_attack_type'], row['attack_type_id'], lookups
+                    )
+                    target_type_id = create_or_get_target_type(
+                        session, row['targtype1_txt'], row['targtype1'], lookups
+                    )
+                    casualty_values = dict(
+                        killed=row['nkill'] or 0,
+                        wounded=row['nwound'] or 0,
+                        property_damage=row['property'] == 1,
+                        property_value=row['propvalue']
+                    )
+                    if compact_layout():
+                        casualties_id = None
+                    else:
+                        casualties = Casualties(**casualty_values)
+                        session.add(casualties)
+                        session.flush()
+                        casualties_id = casualties.id
+                        casualty_values = {}
+                    event = Event(
+                        year=row['iyear'],
+                        month=row['imonth'],
+                        day=row['iday'],
+                        summary=row['summary'],
+                        success=row['success'],
+                        suicide=row['suicide'],
+                        attack_type_id=attack_type_id,
+                        target_type_id=target_type_id,
+                        casualties_id=casualties_id,
+                        location_id=location_id,
+                        group_id=group_id,
+                        source_db=row['source_db'],
+                        merged_sources=row.get('merged_sources', row['source_db']),
+                        source_key=row['source_key'],
+                        fingerprint=row['fingerprint'],
+                        **casualty_values
+                    )
+                    session.add(event)
+                    session.flush()
             except Exception as e:
-                session.rollback()
+                _forget_new_lookups(lookups, sizes)
+                failures[idx] = str(e).splitlines()[0]
                 print(f"Error processing row {idx}:")
                 print(f"Error: {str(e)}")
                 print(f"Row: {row}")
-                continue
-        try:
-            session.commit()
-        except Exception as e:
-            session.rollback()
-            print(f"Error in final commit: {str(e)}")
+        _commit_rows(session, df.iloc[batch_start:], failures)
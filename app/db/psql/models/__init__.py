@@ -11,3 +11,7 @@ from .city import City
 from .country import Country
 from .region import Region
 from .terrorist_group import TerroristGroup
+from .seed_checkpoint import SeedCheckpoint
+from .seed_dead_letter import SeedDeadLetter
+from .event_facts import event_facts, refresh_event_facts
+from .event_search import summary_tsv
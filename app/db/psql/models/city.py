@@ -1,13 +1,16 @@
 from app.db.psql.models import Base
-from sqlalchemy import Column, Integer, String, ForeignKey
+from sqlalchemy import Column, Integer, String, ForeignKey, Index
 from sqlalchemy.orm import relationship
 
 class City(Base):
     __tablename__ = 'cities'
+    __table_args__ = (
+        Index('ix_cities_name_country_id', 'name', 'country_id'),
+    )
     id = Column(Integer, primary_key=True, autoincrement=True)
     name = Column(String, nullable=False)
     province = Column(String, nullable=True)
-    country_id = Column(Integer, ForeignKey('countries.id'), nullable=True)
+    country_id = Column(Integer, ForeignKey('countries.id'), nullable=True, index=True)
 
     country = relationship("Country", back_populates="cities")
     location = relationship("Location", back_populates="city", uselist=False)
\ No newline at end of file
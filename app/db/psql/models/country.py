@@ -6,7 +6,7 @@ class Country(Base):
     __tablename__ = 'countries'
     id = Column(Integer, primary_key=True, autoincrement=True)
     name = Column(String, nullable=False)
-    region_id = Column(Integer, ForeignKey('regions.id'), nullable=True)
+    region_id = Column(Integer, ForeignKey('regions.id'), nullable=True, index=True)
 
     location = relationship("Location", back_populates="country",uselist=False)
     cities = relationship("City", back_populates="country")
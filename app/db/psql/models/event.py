@@ -1,9 +1,13 @@
-from sqlalchemy import Column, Integer, String, Boolean, ForeignKey
+from sqlalchemy import Column, Integer, BigInteger, String, Boolean, Float, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from app.db.psql.models import Base
 
 class Event(Base):
     __tablename__ = 'events'
+    __table_args__ = (
+        Index('ix_events_year_month', 'year', 'month'),
+        Index('ix_events_group_id_year', 'group_id', 'year'),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     year = Column(Integer, nullable=True)
@@ -12,14 +16,22 @@ class Event(Base):
     summary = Column(String, nullable=True)
     success = Column(Boolean, nullable=True)
     suicide = Column(Boolean, nullable=True)
-    attack_type_id = Column(Integer, ForeignKey('attack_types.id'), nullable=True)
-    target_type_id = Column(Integer, ForeignKey('target_types.id'), nullable=True)
-    casualties_id = Column(Integer, ForeignKey('casualties.id'), nullable=True)
-    location_id = Column(Integer, ForeignKey('locations.id'), nullable=True)
-    group_id = Column(Integer, ForeignKey('terrorist_group.id'),nullable=True)
+    attack_type_id = Column(Integer, ForeignKey('attack_types.id'), nullable=True, index=True)
+    target_type_id = Column(Integer, ForeignKey('target_types.id'), nullable=True, index=True)
+    casualties_id = Column(Integer, ForeignKey('casualties.id'), nullable=True, index=True)
+    location_id = Column(Integer, ForeignKey('locations.id'), nullable=True, index=True)
+    group_id = Column(Integer, ForeignKey('terrorist_group.id'), nullable=True)
+    killed = Column(Integer, nullable=True)
+    wounded = Column(Integer, nullable=True)
+    property_damage = Column(Boolean, nullable=True)
+    property_value = Column(Float, nullable=True)
+    source_db = Column(String, nullable=True)
+    merged_sources = Column(String, nullable=True)
+    source_key = Column(BigInteger, nullable=True, index=True)
+    fingerprint = Column(BigInteger, nullable=True)
 
     attack_type = relationship("AttackType", back_populates="events")
     target_type = relationship("TargetType", back_populates="events")
     casualties = relationship("Casualties", back_populates="event")
-    location = relationship("Location", back_populates="event", uselist=False)
+    location = relationship("Location", back_populates="events")
     group = relationship("TerroristGroup", backref="events")
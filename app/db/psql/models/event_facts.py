@@ -0,0 +1,102 @@
+from sqlalchemy import (
+    DDL, Column, Integer, String, Boolean, Float, MetaData, Table, event, text
+)
+from sqlalchemy.engine import Engine
+from app.db.psql.models import Base
+
+EVENT_FACTS_SELECT = """
+SELECT
+    e.id AS event_id,
+    e.year, e.month, e.day,
+    e.success, e.suicide,
+    e.attack_type_id, atk.name AS attack_type,
+    e.target_type_id, tgt.name AS target_type,
+    e.group_id, g.group_name,
+    COALESCE(e.killed, c.killed, 0) AS killed,
+    COALESCE(e.wounded, c.wounded, 0) AS wounded,
+    COALESCE(e.property_damage, c.property_damage) AS property_damage,
+    COALESCE(e.property_value, c.property_value) AS property_value,
+    l.latitude, l.longitude,
+    l.city_id, ci.name AS city,
+    l.country_id, co.name AS country,
+    l.region_id, r.name AS region
+FROM events e
+LEFT JOIN attack_types atk ON atk.id = e.attack_type_id
+LEFT JOIN target_types tgt ON tgt.id = e.target_type_id
+LEFT JOIN terrorist_group g ON g.id = e.group_id
+LEFT JOIN casualties c ON c.id = e.casualties_id
+LEFT JOIN locations l ON l.id = e.location_id
+LEFT JOIN cities ci ON ci.id = l.city_id
+LEFT JOIN countries co ON co.id = l.country_id
+LEFT JOIN regions r ON r.id = l.region_id
+"""
+
+EVENT_FACTS_INDEXES = {
+    'ux_event_facts_event_id': 'UNIQUE INDEX IF NOT EXISTS ux_event_facts_event_id ON event_facts (event_id)',
+    'ix_event_facts_year_month': 'INDEX IF NOT EXISTS ix_event_facts_year_month ON event_facts (year, month)',
+    'ix_event_facts_region_id_year': 'INDEX IF NOT EXISTS ix_event_facts_region_id_year ON event_facts (region_id, year)',
+    'ix_event_facts_country_id_year': 'INDEX IF NOT EXISTS ix_event_facts_country_id_year ON event_facts (country_id, year)',
+    'ix_event_facts_group_id_year': 'INDEX IF NOT EXISTS ix_event_facts_group_id_year ON event_facts (group_id, year)'
+}
+
+event_facts = Table(
+    'event_facts', MetaData(),
+    Column('event_id', Integer, primary_key=True),
+    Column('year', Integer),
+    Column('month', Integer),
+    Column('day', Integer),
+    Column('success', Boolean),
+    Column('suicide', Boolean),
+    Column('attack_type_id', Integer),
+    Column('attack_type', String),
+    Column('target_type_id', Integer),
+    Column('target_type', String),
+    Column('group_id', Integer),
+    Column('group_name', String),
+    Column('killed', Integer),
+    Column('wounded', Integer),
+    Column('property_damage', Boolean),
+    Column('property_value', Float),
+    Column('latitude', Float),
+    Column('longitude', Float),
+    Column('city_id', Integer),
+    Column('city', String),
+    Column('country_id', Integer),
+    Column('country', String),
+    Column('region_id', Integer),
+    Column('region', String)
+)
+
+CREATE_EVENT_FACTS_DDL = f"CREATE MATERIALIZED VIEW IF NOT EXISTS event_facts AS {EVENT_FACTS_SELECT} WITH NO DATA"
+DROP_EVENT_FACTS_DDL = "DROP MATERIALIZED VIEW IF EXISTS event_facts"
+
+event.listen(Base.metadata, 'after_create', DDL(CREATE_EVENT_FACTS_DDL).execute_if(dialect='postgresql'))
+for index_ddl in EVENT_FACTS_INDEXES.values():
+    event.listen(Base.metadata, 'after_create', DDL(f"CREATE {index_ddl}").execute_if(dialect='postgresql'))
+event.listen(Base.metadata, 'before_drop', DDL(DROP_EVENT_FACTS_DDL).execute_if(dialect='postgresql'))
+
+def refresh_event_facts(engine: Engine):
+    if engine.dialect.name != 'postgresql':
+        print(f"Skipping event_facts refresh: materialized views need PostgreSQL, not {engine.dialect.name}")
+        return
+    with engine.begin() as conn:
+        populated = conn.execute(
+            text("SELECT ispopulated FROM pg_matviews WHERE matviewname = 'event_facts'")
+        ).scalar()
+        if populated is None:
+            print("Skipping event_facts refresh: view does not exist")
+            return
+        print("Refreshing event_facts...")
+        concurrently = "CONCURRENTLY " if populated else ""
+        conn.execute(text(f"REFRESH MATERIALIZED VIEW {concurrently}event_facts"))
+
+def recreate_event_facts(engine: Engine):
+    if engine.dialect.name != 'postgresql':
+        return
+    print("Recreating event_facts...")
+    with engine.begin() as conn:
+        conn.execute(text(DROP_EVENT_FACTS_DDL))
+        conn.execute(text(CREATE_EVENT_FACTS_DDL))
+        for index_ddl in EVENT_FACTS_INDEXES.values():
+            conn.execute(text(f"CREATE {index_ddl}"))
+    refresh_event_facts(engine)
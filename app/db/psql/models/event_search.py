@@ -0,0 +1,16 @@
+from sqlalchemy import DDL, event, literal_column
+from app.db.psql.models import Base
+
+SEARCH_CONFIG = 'english'
+SEARCH_INDEX_NAME = 'ix_events_summary_tsv'
+SEARCH_COLUMN_DDL = (
+    "ALTER TABLE events ADD COLUMN IF NOT EXISTS summary_tsv tsvector "
+    f"GENERATED ALWAYS AS (to_tsvector('{SEARCH_CONFIG}', coalesce(summary, ''))) STORED"
+)
+SEARCH_INDEX_DDL = f"CREATE INDEX IF NOT EXISTS {SEARCH_INDEX_NAME} ON events USING GIN (summary_tsv)"
+DROP_SEARCH_INDEX_DDL = f"DROP INDEX IF EXISTS {SEARCH_INDEX_NAME}"
+
+summary_tsv = literal_column('events.summary_tsv')
+
+event.listen(Base.metadata, 'after_create', DDL(SEARCH_COLUMN_DDL).execute_if(dialect='postgresql'))
+event.listen(Base.metadata, 'after_create', DDL(SEARCH_INDEX_DDL).execute_if(dialect='postgresql'))
@@ -1,18 +1,21 @@
-from sqlalchemy import Column, Integer, Float, ForeignKey
+from sqlalchemy import Column, Integer, Float, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from app.db.psql.models import Base
 
 class Location(Base):
     __tablename__ = 'locations'
+    __table_args__ = (
+        Index('ix_locations_location_key', 'latitude', 'longitude', 'city_id', 'region_id'),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     latitude = Column(Float, nullable=True)
     longitude = Column(Float, nullable=True)
-    country_id = Column(Integer, ForeignKey('countries.id'), nullable=True)
-    city_id = Column(Integer, ForeignKey('cities.id'), nullable=True)
-    region_id = Column(Integer, ForeignKey('regions.id'), nullable=True)
+    country_id = Column(Integer, ForeignKey('countries.id'), nullable=True, index=True)
+    city_id = Column(Integer, ForeignKey('cities.id'), nullable=True, index=True)
+    region_id = Column(Integer, ForeignKey('regions.id'), nullable=True, index=True)
 
-    event = relationship("Event", back_populates="location", uselist=False)
+    events = relationship("Event", back_populates="location")
     country = relationship("Country", back_populates="location", uselist=False)
     city = relationship("City", back_populates="location", uselist=False)
     region = relationship("Region", back_populates="location", uselist=False)
\ No newline at end of file
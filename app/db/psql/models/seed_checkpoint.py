@@ -0,0 +1,14 @@
+from sqlalchemy import Column, Integer, BigInteger, String, DateTime, func
+from app.db.psql.models import Base
+
+class SeedCheckpoint(Base):
+    __tablename__ = 'seed_checkpoints'
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    stage = Column(String, nullable=False)
+    target = Column(String, nullable=True)
+    first_offset = Column(BigInteger, nullable=False)
+    last_offset = Column(BigInteger, nullable=False)
+    rows = Column(Integer, nullable=False)
+    fingerprint = Column(BigInteger, nullable=True)
+    created_at = Column(DateTime, server_default=func.now())
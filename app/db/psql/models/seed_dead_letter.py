@@ -0,0 +1,13 @@
+from sqlalchemy import Column, Integer, BigInteger, String, DateTime, JSON, func
+from app.db.psql.models import Base
+
+class SeedDeadLetter(Base):
+    __tablename__ = 'seed_dead_letters'
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    stage = Column(String, nullable=False)
+    source_offset = Column(BigInteger, nullable=False)
+    source_key = Column(BigInteger, nullable=True)
+    error = Column(String, nullable=True)
+    payload = Column(JSON, nullable=True)
+    created_at = Column(DateTime, server_default=func.now())
@@ -0,0 +1,80 @@
+import os
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from typing import Any, Callable, Dict, Optional
+import numpy as np
+import pandas as pd
+from app.db.psql.bulk_seed import (
+    SeedReport, FACT_BATCH_SIZE, commit_fact_batch, empty_lookups, resolve_dimensions
+)
+from app.db.psql.checkpoints import SourceRange, fact_batches
+from app.db.psql.database import get_engine, open_session
+from app.db.psql.fingerprint import add_fingerprints
+from app.utils.metrics import timed_stage
+
+def _init_worker():
+    # forked workers must not reuse the parent's pooled connections
+    get_engine().dispose(close=False)
+
+def _seed_batch(
+        batch: pd.DataFrame,
+        source: pd.DataFrame,
+        covered: SourceRange,
+        unresolved: Dict[Any, str]
+) -> SeedReport:
+    report = SeedReport(total_rows=len(batch))
+    with open_session() as session:
+        commit_fact_batch(session, batch, source, covered, unresolved, report)
+    return report
+
+def _merge(report: SeedReport, batch_report: SeedReport):
+    report.record_inserted(batch_report.inserted)
+    report.record_failures(batch_report.failed_rows)
+
+@timed_stage('seed_database')
+def seed_database_parallel(
+        df: pd.DataFrame,
+        workers: Optional[int] = None,
+        batch_size: int = FACT_BATCH_SIZE,
+        progress: Optional[Callable[[int, Optional[int]], None]] = None
+) -> SeedReport:
+    workers = workers or os.cpu_count() or 1
+    report = SeedReport(total_rows=len(df), progress=progress)
+    if df.empty:
+        report.print_summary()
+        return report
+    if 'fingerprint' not in df.columns:
+        df = add_fingerprints(df)
+    print("Resolving dimensions...")
+    with open_session() as session:
+        facts = resolve_dimensions(session, df, empty_lookups(), report)
+        session.commit()
+    unresolved = dict(report.failed_rows)
+    # offsets ascend batch by batch, so each batch's failures are one slice of the sorted offsets
+    unresolved_offsets = np.sort(np.fromiter(unresolved, dtype=np.int64, count=len(unresolved)))
+    get_engine().dispose()
+
+    total_batches = (len(facts) + batch_size - 1) // batch_size
+    print(f"Seeding {len(facts)} rows in {total_batches} batches with {workers} workers...")
+    done_batches = 0
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        pending = set()
+        for batch, covered in fact_batches(df, facts, batch_size):
+            source = df.loc[covered.first_offset:covered.last_offset]
+            start, end = unresolved_offsets.searchsorted([covered.first_offset, covered.last_offset + 1])
+            failures = {int(idx): unresolved[idx] for idx in unresolved_offsets[start:end]}
+            pending.add(pool.submit(_seed_batch, batch, source, covered, failures))
+            if len(pending) < workers * 2:
+                continue
+            finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                _merge(report, future.result())
+                done_batches += 1
+            print(f"Processed {done_batches}/{total_batches} batches ({report.inserted} rows inserted)")
+            report.notify_progress()
+        for future in wait(pending).done:
+            _merge(report, future.result())
+            done_batches += 1
+        print(f"Processed {done_batches}/{total_batches} batches ({report.inserted} rows inserted)")
+        report.notify_progress()
+    report.print_summary()
+    return report
@@ -0,0 +1,132 @@
+import argparse
+import json
+import sys
+from typing import Any, Dict, Optional
+import pandas as pd
+from sqlalchemy import bindparam, delete, exists, func, inspect, select, text, update
+from sqlalchemy.engine import Engine
+from app.db.elastic.config import settings
+from app.db.psql.database import get_engine
+from app.db.psql.models import Casualties, Event, Location
+from app.db.psql.models.event_facts import recreate_event_facts
+
+NORMALIZED = 'normalized'
+COMPACT = 'compact'
+LAYOUTS = (NORMALIZED, COMPACT)
+LOCATION_KEY_COLUMNS = ['latitude', 'longitude', 'city_id', 'region_id']
+INLINE_CASUALTY_COLUMNS = {
+    'killed': 'INTEGER',
+    'wounded': 'INTEGER',
+    'property_damage': 'BOOLEAN',
+    'property_value': 'FLOAT'
+}
+MIGRATION_BATCH_SIZE = 5000
+FOOTPRINT_TABLES = ['events', 'locations', 'casualties']
+
+def compact_layout() -> bool:
+    return settings.SCHEMA_LAYOUT == COMPACT
+
+def add_missing_columns(engine: Engine, table: str, columns: Dict[str, str]):
+    existing = {col['name'] for col in inspect(engine).get_columns(table)}
+    with engine.begin() as conn:
+        for name, sql_type in columns.items():
+            if name not in existing:
+                print(f"Adding {table}.{name} column")
+                conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {name} {sql_type}"))
+
+def _inline_casualties(engine: Engine) -> int:
+    events = Event.__table__
+    casualties = Casualties.__table__
+
+    def casualty(column):
+        return select(casualties.c[column]).where(casualties.c.id == events.c.casualties_id).scalar_subquery()
+
+    with engine.begin() as conn:
+        moved = conn.execute(
+            update(events)
+            .where(events.c.casualties_id.isnot(None))
+            .values(
+                killed=casualty('killed'),
+                wounded=casualty('wounded'),
+                property_damage=casualty('property_damage'),
+                property_value=casualty('property_value'),
+                casualties_id=None
+            )
+        ).rowcount
+        conn.execute(
+            delete(casualties).where(~exists().where(events.c.casualties_id == casualties.c.id))
+        )
+    return moved
+
+def _share_locations(engine: Engine, batch_size: int) -> Dict[str, int]:
+    locations = Location.__table__
+    events = Event.__table__
+    with engine.connect() as conn:
+        existing = pd.DataFrame(
+            conn.execute(select(locations.c.id, *(locations.c[col] for col in LOCATION_KEY_COLUMNS))).all(),
+            columns=['id', *LOCATION_KEY_COLUMNS]
+        )
+    survivors = existing.groupby(LOCATION_KEY_COLUMNS, dropna=False, sort=False)['id'].transform('min')
+    remapped = existing.assign(new_id=survivors)[existing['id'] != survivors]
+    remap_stmt = (
+        update(events)
+        .where(events.c.location_id == bindparam('old_id'))
+        .values(location_id=bindparam('new_id'))
+    )
+    for start in range(0, len(remapped), batch_size):
+        batch = remapped.iloc[start:start + batch_size]
+        rows = [
+            {'old_id': int(old_id), 'new_id': int(new_id)}
+            for old_id, new_id in zip(batch['id'], batch['new_id'])
+        ]
+        with engine.begin() as conn:
+            conn.execute(remap_stmt, rows)
+            conn.execute(delete(locations).where(locations.c.id.in_(batch['id'].tolist())))
+    return {'before': len(existing), 'after': len(existing) - len(remapped)}
+
+def migrate_to_compact(engine: Engine, batch_size: int = MIGRATION_BATCH_SIZE) -> Dict[str, Any]:
+    print("Migrating to the compact schema layout...")
+    add_missing_columns(engine, 'events', INLINE_CASUALTY_COLUMNS)
+    report = {'casualties_inlined': _inline_casualties(engine)}
+    locations = _share_locations(engine, batch_size)
+    report['locations_before'] = locations['before']
+    report['locations_after'] = locations['after']
+    recreate_event_facts(engine)
+    print(
+        f"Inlined {report['casualties_inlined']} casualty rows, "
+        f"collapsed {report['locations_before']} locations into {report['locations_after']}"
+    )
+    return report
+
+def table_footprint(engine: Engine) -> Dict[str, Dict[str, Optional[int]]]:
+    footprint = {}
+    with engine.connect() as conn:
+        for table in FOOTPRINT_TABLES:
+            rows = conn.execute(select(func.count()).select_from(text(table))).scalar()
+            if engine.dialect.name == 'postgresql':
+                size = conn.execute(text("SELECT pg_total_relation_size(:table)"), {'table': table}).scalar()
+            elif engine.dialect.name == 'sqlite':
+                try:
+                    size = conn.execute(text(
+                        "SELECT SUM(pgsize) FROM dbstat WHERE name IN "
+                        "(SELECT name FROM sqlite_master WHERE tbl_name = :table)"
+                    ), {'table': table}).scalar()
+                except Exception:
+                    size = None
+            else:
+                size = None
+            footprint[table] = {'rows': rows, 'bytes': size}
+    return footprint
+
+def main(argv: Optional[list] = None) -> int:
+    parser = argparse.ArgumentParser(description="Inspect or convert the events schema layout")
+    parser.add_argument('command', choices=['migrate', 'footprint'])
+    parser.add_argument('--batch-size', type=int, default=MIGRATION_BATCH_SIZE)
+    args = parser.parse_args(argv)
+    if args.command == 'migrate':
+        migrate_to_compact(get_engine(), args.batch_size)
+    print(json.dumps(table_footprint(get_engine()), indent=2))
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
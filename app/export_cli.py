@@ -0,0 +1,48 @@
+import argparse
+import sys
+from contextlib import redirect_stdout
+from pathlib import Path
+from typing import Optional
+from app.service.export_service import FORMATS, ExportFilters, ExportUnavailable, export_events
+
+def main(argv: Optional[list] = None) -> int:
+    parser = argparse.ArgumentParser(description="Stream the joined events view to NDJSON, CSV or Parquet")
+    parser.add_argument('--format', choices=list(FORMATS), default='ndjson')
+    parser.add_argument('--output', type=Path, help="defaults to stdout")
+    parser.add_argument('--year-from', type=int)
+    parser.add_argument('--year-to', type=int)
+    parser.add_argument('--country')
+    parser.add_argument('--group')
+    parser.add_argument('--source-db', choices=['GTD', 'RAND'])
+    parser.add_argument('--batch-size', type=int, help="rows per fetch and per Parquet row group")
+    args = parser.parse_args(argv)
+
+    filters = ExportFilters(
+        year_from=args.year_from,
+        year_to=args.year_to,
+        country=args.country,
+        group=args.group,
+        source_db=args.source_db
+    )
+    try:
+        chunks = export_events(filters, args.format, args.batch_size)
+    except ExportUnavailable as e:
+        print(str(e), file=sys.stderr)
+        return 2
+    if args.output is None:
+        out = sys.stdout.buffer
+        # keep stdout clean for the data; the export summary goes to stderr
+        with redirect_stdout(sys.stderr):
+            for chunk in chunks:
+                out.write(chunk)
+        out.flush()
+        return 0
+    tmp_path = args.output.with_suffix(args.output.suffix + '.tmp')
+    with open(tmp_path, 'wb') as out:
+        for chunk in chunks:
+            out.write(chunk)
+    tmp_path.replace(args.output)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,55 +1,250 @@
-from flask import Flask, jsonify
+from functools import partial
+from typing import Any, Dict, Optional
+from datetime import datetime
+from flask import Flask, Response, jsonify, request, stream_with_context
 from flask_cors import CORS
-from app.db.psql.database import engine
-from app.db.psql.init_data import standardize_data, seed_database
-from app.db.psql.models import Base
-from app.service.sql_to_elastic_service import transfer_data_to_elastic
-from app.service.init_elastic import create_index
-from app.utils.csv_reader import read_and_process_files
+from app.db.elastic.config import settings
+from app.db.elastic.models import Coordinates, SearchParams
+from app.service.init_job_service import InitInProgress, submit_init_job, get_job, load_run_report
+from app.service.psql_search_service import search_events_ndjson
+from app.utils.metrics import metrics
 
 app = Flask(__name__)
 CORS(app)
 scheduler = None
 
-def init_psql_db():
-    print("Initializing PostgreSQL database...")
-    Base.metadata.drop_all(bind=engine)
-    Base.metadata.create_all(bind=engine)
-    print("Reading and processing files...")
-    df_gtd, df_rand = read_and_process_files()
-    print("Standardizing data...")
-    df_merged = standardize_data(df_gtd, df_rand)
-    print("Seeding database...")
-    seed_database(df_merged)
-    print("PostgreSQL database initialization complete!")
-
-def init_elastic_db():
-    print("Initializing Elasticsearch...")
-    create_index()
-    print("Transferring data from PostgreSQL to Elasticsearch...")
-    transfer_data_to_elastic()
-    print("Elasticsearch initialization complete!")
-
-@app.route('/init_data')
+def _start_scheduler():
+    global scheduler
+    if not settings.NEWS_SCHEDULER_ENABLED or not settings.NEWS_API_KEY or not settings.GROQ_API_KEY:
+        print("News scheduler disabled (set NEWS_API_KEY and GROQ_API_KEY to enable it)")
+        return
+    from app.service.news_pipeline_service import start_news_scheduler
+    scheduler = start_news_scheduler()
+
+_start_scheduler()
+
+def _run_init(job, resume: bool):
+    # the seeding stack (pandas, NumPy, the CSV readers) is only needed once an init actually runs
+    from app.service.init_pipeline_service import run_init
+    run_init(job, resume)
+
+@app.route('/init_data', methods=['GET', 'POST'])
 def init_data():
     try:
-        # init_psql_db()
-        if not hasattr(app, 'initialized_elastic'):
-            init_elastic_db()
-            app.initialized_elastic = True
-            return jsonify({
-                "status": "success",
-                "message": "Databases initialized successfully"
-            })
+        resume = request.args.get('resume', str(settings.SEED_RESUME)).lower() in ('1', 'true', 'yes')
+        job = submit_init_job(partial(_run_init, resume=resume))
+        return jsonify({
+            "status": "accepted",
+            "job_id": job.job_id,
+            "message": "Database initialization started"
+        }), 202
+    except InitInProgress as e:
         return jsonify({
             "status": "info",
-            "message": "Databases already initialized"
-        })
+            "job_id": e.job_id,
+            "message": "Database initialization already running"
+        }), 409
     except Exception as e:
         return jsonify({
             "status": "error",
             "message": f"Error initializing databases: {str(e)}"
         }), 500
 
+@app.route('/init_data/<job_id>')
+def init_data_status(job_id: str):
+    job = get_job(job_id)
+    if job is None:
+        return jsonify({
+            "status": "error",
+            "message": f"Unknown job {job_id}"
+        }), 404
+    return jsonify(job.to_dict())
+
+@app.route('/init_data/<job_id>/report')
+def init_data_report(job_id: str):
+    report = load_run_report(job_id)
+    if report is None:
+        return jsonify({
+            "status": "error",
+            "message": f"No run report for job {job_id} (unknown, or still running)"
+        }), 404
+    return jsonify(report)
+
+def _int_arg(name: str) -> Optional[int]:
+    value = request.args.get(name)
+    return int(value) if value not in (None, '') else None
+
+def _date_arg(name: str) -> Optional[datetime]:
+    # request.args.get(type=...) would swallow the ValueError and silently drop the filter
+    value = request.args.get(name)
+    return datetime.fromisoformat(value) if value not in (None, '') else None
+
+def _rollup_filters() -> Dict[str, Any]:
+    from app.service.rollup_service import FILTERS
+    return {name: request.args.get(name, type=int) for name in FILTERS}
+
+def _rollup_response(result):
+    if result is None:
+        return jsonify({
+            "status": "error",
+            "message": "Analytics rollup has not been built yet"
+        }), 503
+    return jsonify(result)
+
+@app.route('/analytics/top')
+def analytics_top():
+    from app.service.rollup_service import DIMENSIONS, MEASURES, RATES, cached_query
+    by = request.args.get('by', 'attack_type')
+    measure = request.args.get('measure', 'killed')
+    n = min(request.args.get('n', 10, type=int), 100)
+    if by not in DIMENSIONS or measure not in MEASURES + list(RATES):
+        return jsonify({
+            "status": "error",
+            "message": f"by must be one of {list(DIMENSIONS)} and measure one of {MEASURES + list(RATES)}"
+        }), 400
+    filters = _rollup_filters()
+    params = (by, measure, n, tuple(sorted(filters.items())))
+    return _rollup_response(cached_query('top', params, lambda cube: cube.top(by, measure, n, filters)))
+
+@app.route('/analytics/timeseries')
+def analytics_timeseries():
+    from app.service.rollup_service import cached_query
+    interval = request.args.get('interval', 'year')
+    if interval not in ('year', 'month'):
+        return jsonify({
+            "status": "error",
+            "message": "interval must be 'year' or 'month'"
+        }), 400
+    filters = _rollup_filters()
+    params = (interval, tuple(sorted(filters.items())))
+    return _rollup_response(cached_query('timeseries', params, lambda cube: cube.time_series(interval, filters)))
+
+def _spatial_error(message: str, status: int = 400):
+    return jsonify({
+        "status": "error",
+        "message": message
+    }), status
+
+def _spatial_index():
+    from app.service.spatial_index_service import get_spatial_index
+    return get_spatial_index()
+
+def _bbox_args() -> Optional[Dict[str, float]]:
+    bbox = {name: request.args.get(name, type=float) for name in ('min_lat', 'min_lon', 'max_lat', 'max_lon')}
+    if any(value is None for value in bbox.values()) or bbox['min_lat'] > bbox['max_lat']:
+        return None
+    return bbox
+
+@app.route('/spatial/radius')
+def spatial_radius():
+    lat, lon = request.args.get('lat', type=float), request.args.get('lon', type=float)
+    km = request.args.get('km', 50.0, type=float)
+    limit = min(request.args.get('limit', 1000, type=int), 10000)
+    if lat is None or lon is None or km <= 0:
+        return _spatial_error("lat, lon and a positive km are required")
+    index = _spatial_index()
+    if index is None:
+        return _spatial_error("Spatial index has not been built yet", 503)
+    positions, distances = index.radius(Coordinates(lat=lat, lon=lon), km)
+    return jsonify({
+        "total": len(positions),
+        "events": index.describe(positions[:limit], distances[:limit])
+    })
+
+@app.route('/spatial/bbox')
+def spatial_bbox():
+    bbox = _bbox_args()
+    limit = min(request.args.get('limit', 1000, type=int), 10000)
+    if bbox is None:
+        return _spatial_error("min_lat, min_lon, max_lat and max_lon are required")
+    index = _spatial_index()
+    if index is None:
+        return _spatial_error("Spatial index has not been built yet", 503)
+    positions = index.bbox(**bbox)
+    return jsonify({
+        "total": len(positions),
+        "events": index.describe(positions[:limit])
+    })
+
+@app.route('/spatial/nearest')
+def spatial_nearest():
+    lat, lon = request.args.get('lat', type=float), request.args.get('lon', type=float)
+    k = min(request.args.get('k', 10, type=int), 1000)
+    if lat is None or lon is None or k <= 0:
+        return _spatial_error("lat, lon and a positive k are required")
+    index = _spatial_index()
+    if index is None:
+        return _spatial_error("Spatial index has not been built yet", 503)
+    positions, distances = index.nearest(Coordinates(lat=lat, lon=lon), k)
+    return jsonify({"events": index.describe(positions, distances)})
+
+@app.route('/spatial/clusters')
+def spatial_clusters():
+    bbox = _bbox_args()
+    zoom = request.args.get('zoom', 3, type=int)
+    if bbox is None or not 0 <= zoom <= 20:
+        return _spatial_error("min_lat, min_lon, max_lat, max_lon and a zoom between 0 and 20 are required")
+    index = _spatial_index()
+    if index is None:
+        return _spatial_error("Spatial index has not been built yet", 503)
+    return jsonify({"zoom": zoom, "clusters": index.clusters(zoom=zoom, **bbox)})
+
+@app.route('/search')
+def search():
+    try:
+        params = SearchParams(
+            query=request.args.get('query', ''),
+            start_date=_date_arg('start_date'),
+            end_date=_date_arg('end_date'),
+            limit=request.args.get('limit', 100, type=int),
+            source=request.args.get('source')
+        )
+        cursor = _int_arg('cursor')
+    except ValueError as e:
+        return jsonify({
+            "status": "error",
+            "message": f"Invalid search parameters: {str(e)}"
+        }), 400
+    return Response(
+        stream_with_context(search_events_ndjson(params, cursor)),
+        mimetype='application/x-ndjson'
+    )
+
+@app.route('/export')
+def export():
+    from app.service.export_service import FORMATS, ExportFilters, ExportUnavailable, export_events
+    export_format = request.args.get('format', 'ndjson')
+    try:
+        filters = ExportFilters(
+            year_from=_int_arg('year_from'),
+            year_to=_int_arg('year_to'),
+            country=request.args.get('country'),
+            group=request.args.get('group'),
+            source_db=request.args.get('source_db')
+        )
+        chunks = export_events(filters, export_format)
+    except ValueError as e:
+        return jsonify({
+            "status": "error",
+            "message": f"Invalid export parameters: {str(e)}"
+        }), 400
+    except ExportUnavailable as e:
+        return jsonify({
+            "status": "error",
+            "message": str(e)
+        }), 501
+    mimetype, extension = FORMATS[export_format]
+    return Response(
+        stream_with_context(chunks),
+        mimetype=mimetype,
+        headers={"Content-Disposition": f"attachment; filename=events.{extension}"}
+    )
+
+# the registry lives in this process: with several server workers each scrape sees one of them, and
+# counters start from zero on restart. Runs that must outlive that are read from /init_data/<job_id>/report.
+@app.route('/metrics')
+def metrics_endpoint():
+    return Response(metrics.render_prometheus(), mimetype='text/plain; version=0.0.4')
+
 if __name__ == '__main__':
     app.run(debug=True, port=5002)
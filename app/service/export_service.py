@@ -0,0 +1,175 @@
+import csv
+import io
+import json
+import time
+from dataclasses import dataclass
+from typing import Any, Iterator, List, Optional, Sequence, Tuple
+from sqlalchemy import func, select
+from sqlalchemy.sql import Select
+from app.db.elastic.config import settings
+from app.db.psql.database import get_engine
+from app.db.psql.models import (
+    AttackType, Casualties, City, Country, Event, Location, Region, TargetType, TerroristGroup
+)
+from app.utils.metrics import metrics
+
+FORMATS = {
+    'ndjson': ('application/x-ndjson', 'ndjson'),
+    'csv': ('text/csv', 'csv'),
+    'parquet': ('application/vnd.apache.parquet', 'parquet')
+}
+
+class ExportUnavailable(Exception):
+    pass
+
+@dataclass(frozen=True)
+class ExportFilters:
+    year_from: Optional[int] = None
+    year_to: Optional[int] = None
+    country: Optional[str] = None
+    group: Optional[str] = None
+    source_db: Optional[str] = None
+
+def build_export_query(filters: ExportFilters) -> Select:
+    # one flat select over explicit joins: no ORM objects, no per-row relationship loads
+    query = (
+        select(
+            Event.id.label('event_id'), Event.year, Event.month, Event.day, Event.summary,
+            Event.success, Event.suicide, Event.source_db, Event.merged_sources,
+            func.coalesce(Event.killed, Casualties.killed).label('killed'),
+            func.coalesce(Event.wounded, Casualties.wounded).label('wounded'),
+            func.coalesce(Event.property_damage, Casualties.property_damage).label('property_damage'),
+            func.coalesce(Event.property_value, Casualties.property_value).label('property_value'),
+            Location.latitude, Location.longitude,
+            City.name.label('city'), City.province, Country.name.label('country'), Region.name.label('region'),
+            TerroristGroup.group_name, AttackType.name.label('attack_type'), TargetType.name.label('target_type')
+        )
+        .select_from(Event)
+        .outerjoin(Casualties, Event.casualties_id == Casualties.id)
+        .outerjoin(Location, Event.location_id == Location.id)
+        .outerjoin(City, Location.city_id == City.id)
+        .outerjoin(Country, Location.country_id == Country.id)
+        .outerjoin(Region, Location.region_id == Region.id)
+        .outerjoin(TerroristGroup, Event.group_id == TerroristGroup.id)
+        .outerjoin(AttackType, Event.attack_type_id == AttackType.id)
+        .outerjoin(TargetType, Event.target_type_id == TargetType.id)
+    )
+    if filters.year_from is not None:
+        query = query.where(Event.year >= filters.year_from)
+    if filters.year_to is not None:
+        query = query.where(Event.year <= filters.year_to)
+    if filters.country:
+        query = query.where(Country.name == filters.country)
+    if filters.group:
+        query = query.where(TerroristGroup.group_name == filters.group)
+    if filters.source_db:
+        query = query.where(Event.source_db == filters.source_db)
+    return query.order_by(Event.id)
+
+EXPORT_COLUMNS: List[str] = list(build_export_query(ExportFilters()).selected_columns.keys())
+
+def _parquet_schema():
+    import pyarrow as pa
+    types = {
+        'event_id': pa.int64(), 'year': pa.int32(), 'month': pa.int32(), 'day': pa.int32(),
+        'success': pa.bool_(), 'suicide': pa.bool_(), 'killed': pa.int32(), 'wounded': pa.int32(),
+        'property_damage': pa.bool_(), 'property_value': pa.float64(),
+        'latitude': pa.float64(), 'longitude': pa.float64()
+    }
+    return pa.schema([(name, types.get(name, pa.string())) for name in EXPORT_COLUMNS])
+
+def parquet_available() -> bool:
+    try:
+        import pyarrow.parquet  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+def row_batches(filters: ExportFilters, batch_size: Optional[int] = None) -> Iterator[Sequence[Any]]:
+    batch_size = batch_size or settings.EXPORT_BATCH_SIZE
+    query = build_export_query(filters)
+    with get_engine().connect() as conn:
+        # a server-side cursor on PostgreSQL, so memory stays at one batch however large the export is
+        result = conn.execution_options(stream_results=True, yield_per=batch_size).execute(query)
+        for rows in result.partitions():
+            yield rows
+
+def _counted(chunks: Iterator[Tuple[bytes, int]], export_format: str) -> Iterator[bytes]:
+    started = time.perf_counter()
+    rows = 0
+    for chunk, count in chunks:
+        rows += count
+        yield chunk
+    seconds = time.perf_counter() - started
+    metrics.inc('export_rows_total', rows, format=export_format)
+    metrics.inc('export_seconds_total', seconds, format=export_format)
+    print(f"Exported {rows} rows as {export_format} in {seconds:.1f}s")
+
+def _ndjson_chunks(batches: Iterator[Sequence[Any]]) -> Iterator[Tuple[bytes, int]]:
+    encode = json.JSONEncoder(separators=(',', ':'), default=str).encode
+    for rows in batches:
+        yield ''.join(
+            encode(dict(zip(EXPORT_COLUMNS, row))) + '\n' for row in rows
+        ).encode(), len(rows)
+
+def _csv_chunks(batches: Iterator[Sequence[Any]]) -> Iterator[Tuple[bytes, int]]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+    for rows in batches:
+        writer.writerows(rows)
+        yield buffer.getvalue().encode(), len(rows)
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode(), 0
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file that hands back whatever the Parquet writer produced since the last drain."""
+
+    def __init__(self):
+        super().__init__()
+        self._chunks: List[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
+def _parquet_chunks(batches: Iterator[Sequence[Any]]) -> Iterator[Tuple[bytes, int]]:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    schema = _parquet_schema()
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, schema, compression='zstd')
+    try:
+        for rows in batches:
+            # each batch becomes one row group, written out before the next batch is read
+            columns = list(zip(*rows))
+            writer.write_table(pa.Table.from_arrays(
+                [pa.array(column, type=field.type) for column, field in zip(columns, schema)], schema=schema
+            ))
+            yield sink.drain(), len(rows)
+    finally:
+        writer.close()
+    yield sink.drain(), 0
+
+def export_events(filters: ExportFilters, export_format: str, batch_size: Optional[int] = None) -> Iterator[bytes]:
+    if export_format not in FORMATS:
+        raise ValueError(f"format must be one of {list(FORMATS)}")
+    if export_format == 'parquet' and not parquet_available():
+        raise ExportUnavailable("Parquet export needs pyarrow, which is not installed")
+    chunks = {'ndjson': _ndjson_chunks, 'csv': _csv_chunks, 'parquet': _parquet_chunks}[export_format]
+    return _counted(chunks(row_batches(filters, batch_size)), export_format)
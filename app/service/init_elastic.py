@@ -0,0 +1,92 @@
+from datetime import datetime
+from typing import List
+from app.db.elastic.config import Config, settings
+from app.db.elastic.elastic_connect import get_elastic_client
+
+TERROR_EVENT_MAPPINGS = {
+    "properties": {
+        "title": {"type": "text"},
+        "content": {"type": "text"},
+        "publication_date": {"type": "date"},
+        "category": {"type": "keyword"},
+        "location": {"type": "keyword"},
+        "confidence": {"type": "float"},
+        "source_url": {"type": "keyword"},
+        "coordinates": {"type": "geo_point"}
+    }
+}
+
+BULK_LOAD_SETTINGS = {
+    "number_of_replicas": 0,
+    "refresh_interval": "-1"
+}
+
+def versioned_index_name(alias: str) -> str:
+    return f"{alias}_v{datetime.now():%Y%m%d%H%M%S}"
+
+def index_versions(alias: str) -> List[str]:
+    return sorted(get_elastic_client().indices.get(index=f"{alias}_v*").keys())
+
+def create_index(alias: str = Config.ES_INDEX_FOR_TERROR) -> str:
+    index_name = versioned_index_name(alias)
+    get_elastic_client().indices.create(
+        index=index_name,
+        mappings=TERROR_EVENT_MAPPINGS,
+        settings={**BULK_LOAD_SETTINGS, "number_of_shards": settings.ES_INDEX_SHARDS}
+    )
+    print(f"Created index {index_name} for bulk loading")
+    return index_name
+
+def swap_alias(index_name: str, alias: str = Config.ES_INDEX_FOR_TERROR):
+    client = get_elastic_client()
+    actions = []
+    if client.indices.exists_alias(name=alias):
+        for current in client.indices.get_alias(name=alias).keys():
+            actions.append({"remove": {"index": current, "alias": alias}})
+    elif client.indices.exists(index=alias):
+        # an index created before aliases were used occupies the alias name
+        actions.append({"remove_index": {"index": alias}})
+    actions.append({"add": {"index": index_name, "alias": alias}})
+    client.indices.update_aliases(actions=actions)
+    print(f"Alias {alias} now points to {index_name}")
+
+def delete_old_versions(alias: str = Config.ES_INDEX_FOR_TERROR, keep: int = settings.ES_INDEX_VERSIONS_TO_KEEP):
+    client = get_elastic_client()
+    aliased = set()
+    if client.indices.exists_alias(name=alias):
+        aliased = set(client.indices.get_alias(name=alias).keys())
+    stale = [name for name in index_versions(alias) if name not in aliased]
+    for name in stale[:max(len(stale) - max(keep - len(aliased), 0), 0)]:
+        print(f"Deleting old index version {name}")
+        client.indices.delete(index=name)
+
+def finalize_index(index_name: str, alias: str = Config.ES_INDEX_FOR_TERROR):
+    client = get_elastic_client()
+    client.indices.put_settings(
+        index=index_name,
+        settings={"index": {
+            "number_of_replicas": settings.ES_INDEX_REPLICAS,
+            "refresh_interval": settings.ES_REFRESH_INTERVAL
+        }}
+    )
+    client.indices.refresh(index=index_name)
+    print(f"Force-merging {index_name}...")
+    client.options(request_timeout=settings.ES_FORCEMERGE_TIMEOUT).indices.forcemerge(
+        index=index_name, max_num_segments=1
+    )
+    swap_alias(index_name, alias)
+    delete_old_versions(alias)
+
+def index_exists(index_name: str) -> bool:
+    return bool(get_elastic_client().indices.exists(index=index_name))
+
+def discard_index(index_name: str):
+    if index_exists(index_name):
+        print(f"Discarding incomplete index {index_name}")
+        get_elastic_client().indices.delete(index=index_name)
+
+def ensure_index(alias: str = Config.ES_INDEX_FOR_NEWS):
+    if get_elastic_client().indices.exists(index=alias):
+        return
+    index_name = create_index(alias)
+    finalize_index(index_name, alias)
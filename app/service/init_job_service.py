@@ -0,0 +1,151 @@
+import fcntl
+import json
+import os
+import re
+import time
+import traceback
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field, asdict
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, TextIO
+from app.db.elastic.config import settings
+
+STATE_DIR = Path(settings.INIT_STATE_DIR)
+LOCK_FILE = STATE_DIR / "init.lock"
+PROGRESS_SAVE_INTERVAL = 1.0
+JOB_ID_PATTERN = re.compile(r"[0-9a-f]{32}")
+
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="init-job")
+
+class InitInProgress(Exception):
+    def __init__(self, job_id: str):
+        super().__init__(f"Initialization {job_id} is already running")
+        self.job_id = job_id
+
+@dataclass
+class InitJob:
+    job_id: str
+    status: str = "queued"
+    stage: Optional[str] = None
+    rows_processed: int = 0
+    rows_total: Optional[int] = None
+    created_at: float = field(default_factory=time.time)
+    stage_started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    errors: List[str] = field(default_factory=list)
+    _last_saved: float = field(default=0.0, repr=False)
+
+    @property
+    def path(self) -> Path:
+        return STATE_DIR / f"{self.job_id}.json"
+
+    @property
+    def report_path(self) -> Path:
+        return Path(settings.METRICS_REPORT_DIR) / f"init-{self.job_id}.json"
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = {k: v for k, v in asdict(self).items() if not k.startswith('_')}
+        elapsed = (self.finished_at or time.time()) - (self.stage_started_at or self.created_at)
+        rows_per_sec = self.rows_processed / elapsed if elapsed > 0 else 0.0
+        remaining = (self.rows_total or 0) - self.rows_processed
+        data['rows_per_sec'] = round(rows_per_sec, 1)
+        running = rows_per_sec and remaining > 0 and not self.finished_at
+        data['eta_seconds'] = round(remaining / rows_per_sec, 1) if running else None
+        return data
+
+    def save(self):
+        STATE_DIR.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix('.tmp')
+        tmp_path.write_text(json.dumps(self.to_dict()))
+        os.replace(tmp_path, self.path)
+        self._last_saved = time.monotonic()
+
+    def set_stage(self, stage: str):
+        print(f"Init job {self.job_id}: {stage}")
+        self.stage = stage
+        self.stage_started_at = time.time()
+        self.rows_processed = 0
+        self.rows_total = None
+        self.save()
+
+    def progress(self, rows_processed: int, rows_total: Optional[int] = None):
+        self.rows_processed = rows_processed
+        self.rows_total = rows_total
+        if time.monotonic() - self._last_saved >= PROGRESS_SAVE_INTERVAL:
+            self.save()
+
+    @classmethod
+    def load(cls, job_id: str) -> Optional['InitJob']:
+        if not JOB_ID_PATTERN.fullmatch(job_id):
+            return None
+        path = STATE_DIR / f"{job_id}.json"
+        if not path.exists():
+            return None
+        data = json.loads(path.read_text())
+        data.pop('rows_per_sec', None)
+        data.pop('eta_seconds', None)
+        return cls(**data)
+
+def _lock_held() -> bool:
+    if not LOCK_FILE.exists():
+        return False
+    with open(LOCK_FILE) as lock:
+        try:
+            fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            return True
+        fcntl.flock(lock, fcntl.LOCK_UN)
+        return False
+
+def _run_job(job: InitJob, run: Callable[[InitJob], None], lock: TextIO):
+    try:
+        job.status = "running"
+        job.save()
+        run(job)
+        job.status = "succeeded"
+    except Exception as e:
+        traceback.print_exc()
+        job.status = "failed"
+        job.errors.append(str(e))
+    finally:
+        job.finished_at = time.time()
+        job.save()
+        fcntl.flock(lock, fcntl.LOCK_UN)
+        lock.close()
+
+def submit_init_job(run: Callable[[InitJob], None]) -> InitJob:
+    STATE_DIR.mkdir(parents=True, exist_ok=True)
+    lock = open(LOCK_FILE, 'a+')
+    try:
+        fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        lock.seek(0)
+        running_job_id = lock.read().strip()
+        lock.close()
+        raise InitInProgress(running_job_id)
+    job = InitJob(job_id=uuid.uuid4().hex)
+    lock.seek(0)
+    lock.truncate()
+    lock.write(job.job_id)
+    lock.flush()
+    job.save()
+    _executor.submit(_run_job, job, run, lock)
+    return job
+
+def get_job(job_id: str) -> Optional[InitJob]:
+    job = InitJob.load(job_id)
+    if job and job.status in ("queued", "running") and not _lock_held():
+        job.status = "failed"
+        job.errors.append("Init worker exited before finishing")
+        job.finished_at = time.time()
+        job.save()
+    return job
+
+def load_run_report(job_id: str) -> Optional[Dict[str, Any]]:
+    if not JOB_ID_PATTERN.fullmatch(job_id):
+        return None
+    path = InitJob(job_id=job_id).report_path
+    if not path.exists():
+        return None
+    return json.loads(path.read_text())
@@ -0,0 +1,172 @@
+from typing import Optional
+from sqlalchemy import inspect, select
+from sqlalchemy.engine import Engine
+from app.data.cache import load_standardized_data
+from app.db.elastic.config import settings
+from app.db.psql.bulk_seed import seed_database_bulk, seed_database_stream
+from app.db.psql.checkpoints import (
+    ELASTIC_STAGE, POSTGRES_STAGE, clear_stage, last_checkpoint, load_checkpoints, remaining_rows
+)
+from app.db.psql.database import get_engine
+from app.db.psql.dedup import deduplicate_events
+from app.db.psql.incremental_load import ensure_delta_columns, load_incremental
+from app.db.psql.init_data import standardize_data, seed_database, stream_standardized_data
+from app.db.psql.indexes import create_secondary_indexes, drop_secondary_indexes
+from app.db.psql.models import Base, Event, SeedCheckpoint, refresh_event_facts
+from app.db.psql.parallel_seed import seed_database_parallel
+from app.db.psql.schema_layout import compact_layout, migrate_to_compact
+from app.service.init_job_service import InitJob
+from app.service.news_memo_service import warm_place_memo
+from app.service.rollup_service import rebuild_cube
+from app.service.spatial_index_service import rebuild_spatial_index
+from app.service.sql_to_elastic_service import transfer_data_to_elastic
+from app.service.init_elastic import create_index, discard_index, finalize_index, index_exists
+from app.utils.compact_frame import compact_event_frame, memory_usage_report
+from app.utils.csv_reader import read_and_process_files
+from app.utils.memory import MemoryReport
+from app.utils.metrics import start_run, write_run_report
+
+def _set_stage(job: Optional[InitJob], stage: str):
+    if job:
+        job.set_stage(stage)
+
+def _finalize_psql(job: Optional[InitJob], full_spatial_rebuild: bool = True):
+    engine = get_engine()
+    _set_stage(job, "postgres:indexes")
+    create_secondary_indexes(engine)
+    refresh_event_facts(engine)
+    _set_stage(job, "postgres:rollup")
+    rebuild_cube(engine)
+    _set_stage(job, "postgres:spatial_index")
+    rebuild_spatial_index(engine, full=full_spatial_rebuild)
+    if settings.NEWS_MEMO_ENABLED:
+        _set_stage(job, "postgres:geocode_memo")
+        warm_place_memo(engine)
+
+def _resumable(engine: Engine) -> bool:
+    inspector = inspect(engine)
+    if not inspector.has_table('events'):
+        return True
+    if inspector.has_table(SeedCheckpoint.__tablename__) and load_checkpoints(engine, POSTGRES_STAGE):
+        return True
+    with engine.connect() as conn:
+        seeded = conn.execute(select(Event.id).limit(1)).first() is not None
+    if seeded:
+        # without checkpoints there is no telling which rows are in, and reseeding on top would duplicate them
+        print("Nothing to resume from: events already holds rows but there are no checkpoints; running a full load")
+    return not seeded
+
+def _prepare_schema(engine: Engine, resume: bool):
+    incremental = settings.SEED_MODE == 'incremental'
+    if not incremental and not resume:
+        Base.metadata.drop_all(bind=engine)
+    if incremental and inspect(engine).has_table('events'):
+        # the event_facts view created alongside the tables selects the delta columns, so older tables need them first
+        ensure_delta_columns(engine)
+    Base.metadata.create_all(bind=engine)
+    if not incremental:
+        drop_secondary_indexes(engine)
+
+def init_psql_db(job: Optional[InitJob] = None, resume: bool = False):
+    engine = get_engine()
+    print("Initializing PostgreSQL database...")
+    progress = job.progress if job else None
+    resume = resume and settings.SEED_MODE != 'incremental' and _resumable(engine)
+    _set_stage(job, "postgres:schema")
+    _prepare_schema(engine, resume)
+    checkpoints = load_checkpoints(engine, POSTGRES_STAGE) if resume else []
+    if checkpoints:
+        print(f"Resuming after {len(checkpoints)} checkpoints (last source row {checkpoints[-1].last_offset})")
+    if settings.SEED_MODE == 'stream':
+        print(f"Streaming files into the database in chunks of {settings.CSV_CHUNK_SIZE}...")
+        _set_stage(job, "postgres:seed")
+        memory_report = MemoryReport()
+        chunks = (
+            remaining_rows(chunk, checkpoints)
+            for chunk in stream_standardized_data(settings.CSV_CHUNK_SIZE, memory_report)
+        )
+        seed_database_stream(
+            chunks, batch_size=settings.SEED_BATCH_SIZE, memory_report=memory_report, progress=progress
+        )
+        memory_report.print_report()
+        _finalize_psql(job)
+        print("PostgreSQL database initialization complete!")
+        return
+    _set_stage(job, "postgres:load")
+    compact = settings.COMPACT_FRAMES and settings.SEED_MODE != 'rows'
+    if settings.DATA_CACHE_ENABLED:
+        df_merged = load_standardized_data(force_rebuild=settings.REBUILD_DATA_CACHE, keep_nan=compact)
+    else:
+        print("Reading and processing files...")
+        df_gtd, df_rand = read_and_process_files(keep_nan=compact)
+        print("Standardizing data...")
+        df_merged = standardize_data(df_gtd, df_rand)
+    if settings.DEDUP_ENABLED:
+        print("Deduplicating overlapping GTD and RAND incidents...")
+        df_merged = deduplicate_events(df_merged, threshold=settings.DEDUP_THRESHOLD)
+    if compact:
+        print("Compacting merged frame...")
+        df_compact = compact_event_frame(df_merged)
+        memory_usage_report(df_merged, df_compact)
+        df_merged = df_compact
+    if checkpoints:
+        total_rows = len(df_merged)
+        df_merged = remaining_rows(df_merged, checkpoints)
+        print(f"{len(df_merged)} of {total_rows} rows remain after the last checkpoint")
+    print(f"Seeding database ({settings.SEED_MODE} mode)...")
+    _set_stage(job, "postgres:seed")
+    if settings.SEED_MODE == 'rows':
+        seed_database(df_merged)
+    elif settings.SEED_MODE == 'parallel':
+        seed_database_parallel(
+            df_merged, workers=settings.SEED_WORKERS, batch_size=settings.SEED_BATCH_SIZE, progress=progress
+        )
+    elif settings.SEED_MODE == 'incremental':
+        ensure_delta_columns(engine)
+        if compact_layout():
+            migrate_to_compact(engine)
+        delta = load_incremental(
+            df_merged,
+            delete_missing=settings.INCREMENTAL_DELETE_MISSING,
+            batch_size=settings.SEED_BATCH_SIZE,
+            progress=progress
+        )
+        _finalize_psql(job, full_spatial_rebuild=delta.updated > 0)
+        print("PostgreSQL database initialization complete!")
+        return
+    else:
+        seed_database_bulk(df_merged, batch_size=settings.SEED_BATCH_SIZE, progress=progress)
+    _finalize_psql(job)
+    print("PostgreSQL database initialization complete!")
+
+def init_elastic_db(job: Optional[InitJob] = None, resume: bool = False):
+    engine = get_engine()
+    print("Initializing Elasticsearch...")
+    _set_stage(job, "elasticsearch:transfer")
+    checkpoint = last_checkpoint(engine, ELASTIC_STAGE) if resume else None
+    if checkpoint and index_exists(checkpoint.target):
+        index_name, after_event_id = checkpoint.target, checkpoint.last_offset
+    else:
+        clear_stage(engine, ELASTIC_STAGE)
+        index_name, after_event_id = create_index(), 0
+    print("Transferring data from PostgreSQL to Elasticsearch...")
+    try:
+        transfer_data_to_elastic(index_name, progress=job.progress if job else None, after_event_id=after_event_id)
+    except Exception:
+        checkpoint = last_checkpoint(engine, ELASTIC_STAGE)
+        if checkpoint and checkpoint.target == index_name:
+            print(f"Keeping {index_name} so the transfer can resume from event {checkpoint.last_offset}")
+        else:
+            discard_index(index_name)
+        raise
+    _set_stage(job, "elasticsearch:finalize")
+    finalize_index(index_name)
+    print("Elasticsearch initialization complete!")
+
+def run_init(job: InitJob, resume: bool = False):
+    baseline = start_run()
+    try:
+        init_psql_db(job, resume)
+        init_elastic_db(job, resume)
+    finally:
+        write_run_report(job.report_path, baseline)
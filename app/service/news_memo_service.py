@@ -0,0 +1,180 @@
+import hashlib
+import re
+import sys
+import threading
+import unicodedata
+from typing import Any, Dict, List, Optional
+from sqlalchemy import func, select
+from sqlalchemy.engine import Engine
+from app.db.elastic.config import settings
+from app.db.elastic.models import NewsCategory, NewsClassification
+from app.db.elastic.models.elastic_models import Coordinates
+from app.db.psql.database import get_engine
+from app.db.psql.models import City, Country, Location
+from app.utils.memo_store import MemoStore
+from app.utils.metrics import metrics
+
+CLASSIFICATION_NAMESPACE = 'classification'
+GEOCODE_NAMESPACE = 'geocode'
+WARM_BATCH_SIZE = 5000
+
+_memo_lock = threading.Lock()
+_memos: Dict[str, MemoStore] = {}
+
+def _memo(namespace: str, ttl: float, negative_ttl: float) -> MemoStore:
+    with _memo_lock:
+        if namespace not in _memos:
+            _memos[namespace] = MemoStore(
+                namespace,
+                settings.NEWS_MEMO_PATH,
+                memory_size=settings.NEWS_MEMO_MEMORY_SIZE,
+                ttl=ttl,
+                negative_ttl=negative_ttl,
+                max_rows=settings.NEWS_MEMO_MAX_ROWS
+            )
+        return _memos[namespace]
+
+def classification_memo() -> MemoStore:
+    return _memo(CLASSIFICATION_NAMESPACE, settings.CLASSIFICATION_MEMO_TTL, settings.CLASSIFICATION_MEMO_TTL)
+
+def geocode_memo() -> MemoStore:
+    return _memo(GEOCODE_NAMESPACE, settings.GEOCODE_MEMO_TTL, settings.GEOCODE_NEGATIVE_TTL)
+
+def reset_memos():
+    with _memo_lock:
+        for memo in _memos.values():
+            memo.close()
+        _memos.clear()
+
+def normalize_text(value: str) -> str:
+    value = unicodedata.normalize('NFKD', value or '').encode('ascii', 'ignore').decode()
+    return re.sub(r'\s+', ' ', re.sub(r'[^\w\s,]', ' ', value.casefold())).strip()
+
+def normalize_place(name: str) -> str:
+    return ', '.join(part.strip() for part in normalize_text(name).split(',') if part.strip())
+
+def classification_key(title: str, body: str) -> str:
+    # syndicated copies differ in whitespace, casing and punctuation but classify the same
+    content = f"{settings.GROQ_MODEL}\n{normalize_text(title)}\n{normalize_text(body)}"
+    return hashlib.sha256(content.encode()).hexdigest()
+
+def _to_memo(classification: NewsClassification) -> Dict[str, Any]:
+    coordinates = classification.coordinates
+    return {
+        'category': classification.category.value,
+        'location': classification.location,
+        'confidence': classification.confidence,
+        'latitude': coordinates.latitude if coordinates else None,
+        'longitude': coordinates.longitude if coordinates else None
+    }
+
+def _from_memo(value: Dict[str, Any]) -> NewsClassification:
+    coordinates = None
+    if value.get('latitude') is not None and value.get('longitude') is not None:
+        coordinates = Coordinates(latitude=value['latitude'], longitude=value['longitude'])
+    return NewsClassification(
+        category=NewsCategory(value['category']),
+        location=value['location'],
+        confidence=value['confidence'],
+        coordinates=coordinates
+    )
+
+def cached_classifications(keys: List[str]) -> List[Optional[NewsClassification]]:
+    found = classification_memo().get_many(keys)
+    return [_from_memo(found[key]) if found.get(key) else None for key in keys]
+
+def remember_classifications(keys: List[str], classifications: List[Optional[NewsClassification]]):
+    classification_memo().put_many(
+        (key, _to_memo(classification))
+        for key, classification in zip(keys, classifications) if classification is not None
+    )
+
+def _place_candidates(location: str) -> List[str]:
+    place = normalize_place(location)
+    parts = place.split(', ')
+    # "Kabul, Kabul Province, Afghanistan" also tries "kabul, afghanistan", "kabul" and "afghanistan"
+    candidates = [place, f"{parts[0]}, {parts[-1]}", parts[0], parts[-1]]
+    return [candidate for candidate in dict.fromkeys(candidates) if candidate and candidate != 'unknown']
+
+def geocode(location: str) -> Optional[Coordinates]:
+    candidates = _place_candidates(location)
+    if not candidates:
+        return None
+    found = geocode_memo().get_many(candidates)
+    for candidate in candidates:
+        value = found.get(candidate)
+        if value:
+            return Coordinates(latitude=value['lat'], longitude=value['lon'])
+    if candidates[0] not in found:
+        # nothing known about this place; remember that so it is not looked up again for a while
+        geocode_memo().put(candidates[0], None)
+        metrics.inc('geocode_unresolved_total')
+    return None
+
+def remember_place(location: str, coordinates: Coordinates):
+    place = normalize_place(location)
+    if place and place != 'unknown':
+        geocode_memo().put(place, {'lat': coordinates.latitude, 'lon': coordinates.longitude})
+
+def resolve_coordinates(classification: NewsClassification) -> NewsClassification:
+    if classification.coordinates is not None:
+        remember_place(classification.location, classification.coordinates)
+        return classification
+    coordinates = geocode(classification.location)
+    if coordinates is None:
+        return classification
+    return NewsClassification(
+        category=classification.category,
+        location=classification.location,
+        confidence=classification.confidence,
+        coordinates=coordinates
+    )
+
+def warm_place_memo(engine: Engine) -> int:
+    places = (
+        select(
+            City.name,
+            Country.name,
+            func.avg(Location.latitude),
+            func.avg(Location.longitude),
+            func.count()
+        )
+        .select_from(Location)
+        .join(City, Location.city_id == City.id)
+        .outerjoin(Country, Location.country_id == Country.id)
+        .where(Location.latitude.isnot(None), Location.longitude.isnot(None))
+        .group_by(City.name, Country.name)
+        # ambiguous bare city names end up pointing at the most frequently attacked one
+        .order_by(func.count())
+    )
+    countries = (
+        select(Country.name, func.avg(Location.latitude), func.avg(Location.longitude))
+        .select_from(Location)
+        .join(Country, Location.country_id == Country.id)
+        .where(Location.latitude.isnot(None), Location.longitude.isnot(None))
+        .group_by(Country.name)
+    )
+    entries: Dict[str, Dict[str, float]] = {}
+    with engine.connect() as conn:
+        for country, lat, lon in conn.execute(countries):
+            entries[normalize_place(country)] = {'lat': float(lat), 'lon': float(lon)}
+        for city, country, lat, lon, _ in conn.execute(places):
+            if normalize_place(city) in ('', 'unknown'):
+                continue
+            value = {'lat': float(lat), 'lon': float(lon)}
+            entries[normalize_place(city)] = value
+            if country:
+                entries[normalize_place(f"{city}, {country}")] = value
+    entries.pop('', None)
+    entries.pop('unknown', None)
+    memo = geocode_memo()
+    items = list(entries.items())
+    for start in range(0, len(items), WARM_BATCH_SIZE):
+        memo.put_many(items[start:start + WARM_BATCH_SIZE])
+    metrics.set('geocode_memo_warm_places', len(items))
+    print(f"Warmed the geocode memo with {len(items)} places")
+    return len(items)
+
+if __name__ == '__main__':
+    warm_place_memo(get_engine())
+    sys.exit(0)
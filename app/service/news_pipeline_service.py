@@ -0,0 +1,387 @@
+import asyncio
+import fcntl
+import json
+import sys
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Deque, Dict, List, Optional, TextIO, Tuple
+import aiohttp
+from elasticsearch import helpers
+from app.db.elastic.config import settings
+from app.db.elastic.elastic_connect import get_elastic_client
+from app.db.elastic.models import Coordinates, NewsCategory, NewsClassification, TerrorEvent
+from app.db.elastic.models.elastic_models import Coordinates as ClassifiedCoordinates
+from app.service.init_elastic import ensure_index
+from app.service.news_memo_service import (
+    cached_classifications, classification_key, remember_classifications, resolve_coordinates
+)
+from app.utils.metrics import metrics
+from app.utils.ttl_cache import TTLCache
+
+NEWS_KEYWORDS = ['terror attack', 'terrorism', 'bombing', 'militant attack']
+NEWS_CATEGORIES = {NewsCategory.TERROR_EVENT.value, NewsCategory.GENERAL_NEWS.value}
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+ARTICLE_BODY_CHARS = 600
+SEEN_ARTICLES_MAX = 20000
+SEEN_ARTICLES_TTL = 24 * 3600
+DEFERRED_ARTICLES_MAX = 1000
+SCHEDULER_LOCK_FILE = Path(settings.INIT_STATE_DIR) / "news_scheduler.lock"
+
+CLASSIFY_PROMPT = (
+    "You classify news articles. For every numbered article decide whether it reports a specific "
+    "terror attack (\"terror_event\") or is anything else (\"general_news\"). Give the most specific "
+    "location mentioned, a confidence between 0 and 1, and the approximate latitude and longitude of "
+    "that location or null when unknown. Answer with a JSON object of the form "
+    "{\"articles\": [{\"index\": 0, \"category\": \"terror_event\", \"location\": \"Kabul, Afghanistan\", "
+    "\"confidence\": 0.9, \"latitude\": 34.5, \"longitude\": 69.2}]} covering every article."
+)
+
+_seen_articles = TTLCache(maxsize=SEEN_ARTICLES_MAX, ttl=SEEN_ARTICLES_TTL)
+_deferred_articles: Deque[Dict[str, Any]] = deque(maxlen=DEFERRED_ARTICLES_MAX)
+_scheduler_lock: Optional[TextIO] = None
+
+@dataclass
+class NewsCycleReport:
+    fetched: int = 0
+    duplicates: int = 0
+    classified: int = 0
+    failed: int = 0
+    indexed: int = 0
+    deferred: int = 0
+    seconds: float = 0.0
+
+    def print_summary(self):
+        print(
+            f"News cycle finished in {self.seconds:.1f}s: {self.fetched} fetched, "
+            f"{self.duplicates} already seen, {self.classified} classified, {self.indexed} indexed, "
+            f"{self.failed} failed, {self.deferred} deferred to the next cycle"
+        )
+
+def client_session() -> aiohttp.ClientSession:
+    return aiohttp.ClientSession(
+        connector=aiohttp.TCPConnector(limit=settings.NEWS_HTTP_CONCURRENCY),
+        timeout=aiohttp.ClientTimeout(total=settings.NEWS_HTTP_TIMEOUT)
+    )
+
+async def _request_json(session: aiohttp.ClientSession, url: str, **kwargs) -> Dict[str, Any]:
+    for attempt in range(settings.NEWS_HTTP_RETRIES + 1):
+        last_attempt = attempt == settings.NEWS_HTTP_RETRIES
+        try:
+            async with session.post(url, **kwargs) as response:
+                if response.status not in RETRY_STATUSES or last_attempt:
+                    response.raise_for_status()
+                    return await response.json(content_type=None)
+                metrics.inc('news_http_retries_total', status=response.status)
+        except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+            if last_attempt:
+                raise
+            metrics.inc('news_http_retries_total', status='connection')
+        await asyncio.sleep(settings.NEWS_HTTP_BACKOFF * 2 ** attempt)
+
+async def fetch_page(session: aiohttp.ClientSession, page: int) -> List[Dict[str, Any]]:
+    data = await _request_json(session, settings.NEWS_API_URL, json={
+        "action": "getArticles",
+        "keyword": NEWS_KEYWORDS,
+        "keywordOper": "or",
+        "lang": "eng",
+        "articlesPage": page,
+        "articlesCount": settings.MAX_ARTICLES_PER_FETCH,
+        "articlesSortBy": "date",
+        "articlesSortByAsc": False,
+        "resultType": "articles",
+        "apiKey": settings.NEWS_API_KEY
+    })
+    return data.get('articles', {}).get('results', [])
+
+def _to_classification(item: Optional[Dict[str, Any]]) -> Optional[NewsClassification]:
+    if not item or item.get('category') not in NEWS_CATEGORIES:
+        return None
+    coordinates = None
+    latitude, longitude = item.get('latitude'), item.get('longitude')
+    if isinstance(latitude, (int, float)) and isinstance(longitude, (int, float)):
+        if -90 <= latitude <= 90 and -180 <= longitude <= 180:
+            coordinates = ClassifiedCoordinates(latitude=float(latitude), longitude=float(longitude))
+    try:
+        confidence = min(max(float(item.get('confidence') or 0.0), 0.0), 1.0)
+    except (TypeError, ValueError):
+        confidence = 0.0
+    return NewsClassification(
+        category=NewsCategory(item['category']),
+        location=str(item.get('location') or 'Unknown'),
+        confidence=confidence,
+        coordinates=coordinates
+    )
+
+async def classify_batch(
+        session: aiohttp.ClientSession,
+        articles: List[Dict[str, Any]]
+) -> List[Optional[NewsClassification]]:
+    listing = "\n\n".join(
+        f"[{i}] {article.get('title', '')}\n{(article.get('body') or '')[:ARTICLE_BODY_CHARS]}"
+        for i, article in enumerate(articles)
+    )
+    data = await _request_json(
+        session,
+        settings.GROQ_API_URL,
+        headers={"Authorization": f"Bearer {settings.GROQ_API_KEY}"},
+        json={
+            "model": settings.GROQ_MODEL,
+            "temperature": 0,
+            "response_format": {"type": "json_object"},
+            "messages": [
+                {"role": "system", "content": CLASSIFY_PROMPT},
+                {"role": "user", "content": listing}
+            ]
+        }
+    )
+    content = json.loads(data['choices'][0]['message']['content'])
+    by_index = {
+        item.get('index'): item
+        for item in content.get('articles', []) if isinstance(item, dict)
+    }
+    return [_to_classification(by_index.get(i)) for i in range(len(articles))]
+
+async def classify_articles(
+        session: aiohttp.ClientSession,
+        articles: List[Dict[str, Any]]
+) -> List[Optional[NewsClassification]]:
+    if not settings.NEWS_MEMO_ENABLED:
+        return await classify_batch(session, articles)
+    keys = [
+        classification_key(article.get('title') or '', (article.get('body') or '')[:ARTICLE_BODY_CHARS])
+        for article in articles
+    ]
+    classifications = cached_classifications(keys)
+    misses = [i for i, classification in enumerate(classifications) if classification is None]
+    if misses:
+        fresh = await classify_batch(session, [articles[i] for i in misses])
+        remember_classifications([keys[i] for i in misses], fresh)
+        for i, classification in zip(misses, fresh):
+            classifications[i] = classification
+    metrics.inc('news_classify_memo_hits_total', len(articles) - len(misses))
+    return [resolve_coordinates(c) if c is not None else None for c in classifications]
+
+def _publication_date(article: Dict[str, Any]) -> datetime:
+    for field in ('dateTime', 'date'):
+        value = article.get(field)
+        if isinstance(value, str) and value:
+            try:
+                return datetime.fromisoformat(value.replace('Z', '+00:00'))
+            except ValueError:
+                continue
+    return datetime.now(timezone.utc)
+
+def to_terror_event(article: Dict[str, Any], classification: NewsClassification) -> TerrorEvent:
+    coordinates = classification.coordinates
+    return TerrorEvent(
+        title=article.get('title') or '',
+        content=article.get('body') or '',
+        publication_date=_publication_date(article),
+        category=classification.category.value,
+        location=classification.location,
+        confidence=classification.confidence,
+        source_url=article.get('url') or '',
+        coordinates=Coordinates(lat=coordinates.latitude, lon=coordinates.longitude) if coordinates else None
+    )
+
+def _article_id(article: Dict[str, Any]) -> Optional[str]:
+    return article.get('uri') or article.get('url')
+
+async def _fetch_stage(session: aiohttp.ClientSession, articles: asyncio.Queue, report: NewsCycleReport):
+    queued = set()
+    while _deferred_articles:
+        article = _deferred_articles.popleft()
+        queued.add(_article_id(article))
+        await articles.put(article)
+
+    async def fetch(page: int):
+        try:
+            results = await fetch_page(session, page)
+        except Exception as e:
+            metrics.inc('news_fetch_errors_total')
+            print(f"Error fetching news page {page}: {str(e)}")
+            return
+        for article in results:
+            article_id = _article_id(article)
+            if not article_id or article_id in queued or _seen_articles.get(article_id):
+                report.duplicates += 1
+                continue
+            queued.add(article_id)
+            report.fetched += 1
+            # blocks while the classifiers are behind, which throttles further page reads
+            await articles.put(article)
+
+    await asyncio.gather(*(fetch(page) for page in range(1, settings.NEWS_FETCH_PAGES + 1)))
+
+async def _classify_stage(
+        session: aiohttp.ClientSession,
+        articles: asyncio.Queue,
+        events: asyncio.Queue,
+        report: NewsCycleReport,
+        deadline: float
+):
+    loop = asyncio.get_running_loop()
+    done = False
+    while not done:
+        # each classifier stops at the first end-of-input marker it takes, so every one of them gets its own
+        batch = []
+        item = await articles.get()
+        while item is not None:
+            batch.append(item)
+            if len(batch) >= settings.NEWS_CLASSIFY_BATCH_SIZE or articles.empty():
+                break
+            item = articles.get_nowait()
+        done = item is None
+        if not batch:
+            continue
+        if loop.time() >= deadline:
+            _deferred_articles.extend(batch)
+            report.deferred += len(batch)
+            continue
+        try:
+            classifications = await classify_articles(session, batch)
+        except Exception as e:
+            report.failed += len(batch)
+            metrics.inc('news_articles_total', len(batch), status='classify_failed')
+            print(f"Error classifying {len(batch)} articles: {str(e)}")
+            continue
+        for article, classification in zip(batch, classifications):
+            if classification is None:
+                report.failed += 1
+                continue
+            try:
+                event = to_terror_event(article, classification)
+            except Exception as e:
+                report.failed += 1
+                print(f"Error converting article {_article_id(article)}: {str(e)}")
+                continue
+            report.classified += 1
+            await events.put((_article_id(article), event))
+
+def _bulk_index(pending: List[Tuple[str, TerrorEvent]]) -> Tuple[int, List[Dict[str, Any]]]:
+    return helpers.bulk(
+        get_elastic_client(),
+        [
+            {"_index": settings.ES_INDEX_FOR_NEWS, "_id": article_id, "_source": event.to_elastic_doc()}
+            for article_id, event in pending
+        ],
+        chunk_size=settings.ES_BULK_CHUNK_SIZE,
+        raise_on_error=False,
+        raise_on_exception=False
+    )
+
+async def _flush(pending: List[Tuple[str, TerrorEvent]], report: NewsCycleReport):
+    if not pending:
+        return
+    indexed, errors = await asyncio.to_thread(_bulk_index, pending)
+    failed_ids = {str(next(iter(error.values())).get('_id')) for error in errors}
+    for article_id, _ in pending:
+        if article_id not in failed_ids:
+            _seen_articles.put(article_id, True)
+    report.indexed += indexed
+    report.failed += len(errors)
+    metrics.inc('news_articles_total', indexed, status='indexed')
+    for error in errors[:5]:
+        print(f"Error indexing article: {error}")
+
+async def _index_stage(events: asyncio.Queue, report: NewsCycleReport):
+    pending = []
+    while (item := await events.get()) is not None:
+        pending.append(item)
+        if len(pending) >= settings.ES_BULK_CHUNK_SIZE:
+            await _flush(pending, report)
+            pending = []
+    await _flush(pending, report)
+
+async def run_cycle(session: aiohttp.ClientSession, budget: Optional[float] = None) -> NewsCycleReport:
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    deadline = started + (settings.NEWS_CYCLE_BUDGET_SECONDS if budget is None else budget)
+    report = NewsCycleReport()
+    await asyncio.to_thread(ensure_index, settings.ES_INDEX_FOR_NEWS)
+    articles = asyncio.Queue(maxsize=settings.NEWS_QUEUE_SIZE)
+    events = asyncio.Queue(maxsize=settings.NEWS_QUEUE_SIZE)
+    classifiers = [
+        asyncio.create_task(_classify_stage(session, articles, events, report, deadline))
+        for _ in range(settings.NEWS_CLASSIFY_CONCURRENCY)
+    ]
+    indexer = asyncio.create_task(_index_stage(events, report))
+    try:
+        await asyncio.wait_for(_fetch_stage(session, articles, report), timeout=max(deadline - loop.time(), 0))
+    except asyncio.TimeoutError:
+        print("News fetch ran out of cycle budget, classifying what was read so far")
+    for _ in classifiers:
+        await articles.put(None)
+    await asyncio.gather(*classifiers)
+    await events.put(None)
+    await indexer
+    report.seconds = loop.time() - started
+    metrics.inc('news_cycles_total')
+    metrics.inc('news_cycle_seconds_total', report.seconds)
+    report.print_summary()
+    return report
+
+async def _run_once() -> NewsCycleReport:
+    async with client_session() as session:
+        return await run_cycle(session)
+
+def fetch_news_once() -> NewsCycleReport:
+    return asyncio.run(_run_once())
+
+class NewsScheduler(threading.Thread):
+    def __init__(self, interval_seconds: float, budget_seconds: float):
+        super().__init__(name="news-scheduler", daemon=True)
+        self.interval_seconds = interval_seconds
+        self.budget_seconds = min(budget_seconds, interval_seconds)
+        self.last_report: Optional[NewsCycleReport] = None
+        self._stop_event = threading.Event()
+
+    def run(self):
+        asyncio.run(self._run())
+
+    async def _run(self):
+        async with client_session() as session:
+            while not self._stop_event.is_set():
+                started = time.monotonic()
+                try:
+                    self.last_report = await run_cycle(session, self.budget_seconds)
+                except Exception as e:
+                    metrics.inc('news_cycle_errors_total')
+                    print(f"News cycle failed: {str(e)}")
+                remaining = self.interval_seconds - (time.monotonic() - started)
+                await asyncio.to_thread(self._stop_event.wait, max(remaining, 0))
+
+    def stop(self):
+        self._stop_event.set()
+
+def acquire_scheduler_lock(path: Path = SCHEDULER_LOCK_FILE) -> bool:
+    global _scheduler_lock
+    if _scheduler_lock is not None:
+        return True
+    path.parent.mkdir(parents=True, exist_ok=True)
+    lock = open(path, 'a+')
+    try:
+        fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        lock.close()
+        return False
+    # held until the process exits so only one worker ever runs the scheduler
+    _scheduler_lock = lock
+    return True
+
+def start_news_scheduler() -> Optional[NewsScheduler]:
+    if not acquire_scheduler_lock():
+        print("News scheduler already running in another process")
+        return None
+    scheduler = NewsScheduler(settings.FETCH_INTERVAL_MINUTES * 60, settings.NEWS_CYCLE_BUDGET_SECONDS)
+    scheduler.start()
+    print(f"News scheduler started, fetching every {settings.FETCH_INTERVAL_MINUTES} minutes")
+    return scheduler
+
+if __name__ == '__main__':
+    report = fetch_news_once()
+    sys.exit(0 if report.failed == 0 else 1)
@@ -0,0 +1,118 @@
+import json
+import time
+from typing import Any, Dict, Iterator, Optional
+from sqlalchemy import and_, func, select, tuple_
+from sqlalchemy.sql import Select
+from app.db.elastic.config import settings
+from app.db.elastic.models import DataSource, SearchParams
+from app.db.psql.database import get_engine, open_session
+from app.db.psql.models import AttackType, City, Country, Event, Location, TerroristGroup, summary_tsv
+from app.db.psql.models.event_search import SEARCH_CONFIG
+from app.utils.metrics import metrics
+
+MAX_PAGE_SIZE = 1000
+SOURCE_DBS = {
+    DataSource.MAIN_CSV.value: 'GTD',
+    DataSource.SECONDARY_CSV.value: 'RAND'
+}
+
+def _date_key(value):
+    return value.year, value.month, value.day
+
+def _page_size(params: SearchParams) -> int:
+    return max(1, min(params.limit, MAX_PAGE_SIZE))
+
+def _text_filter(query: str):
+    if get_engine().dialect.name == 'postgresql':
+        return summary_tsv.op('@@')(func.websearch_to_tsquery(SEARCH_CONFIG, query))
+    return and_(*(Event.summary.ilike(f"%{term}%") for term in query.split()))
+
+def build_search_query(params: SearchParams, cursor: Optional[int] = None) -> Select:
+    query = (
+        select(
+            Event.id, Event.year, Event.month, Event.day, Event.summary, Event.source_db,
+            AttackType.name.label('attack_type'),
+            TerroristGroup.group_name,
+            City.name.label('city'), Country.name.label('country')
+        )
+        .select_from(Event)
+        .outerjoin(AttackType, Event.attack_type_id == AttackType.id)
+        .outerjoin(TerroristGroup, Event.group_id == TerroristGroup.id)
+        .outerjoin(Location, Event.location_id == Location.id)
+        .outerjoin(City, Location.city_id == City.id)
+        .outerjoin(Country, Location.country_id == Country.id)
+    )
+    if params.query and params.query.strip():
+        query = query.where(_text_filter(params.query.strip()))
+    event_date = tuple_(Event.year, Event.month, Event.day)
+    if params.start_date:
+        query = query.where(event_date >= tuple_(*_date_key(params.start_date)))
+    if params.end_date:
+        query = query.where(event_date <= tuple_(*_date_key(params.end_date)))
+    if params.source:
+        query = query.where(Event.source_db == SOURCE_DBS.get(params.source, params.source))
+    if cursor is not None:
+        query = query.where(Event.id < cursor)
+    return query.order_by(Event.id.desc()).limit(_page_size(params))
+
+def _explain(session, query: Select) -> str:
+    dialect = get_engine().dialect
+    compiled = query.compile(dialect=dialect)
+    parameters = compiled.params
+    if compiled.positional:
+        parameters = tuple(parameters[name] for name in compiled.positiontup)
+    prefix = "EXPLAIN" if dialect.name == 'postgresql' else "EXPLAIN QUERY PLAN"
+    rows = session.connection().exec_driver_sql(f"{prefix} {compiled.string}", parameters).all()
+    return "\n".join(" ".join(str(value) for value in row) for row in rows)
+
+def _log_slow_search(session, query: Select, params: SearchParams, cursor: Optional[int], elapsed_ms: float):
+    metrics.inc('search_slow_queries_total')
+    try:
+        plan = _explain(session, query)
+    except Exception as e:
+        plan = f"EXPLAIN failed: {str(e)}"
+    print(
+        f"Slow search ({elapsed_ms:.1f}ms) query={params.query!r} start_date={params.start_date} "
+        f"end_date={params.end_date} source={params.source} cursor={cursor}\n{plan}"
+    )
+
+def _to_result(row: Any) -> Dict[str, Any]:
+    return {
+        "id": row.id,
+        "year": row.year,
+        "month": row.month,
+        "day": row.day,
+        "summary": row.summary,
+        "source_db": row.source_db,
+        "attack_type": row.attack_type,
+        "group_name": row.group_name,
+        "city": row.city,
+        "country": row.country
+    }
+
+def search_events(params: SearchParams, cursor: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+    query = build_search_query(params, cursor)
+    with open_session() as session:
+        started = time.perf_counter()
+        rows = iter(session.execute(query.execution_options(yield_per=200)))
+        first = next(rows, None)
+        # time to the first row: how long the client streams the rest says nothing about the query
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        metrics.inc('search_queries_total')
+        metrics.inc('search_seconds_total', elapsed_ms / 1000)
+        if first is not None:
+            yield _to_result(first)
+            for row in rows:
+                yield _to_result(row)
+        if elapsed_ms >= settings.SEARCH_SLOW_QUERY_MS:
+            _log_slow_search(session, query, params, cursor, elapsed_ms)
+
+def search_events_ndjson(params: SearchParams, cursor: Optional[int] = None) -> Iterator[str]:
+    last_id = None
+    returned = 0
+    for item in search_events(params, cursor):
+        last_id = item["id"]
+        returned += 1
+        yield json.dumps(item) + "\n"
+    next_cursor = last_id if returned == _page_size(params) else None
+    yield json.dumps({"next_cursor": next_cursor, "count": returned}) + "\n"
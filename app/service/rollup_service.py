@@ -0,0 +1,188 @@
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+from sqlalchemy import select, text
+from sqlalchemy.engine import Engine
+from app.db.elastic.config import settings
+from app.db.psql.models import event_facts
+from app.db.psql.models.event_facts import EVENT_FACTS_SELECT
+from app.utils.metrics import metrics, timed_stage
+from app.utils.ttl_cache import TTLCache
+
+DIMENSIONS = {
+    'year': ('year', None),
+    'month': ('month', None),
+    'region': ('region_id', 'region'),
+    'country': ('country_id', 'country'),
+    'attack_type': ('attack_type_id', 'attack_type'),
+    'target_type': ('target_type_id', 'target_type'),
+    'group': ('group_id', 'group_name')
+}
+MEASURES = ['events', 'killed', 'wounded', 'successes', 'suicides']
+RATES = {'success_rate': 'successes', 'suicide_rate': 'suicides'}
+FILTERS = ['year_from', 'year_to', *DIMENSIONS]
+UNKNOWN = -1
+ROLLUP_READ_CHUNK = 100000
+
+_result_cache = TTLCache(maxsize=settings.ROLLUP_CACHE_SIZE, ttl=settings.ROLLUP_CACHE_TTL)
+_cube_lock = threading.Lock()
+_cube: Optional['RollupCube'] = None
+_cube_mtime: Optional[float] = None
+
+@dataclass
+class RollupCube:
+    coords: Dict[str, np.ndarray]
+    measures: Dict[str, np.ndarray]
+    labels: Dict[str, Dict[int, str]] = field(default_factory=dict)
+    built_at: float = field(default_factory=time.time)
+
+    @property
+    def cells(self) -> int:
+        return len(self.measures['events'])
+
+    def mask(self, filters: Dict[str, Any]) -> np.ndarray:
+        selected = np.ones(self.cells, dtype=bool)
+        if filters.get('year_from') is not None:
+            selected &= self.coords['year'] >= filters['year_from']
+        if filters.get('year_to') is not None:
+            selected &= self.coords['year'] <= filters['year_to']
+        for name in DIMENSIONS:
+            if filters.get(name) is not None:
+                selected &= self.coords[name] == filters[name]
+        return selected
+
+    def aggregate(self, by: List[str], filters: Dict[str, Any]) -> pd.DataFrame:
+        selected = self.mask(filters)
+        frame = pd.DataFrame({name: self.coords[name][selected] for name in by})
+        for measure in MEASURES:
+            frame[measure] = self.measures[measure][selected]
+        totals = frame.groupby(by, sort=False).sum()
+        for rate, measure in RATES.items():
+            totals[rate] = np.where(totals['events'] > 0, totals[measure] / totals['events'].clip(lower=1), 0.0)
+        return totals
+
+    def label(self, dimension: str, key: int) -> Any:
+        if dimension not in self.labels:
+            return int(key)
+        return self.labels[dimension].get(int(key), 'Unknown')
+
+    def top(self, by: str, measure: str, n: int, filters: Dict[str, Any]) -> List[Dict[str, Any]]:
+        totals = self.aggregate([by], filters)
+        ranked = totals.sort_values(measure, ascending=False, kind='stable').head(n)
+        return [
+            {'id': int(key), by: self.label(by, key), **_row_values(row)}
+            for key, row in ranked.iterrows()
+        ]
+
+    def time_series(self, interval: str, filters: Dict[str, Any]) -> List[Dict[str, Any]]:
+        by = ['year'] if interval == 'year' else ['year', 'month']
+        totals = self.aggregate(by, filters).sort_index()
+        series = []
+        for key, row in totals.iterrows():
+            period = dict(zip(by, key if isinstance(key, tuple) else (key,)))
+            series.append({**{k: int(v) for k, v in period.items()}, **_row_values(row)})
+        return series
+
+    def save(self, path: Path):
+        arrays = {f"coord_{name}": values for name, values in self.coords.items()}
+        arrays.update({f"measure_{name}": values for name, values in self.measures.items()})
+        for name, labels in self.labels.items():
+            arrays[f"label_ids_{name}"] = np.fromiter(labels.keys(), dtype=np.int64, count=len(labels))
+            arrays[f"label_names_{name}"] = np.array(list(labels.values()), dtype=str)
+        arrays['built_at'] = np.array(self.built_at)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.stem}.tmp.npz")
+        np.savez_compressed(tmp_path, **arrays)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: Path) -> 'RollupCube':
+        with np.load(path) as data:
+            coords = {name: data[f"coord_{name}"] for name in DIMENSIONS}
+            measures = {name: data[f"measure_{name}"] for name in MEASURES}
+            labels = {
+                name: dict(zip(data[f"label_ids_{name}"].tolist(), data[f"label_names_{name}"].tolist()))
+                for name, (_, label_column) in DIMENSIONS.items() if label_column
+            }
+            return cls(coords, measures, labels, float(data['built_at']))
+
+def _row_values(row: pd.Series) -> Dict[str, Any]:
+    values = {measure: int(row[measure]) for measure in MEASURES}
+    values.update({rate: round(float(row[rate]), 4) for rate in RATES})
+    return values
+
+def _fact_chunks(engine: Engine):
+    query = select(event_facts) if engine.dialect.name == 'postgresql' else text(EVENT_FACTS_SELECT)
+    with engine.connect() as conn:
+        yield from pd.read_sql(query, conn, chunksize=ROLLUP_READ_CHUNK)
+
+@timed_stage('build_rollup')
+def build_cube(engine: Engine) -> RollupCube:
+    keys = [column for column, _ in DIMENSIONS.values()]
+    partials = []
+    labels: Dict[str, Dict[int, str]] = {name: {} for name, (_, label) in DIMENSIONS.items() if label}
+    for chunk in _fact_chunks(engine):
+        for name, (column, label_column) in DIMENSIONS.items():
+            if label_column:
+                pairs = chunk[[column, label_column]].dropna().drop_duplicates(subset=column)
+                labels[name].update(zip(pairs[column].astype(int).tolist(), pairs[label_column].tolist()))
+        chunk[keys] = chunk[keys].fillna(UNKNOWN).astype('int32')
+        chunk['events'] = 1
+        chunk['successes'] = chunk['success'].fillna(False).astype(bool).astype('int32')
+        chunk['suicides'] = chunk['suicide'].fillna(False).astype(bool).astype('int32')
+        chunk['killed'] = pd.to_numeric(chunk['killed'], errors='coerce').fillna(0)
+        chunk['wounded'] = pd.to_numeric(chunk['wounded'], errors='coerce').fillna(0)
+        partials.append(chunk.groupby(keys, sort=False)[MEASURES].sum())
+    if partials:
+        cube = pd.concat(partials).groupby(level=keys, sort=False).sum().reset_index()
+    else:
+        cube = pd.DataFrame(columns=keys + MEASURES, dtype='int64')
+    coords = {name: cube[column].to_numpy(dtype=np.int32) for name, (column, _) in DIMENSIONS.items()}
+    measures = {name: cube[name].to_numpy(dtype=np.int64) for name in MEASURES}
+    print(f"Built rollup cube with {len(cube)} cells from {int(measures['events'].sum())} events")
+    return RollupCube(coords, measures, labels)
+
+def rebuild_cube(engine: Engine, path: Optional[Path] = None) -> RollupCube:
+    global _cube, _cube_mtime
+    path = Path(path or settings.ROLLUP_PATH)
+    cube = build_cube(engine)
+    cube.save(path)
+    with _cube_lock:
+        _cube = cube
+        _cube_mtime = path.stat().st_mtime
+        _result_cache.clear()
+    metrics.set('rollup_cube_cells', cube.cells)
+    return cube
+
+def get_cube(path: Optional[Path] = None) -> Optional[RollupCube]:
+    global _cube, _cube_mtime
+    path = Path(path or settings.ROLLUP_PATH)
+    try:
+        mtime = path.stat().st_mtime
+    except FileNotFoundError:
+        return _cube
+    with _cube_lock:
+        if _cube is None or mtime != _cube_mtime:
+            _cube = RollupCube.load(path)
+            _cube_mtime = mtime
+            _result_cache.clear()
+        return _cube
+
+def cached_query(kind: str, params: Tuple, compute) -> Any:
+    cube = get_cube()
+    if cube is None:
+        return None
+    key = (kind, cube.built_at, params)
+    result = _result_cache.get(key)
+    if result is None:
+        metrics.inc('rollup_cache_misses_total')
+        result = compute(cube)
+        _result_cache.put(key, result)
+    else:
+        metrics.inc('rollup_cache_hits_total')
+    return result
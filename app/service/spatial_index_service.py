@@ -0,0 +1,253 @@
+import math
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+from sqlalchemy import func, select
+from sqlalchemy.engine import Engine
+from app.db.elastic.config import settings
+from app.db.elastic.models.historic_data import Coordinates
+from app.db.psql.models import Event, Location
+from app.utils.metrics import metrics, timed_stage
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+SPATIAL_READ_CHUNK = 100000
+
+_index_lock = threading.Lock()
+_index: Optional['GridIndex'] = None
+_index_mtime: Optional[float] = None
+
+def haversine_km(lat: float, lon: float, lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+    lat1, lon1 = math.radians(lat), math.radians(lon)
+    lat2, lon2 = np.radians(lats), np.radians(lons)
+    a = np.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+def _wrap_lon(lon: float) -> float:
+    return lon if -180 <= lon <= 180 else (lon + 180) % 360 - 180
+
+@dataclass
+class GridIndex:
+    event_ids: np.ndarray
+    lats: np.ndarray
+    lons: np.ndarray
+    cell_degrees: float
+    last_event_id: int = 0
+    built_at: float = field(default_factory=time.time)
+
+    def __post_init__(self):
+        self.rows = int(math.ceil(180 / self.cell_degrees))
+        self.cols = int(math.ceil(360 / self.cell_degrees))
+        cells = self._cells(self.lats, self.lons)
+        order = np.argsort(cells, kind='stable')
+        self.event_ids = self.event_ids[order]
+        self.lats = self.lats[order]
+        self.lons = self.lons[order]
+        self.cells = cells[order]
+
+    def __len__(self) -> int:
+        return len(self.event_ids)
+
+    def _row(self, lats) -> np.ndarray:
+        return np.clip(np.floor((np.asarray(lats) + 90) / self.cell_degrees), 0, self.rows - 1).astype(np.int64)
+
+    def _col(self, lons) -> np.ndarray:
+        return np.clip(np.floor((np.asarray(lons) + 180) / self.cell_degrees), 0, self.cols - 1).astype(np.int64)
+
+    def _cells(self, lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+        return self._row(lats) * self.cols + self._col(lons)
+
+    def _candidates(self, min_lat: float, max_lat: float, lon_ranges: List[Tuple[float, float]]) -> np.ndarray:
+        first_row, last_row = int(self._row(min_lat)), int(self._row(max_lat))
+        rows = np.arange(first_row, last_row + 1)
+        slices = []
+        for min_lon, max_lon in lon_ranges:
+            starts = np.searchsorted(self.cells, rows * self.cols + int(self._col(min_lon)), side='left')
+            ends = np.searchsorted(self.cells, rows * self.cols + int(self._col(max_lon)), side='right')
+            slices.extend(np.arange(start, end) for start, end in zip(starts, ends) if end > start)
+        return np.concatenate(slices) if slices else np.empty(0, dtype=np.int64)
+
+    @staticmethod
+    def _lon_ranges(min_lon: float, max_lon: float) -> List[Tuple[float, float]]:
+        if max_lon - min_lon >= 360:
+            return [(-180.0, 180.0)]
+        min_lon, max_lon = _wrap_lon(min_lon), _wrap_lon(max_lon)
+        if min_lon <= max_lon:
+            return [(min_lon, max_lon)]
+        return [(min_lon, 180.0), (-180.0, max_lon)]
+
+    def bbox(self, min_lat: float, min_lon: float, max_lat: float, max_lon: float) -> np.ndarray:
+        ranges = self._lon_ranges(min_lon, max_lon)
+        candidates = self._candidates(min_lat, max_lat, ranges)
+        lats, lons = self.lats[candidates], self.lons[candidates]
+        inside = (lats >= min_lat) & (lats <= max_lat)
+        lon_inside = np.zeros(len(candidates), dtype=bool)
+        for low, high in ranges:
+            lon_inside |= (lons >= low) & (lons <= high)
+        return candidates[inside & lon_inside]
+
+    def radius(self, center: Coordinates, km: float) -> Tuple[np.ndarray, np.ndarray]:
+        lat_delta = km / KM_PER_DEGREE
+        min_lat, max_lat = max(center.lat - lat_delta, -90.0), min(center.lat + lat_delta, 90.0)
+        polar = max(abs(min_lat), abs(max_lat)) >= 89.9
+        lon_delta = 360.0 if polar else lat_delta / math.cos(math.radians(max(abs(min_lat), abs(max_lat))))
+        ranges = self._lon_ranges(center.lon - lon_delta, center.lon + lon_delta)
+        candidates = self._candidates(min_lat, max_lat, ranges)
+        distances = haversine_km(center.lat, center.lon, self.lats[candidates], self.lons[candidates])
+        within = distances <= km
+        candidates, distances = candidates[within], distances[within]
+        order = np.argsort(distances, kind='stable')
+        return candidates[order], distances[order]
+
+    def nearest(self, center: Coordinates, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        if not len(self):
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        km = self.cell_degrees * KM_PER_DEGREE
+        while True:
+            positions, distances = self.radius(center, km)
+            if len(positions) >= k or km >= math.pi * EARTH_RADIUS_KM:
+                return positions[:k], distances[:k]
+            km *= 2
+
+    def clusters(self, min_lat: float, min_lon: float, max_lat: float, max_lon: float, zoom: int) -> List[Dict[str, Any]]:
+        positions = self.bbox(min_lat, min_lon, max_lat, max_lon)
+        if not len(positions):
+            return []
+        size = 360.0 / (2 ** zoom) / settings.SPATIAL_CLUSTERS_PER_TILE
+        lats, lons = self.lats[positions], self.lons[positions]
+        keys = np.floor((lats + 90) / size).astype(np.int64) * (int(360 / size) + 1) + np.floor((lons + 180) / size).astype(np.int64)
+        _, inverse, counts = np.unique(keys, return_inverse=True, return_counts=True)
+        mean_lats = np.bincount(inverse, weights=lats) / counts
+        mean_lons = np.bincount(inverse, weights=lons) / counts
+        first = np.full(len(counts), -1, dtype=np.int64)
+        first[inverse] = positions
+        return [
+            {
+                "coordinates": Coordinates(lat=round(float(lat), 6), lon=round(float(lon), 6)).to_dict(),
+                "count": int(count),
+                "event_id": int(self.event_ids[position]) if count == 1 else None
+            }
+            for lat, lon, count, position in zip(mean_lats, mean_lons, counts, first)
+        ]
+
+    def describe(self, positions: np.ndarray, distances: Optional[np.ndarray] = None) -> List[Dict[str, Any]]:
+        results = []
+        for i, position in enumerate(positions):
+            item = {
+                "event_id": int(self.event_ids[position]),
+                "coordinates": Coordinates(lat=float(self.lats[position]), lon=float(self.lons[position])).to_dict()
+            }
+            if distances is not None:
+                item["distance_km"] = round(float(distances[i]), 3)
+            results.append(item)
+        return results
+
+    def extend(self, event_ids: np.ndarray, lats: np.ndarray, lons: np.ndarray, last_event_id: int) -> 'GridIndex':
+        return GridIndex(
+            np.concatenate([self.event_ids, event_ids]),
+            np.concatenate([self.lats, lats]),
+            np.concatenate([self.lons, lons]),
+            self.cell_degrees,
+            max(self.last_event_id, last_event_id)
+        )
+
+    def save(self, path: Path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.stem}.tmp.npz")
+        np.savez(
+            tmp_path,
+            event_ids=self.event_ids, lats=self.lats, lons=self.lons,
+            cell_degrees=np.array(self.cell_degrees),
+            last_event_id=np.array(self.last_event_id),
+            built_at=np.array(self.built_at)
+        )
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: Path) -> 'GridIndex':
+        with np.load(path) as data:
+            return cls(
+                data['event_ids'], data['lats'], data['lons'],
+                float(data['cell_degrees']), int(data['last_event_id']), float(data['built_at'])
+            )
+
+def _located_events(engine: Engine, after_event_id: int = 0) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    stmt = (
+        select(Event.id, Location.latitude, Location.longitude)
+        .join(Location, Location.id == Event.location_id)
+        .where(Event.id > after_event_id)
+        .where(Location.latitude.between(-90, 90), Location.longitude.between(-180, 180))
+        .order_by(Event.id)
+    )
+    chunks = []
+    with engine.connect() as conn:
+        result = conn.execution_options(yield_per=SPATIAL_READ_CHUNK).execute(stmt)
+        for rows in result.partitions():
+            chunks.append(np.array(rows, dtype=np.float64))
+    if not chunks:
+        return np.empty(0, dtype=np.int64), np.empty(0), np.empty(0)
+    data = np.concatenate(chunks)
+    return data[:, 0].astype(np.int64), data[:, 1], data[:, 2]
+
+def _max_event_id(engine: Engine) -> int:
+    with engine.connect() as conn:
+        return conn.execute(select(func.coalesce(func.max(Event.id), 0))).scalar()
+
+def _count_located_up_to(engine: Engine, event_id: int) -> int:
+    stmt = (
+        select(func.count())
+        .select_from(Event)
+        .join(Location, Location.id == Event.location_id)
+        .where(Event.id <= event_id)
+        .where(Location.latitude.between(-90, 90), Location.longitude.between(-180, 180))
+    )
+    with engine.connect() as conn:
+        return conn.execute(stmt).scalar()
+
+def _publish(index: GridIndex, path: Path) -> GridIndex:
+    global _index, _index_mtime
+    index.save(path)
+    with _index_lock:
+        _index = index
+        _index_mtime = path.stat().st_mtime
+    metrics.set('spatial_index_points', len(index))
+    return index
+
+@timed_stage('build_spatial_index')
+def rebuild_spatial_index(engine: Engine, full: bool = False, path: Optional[Path] = None) -> GridIndex:
+    path = Path(path or settings.SPATIAL_INDEX_PATH)
+    current = get_spatial_index(path)
+    cell_degrees = settings.SPATIAL_CELL_DEGREES
+    stale = (
+        full or current is None or current.cell_degrees != cell_degrees
+        or _count_located_up_to(engine, current.last_event_id) != len(current)
+    )
+    if stale:
+        event_ids, lats, lons = _located_events(engine)
+        index = GridIndex(event_ids, lats, lons, cell_degrees, _max_event_id(engine))
+        print(f"Built spatial index over {len(index)} located events")
+        return _publish(index, path)
+    event_ids, lats, lons = _located_events(engine, after_event_id=current.last_event_id)
+    if not len(event_ids):
+        print(f"Spatial index is up to date ({len(current)} located events)")
+        return current
+    index = current.extend(event_ids, lats, lons, _max_event_id(engine))
+    print(f"Added {len(event_ids)} located events to the spatial index ({len(index)} total)")
+    return _publish(index, path)
+
+def get_spatial_index(path: Optional[Path] = None) -> Optional[GridIndex]:
+    global _index, _index_mtime
+    path = Path(path or settings.SPATIAL_INDEX_PATH)
+    try:
+        mtime = path.stat().st_mtime
+    except FileNotFoundError:
+        return _index
+    with _index_lock:
+        if _index is None or mtime != _index_mtime:
+            _index = GridIndex.load(path)
+            _index_mtime = mtime
+        return _index
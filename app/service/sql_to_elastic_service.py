@@ -0,0 +1,201 @@
+import calendar
+import math
+import time
+from datetime import datetime
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from elasticsearch import helpers
+from sqlalchemy import delete, func, select
+from app.db.elastic.config import Config, settings
+from app.db.elastic.elastic_connect import get_elastic_client
+from app.db.elastic.models import Coordinates, DataSource, NewsCategory, TerrorEvent
+from app.db.psql.checkpoints import (
+    ELASTIC_STAGE, SourceRange, dead_letter_offsets, record_checkpoint, record_dead_letters
+)
+from app.db.psql.database import open_session
+from app.db.psql.models import (
+    AttackType, Casualties, City, Country, Event, Location, SeedDeadLetter, TerroristGroup
+)
+from app.utils.metrics import metrics, timed_stage
+
+def _event_rows(batch_size: int, after_event_id: int = 0, event_ids: Optional[List[int]] = None) -> Iterator[Any]:
+    query = (
+        select(
+            Event.id, Event.year, Event.month, Event.day, Event.summary, Event.source_db,
+            AttackType.name.label('attack_type'),
+            TerroristGroup.group_name,
+            func.coalesce(Event.killed, Casualties.killed).label('killed'),
+            func.coalesce(Event.wounded, Casualties.wounded).label('wounded'),
+            Location.latitude, Location.longitude,
+            City.name.label('city'), Country.name.label('country')
+        )
+        .select_from(Event)
+        .outerjoin(AttackType, Event.attack_type_id == AttackType.id)
+        .outerjoin(TerroristGroup, Event.group_id == TerroristGroup.id)
+        .outerjoin(Casualties, Event.casualties_id == Casualties.id)
+        .outerjoin(Location, Event.location_id == Location.id)
+        .outerjoin(City, Location.city_id == City.id)
+        .outerjoin(Country, Location.country_id == Country.id)
+        .where(Event.id > after_event_id)
+        .order_by(Event.id)
+        .execution_options(yield_per=batch_size)
+    )
+    if event_ids is not None:
+        query = query.where(Event.id.in_(event_ids))
+    with open_session() as session:
+        yield from session.execute(query)
+
+def _publication_date(year: Optional[int], month: Optional[int], day: Optional[int]) -> Optional[datetime]:
+    if not year:
+        return None
+    month = month if month and 1 <= month <= 12 else 1
+    day = day if day and 1 <= day <= calendar.monthrange(year, month)[1] else 1
+    return datetime(year, month, day)
+
+def _is_known(value: Optional[str]) -> bool:
+    return bool(value) and value != 'Unknown'
+
+def row_to_terror_event(row: Any) -> Optional[TerrorEvent]:
+    publication_date = _publication_date(row.year, row.month, row.day)
+    if publication_date is None:
+        return None
+    location = ", ".join(part for part in (row.city, row.country) if _is_known(part)) or 'Unknown'
+    title = f"{row.attack_type or 'Attack'} in {location}"
+    if _is_known(row.group_name):
+        title = f"{title} by {row.group_name}"
+    has_coordinates = (
+        row.latitude is not None and row.longitude is not None
+        and not math.isnan(row.latitude) and not math.isnan(row.longitude)
+    )
+    return TerrorEvent(
+        title=title,
+        content=row.summary or '',
+        publication_date=publication_date,
+        category=NewsCategory.HISTORIC_TERROR.value,
+        location=location,
+        confidence=1.0,
+        source_url=(DataSource.SECONDARY_CSV if row.source_db == 'RAND' else DataSource.MAIN_CSV).value,
+        coordinates=Coordinates(lat=row.latitude, lon=row.longitude) if has_coordinates else None
+    )
+
+def generate_actions(
+        index_name: str,
+        batch_size: int,
+        stats: Dict[str, int],
+        after_event_id: int = 0,
+        event_ids: Optional[List[int]] = None
+) -> Iterator[Dict[str, Any]]:
+    for row in _event_rows(batch_size, after_event_id, event_ids):
+        event = row_to_terror_event(row)
+        if event is None:
+            stats['skipped'] += 1
+            continue
+        yield {
+            "_index": index_name,
+            "_id": row.id,
+            "_source": event.to_elastic_doc()
+        }
+
+def _windows(actions: Iterable[Dict[str, Any]], size: int) -> Iterator[List[Dict[str, Any]]]:
+    actions = iter(actions)
+    while window := list(islice(actions, size)):
+        yield window
+
+def _index_window(window: List[Dict[str, Any]], stats: Dict[str, int]) -> List[Tuple[int, str]]:
+    failures = []
+    pending = window
+    for attempt in range(settings.ES_BULK_MAX_RETRIES + 1):
+        by_id = {str(action['_id']): action for action in pending}
+        throttled = []
+        for ok, item in helpers.parallel_bulk(
+                get_elastic_client(),
+                pending,
+                thread_count=settings.ES_BULK_THREADS,
+                chunk_size=settings.ES_BULK_CHUNK_SIZE,
+                max_chunk_bytes=settings.ES_BULK_MAX_BYTES,
+                raise_on_error=False,
+                raise_on_exception=False
+        ):
+            info = next(iter(item.values()))
+            if ok:
+                stats['indexed'] += 1
+            elif info.get('status') == 429:
+                throttled.append(by_id[str(info.get('_id'))])
+            else:
+                stats['failed'] += 1
+                failures.append((int(info.get('_id')), str(info.get('error'))))
+                print(f"Error indexing event {info.get('_id')}: {info.get('error')}")
+        if not throttled:
+            return failures
+        if attempt == settings.ES_BULK_MAX_RETRIES:
+            stats['failed'] += len(throttled)
+            failures.extend((int(action['_id']), "Throttled after retries") for action in throttled)
+            print(f"Giving up on {len(throttled)} throttled documents")
+            return failures
+        backoff = min(settings.ES_BULK_INITIAL_BACKOFF * 2 ** attempt, settings.ES_BULK_MAX_BACKOFF)
+        print(f"Elasticsearch throttled {len(throttled)} documents, retrying in {backoff:.1f}s")
+        stats['retried'] += len(throttled)
+        time.sleep(backoff)
+        pending = throttled
+
+def _count_events(after_event_id: int = 0) -> int:
+    with open_session() as session:
+        return session.scalar(select(func.count(Event.id)).where(Event.id > after_event_id))
+
+def _checkpoint_window(index_name: str, window: List[Dict[str, Any]], failures: List[Tuple[int, str]]):
+    event_ids = [action['_id'] for action in window]
+    with open_session() as session:
+        record_dead_letters(session, ELASTIC_STAGE, failures)
+        record_checkpoint(
+            session, ELASTIC_STAGE, SourceRange(min(event_ids), max(event_ids), len(window)), target=index_name
+        )
+        session.commit()
+
+@timed_stage('elasticsearch_transfer')
+def transfer_data_to_elastic(
+        index_name: str = Config.ES_INDEX_FOR_TERROR,
+        progress: Optional[Callable[[int, Optional[int]], None]] = None,
+        after_event_id: int = 0
+) -> Dict[str, int]:
+    stats = {'indexed': 0, 'failed': 0, 'skipped': 0, 'retried': 0}
+    total = _count_events(after_event_id) if progress else None
+    if after_event_id:
+        print(f"Resuming transfer into {index_name} after event {after_event_id}")
+    started = time.perf_counter()
+    window_size = settings.ES_BULK_CHUNK_SIZE * settings.ES_BULK_THREADS * 4
+    actions = generate_actions(index_name, settings.ES_STREAM_BATCH_SIZE, stats, after_event_id)
+    for window in _windows(actions, window_size):
+        before = dict(stats)
+        _checkpoint_window(index_name, window, _index_window(window, stats))
+        for status, count in stats.items():
+            metrics.inc('es_documents_total', count - before[status], status=status)
+        elapsed = time.perf_counter() - started
+        print(f"Indexed {stats['indexed']} documents ({stats['indexed'] / elapsed:.0f} docs/s)")
+        if progress:
+            progress(stats['indexed'] + stats['failed'] + stats['skipped'], total)
+    print(
+        f"Transfer complete: {stats['indexed']} indexed, {stats['failed']} failed, "
+        f"{stats['skipped']} skipped, {stats['retried']} retried"
+    )
+    return stats
+
+@timed_stage('elasticsearch_reindex_dead_letters')
+def reindex_dead_letters(index_name: str = Config.ES_INDEX_FOR_TERROR) -> Dict[str, int]:
+    stats = {'indexed': 0, 'failed': 0, 'skipped': 0, 'retried': 0}
+    with open_session() as session:
+        event_ids = dead_letter_offsets(session, ELASTIC_STAGE)
+    print(f"Reindexing {len(event_ids)} dead-lettered events into {index_name}...")
+    letters = SeedDeadLetter.__table__
+    actions = generate_actions(index_name, settings.ES_STREAM_BATCH_SIZE, stats, event_ids=event_ids)
+    for window in _windows(actions, settings.ES_BULK_CHUNK_SIZE):
+        failures = _index_window(window, stats)
+        with open_session() as session:
+            session.execute(
+                delete(letters)
+                .where(letters.c.stage == ELASTIC_STAGE)
+                .where(letters.c.source_offset.in_([action['_id'] for action in window]))
+            )
+            record_dead_letters(session, ELASTIC_STAGE, failures)
+            session.commit()
+    print(f"Reindexed {stats['indexed']} dead-lettered events, {stats['failed']} still failing")
+    return stats
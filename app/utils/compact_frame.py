@@ -0,0 +1,56 @@
+from typing import Dict
+import pandas as pd
+
+CATEGORY_COLUMNS = [
+    'region_txt', 'country_txt', 'city', 'provstate', 'gname',
+    'standardized_attack_type', 'targtype1_txt', 'source_db', 'merged_sources'
+]
+SMALL_INT_COLUMNS = {
+    'iyear': 'Int16',
+    'imonth': 'Int8',
+    'iday': 'Int8',
+    'success': 'Int8',
+    'suicide': 'Int8',
+    'targtype1': 'Int8',
+    'attack_type_id': 'Int8',
+    'property': 'Int8'
+}
+# coordinates stay double precision: float32 only keeps ~7 significant digits, about a metre of error at 100 degrees
+FLOAT32_COLUMNS = ['nkill', 'nwound']
+FLOAT64_COLUMNS = ['latitude', 'longitude', 'propvalue']
+
+def compact_event_frame(df: pd.DataFrame) -> pd.DataFrame:
+    columns = {}
+    for col in df.columns:
+        values = df[col]
+        if col in CATEGORY_COLUMNS:
+            columns[col] = values.astype('category')
+        elif col in SMALL_INT_COLUMNS:
+            columns[col] = pd.to_numeric(values, errors='coerce').round().astype(SMALL_INT_COLUMNS[col])
+        elif col in FLOAT32_COLUMNS:
+            columns[col] = pd.to_numeric(values, errors='coerce').astype('float32')
+        elif col in FLOAT64_COLUMNS:
+            columns[col] = pd.to_numeric(values, errors='coerce').astype('float64')
+        else:
+            columns[col] = values
+    return pd.DataFrame(columns, index=df.index)
+
+def memory_usage_report(before: pd.DataFrame, after: pd.DataFrame) -> Dict[str, Dict[str, float]]:
+    before_usage = before.memory_usage(deep=True, index=False)
+    after_usage = after.memory_usage(deep=True, index=False)
+    report = {
+        col: {
+            'before_mb': before_usage[col] / (1024 * 1024),
+            'after_mb': after_usage.get(col, 0) / (1024 * 1024),
+            'dtype': str(after[col].dtype) if col in after else None
+        }
+        for col in before_usage.index
+    }
+    total_before = before_usage.sum() / (1024 * 1024)
+    total_after = after_usage.sum() / (1024 * 1024)
+    print(f"{'column':<26}{'dtype':<12}{'before MB':>12}{'after MB':>12}")
+    for col, usage in sorted(report.items(), key=lambda item: -item[1]['before_mb']):
+        print(f"{col:<26}{usage['dtype'] or '':<12}{usage['before_mb']:>12.2f}{usage['after_mb']:>12.2f}")
+    print(f"{'total':<38}{total_before:>12.2f}{total_after:>12.2f}")
+    report['total'] = {'before_mb': total_before, 'after_mb': total_after, 'dtype': None}
+    return report
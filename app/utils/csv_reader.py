@@ -1,7 +1,13 @@
 import pandas as pd
 import numpy as np
-from typing import Dict, Any, Optional, Union, Tuple
+from typing import Dict, Any, Optional, Union, Tuple, Iterator
 from pathlib import Path
+from app.utils.metrics import timed_stage
+
+BASE_PATH = Path(__file__).resolve().parent.parent / "data"
+GTD_FILE = "globalterrorismdb.csv"
+RAND_FILE = "RAND_Database_of_Worldwide_Terrorism_Incidents.csv"
+DATE_FORMATS = ['%d-%b-%y', '%d-%b-%Y', '%Y-%m-%d', '%m/%d/%Y']
 
 GTD_DTYPE_MAPPING = {
     'iyear': 'Int64',
@@ -26,10 +32,21 @@ GTD_DTYPE_MAPPING = {
     'gname': 'str'
 }
 
+def existing_dtypes(
+        csv_path: Union[str, Path],
+        encoding: str,
+        dtype_mapping: Dict[str, Any]
+) -> Dict[str, Any]:
+    header_df = pd.read_csv(csv_path, nrows=0, encoding=encoding)
+    return {col: dtype for col, dtype in dtype_mapping.items()
+            if col in header_df.columns}
+
+@timed_stage('read_csv_data')
 def read_csv_data(
         csv_path: Union[str, Path],
         encoding: str = 'iso-8859-1',
-        dtype_mapping: Optional[Dict[str, Any]] = None
+        dtype_mapping: Optional[Dict[str, Any]] = None,
+        keep_nan: bool = False
 ) -> pd.DataFrame:
     try:
         kwargs = {
@@ -37,14 +54,9 @@ def read_csv_data(
             'low_memory': False
         }
         if dtype_mapping:
-            kwargs['dtype'] = dtype_mapping
-        if dtype_mapping:
-            header_df = pd.read_csv(csv_path, nrows=0, encoding=encoding)
-            existing_columns = {col: dtype for col, dtype in dtype_mapping.items()
-                                if col in header_df.columns}
-            kwargs['dtype'] = existing_columns
+            kwargs['dtype'] = existing_dtypes(csv_path, encoding, dtype_mapping)
         df = pd.read_csv(csv_path, **kwargs)
-        return df.replace({np.nan: None})
+        return df if keep_nan else df.replace({np.nan: None})
     except FileNotFoundError:
         print(f"Error: File not found - {csv_path}")
         return pd.DataFrame()
@@ -52,22 +64,44 @@ def read_csv_data(
         print(f"Error reading CSV: {e}")
         return pd.DataFrame()
 
-def parse_date_safely(date_str: str) -> tuple:
+def read_csv_chunks(
+        csv_path: Union[str, Path],
+        chunk_size: int,
+        encoding: str = 'iso-8859-1',
+        dtype_mapping: Optional[Dict[str, Any]] = None
+) -> Iterator[pd.DataFrame]:
     try:
-        for fmt in ['%d-%b-%y', '%d-%b-%Y', '%Y-%m-%d', '%m/%d/%Y']:
-            try:
-                date_obj = pd.to_datetime(date_str, format=fmt)
-                return date_obj.year, date_obj.month, date_obj.day
-            except ValueError:
-                continue
-        date_obj = pd.to_datetime(date_str)
-        return date_obj.year, date_obj.month, date_obj.day
-    except:
-        return None, None, None
+        kwargs = {
+            'encoding': encoding,
+            'chunksize': chunk_size
+        }
+        if dtype_mapping:
+            kwargs['dtype'] = existing_dtypes(csv_path, encoding, dtype_mapping)
+        with pd.read_csv(csv_path, **kwargs) as reader:
+            yield from reader
+    except FileNotFoundError:
+        print(f"Error: File not found - {csv_path}")
 
+def parse_dates(dates: pd.Series) -> pd.DataFrame:
+    parsed = pd.Series(pd.NaT, index=dates.index, dtype='datetime64[ns]')
+    for fmt in DATE_FORMATS + ['mixed']:
+        pending = parsed.isna() & dates.notna()
+        if not pending.any():
+            break
+        parsed.loc[pending] = pd.to_datetime(dates[pending], format=fmt, errors='coerce')
+    year = parsed.dt.year.astype('Int64')
+    # two-digit years before 1969 are parsed into the future ('68' -> 2068)
+    year = year.mask(year > pd.Timestamp.now().year, year - 100)
+    return pd.DataFrame({
+        'iyear': year,
+        'imonth': parsed.dt.month.astype('Int64'),
+        'iday': parsed.dt.day.astype('Int64')
+    }, index=dates.index)
+
+@timed_stage('transform_worldwide_terrorism_data')
 def transform_worldwide_terrorism_data(df: pd.DataFrame) -> pd.DataFrame:
     try:
-        date_components = df['Date'].apply(parse_date_safely)
+        date_components = parse_dates(df['Date'])
         region_mapping = {
             'Israel': 'Middle East & North Africa',
             'Iraq': 'Middle East & North Africa',
@@ -88,9 +122,9 @@ def transform_worldwide_terrorism_data(df: pd.DataFrame) -> pd.DataFrame:
             'Mexico': 'Central America & Caribbean'
         }
         transformed_df = pd.DataFrame({
-            'iyear': date_components.apply(lambda x: x[0]).astype('Int64'),
-            'imonth': date_components.apply(lambda x: x[1]).astype('Int64'),
-            'iday': date_components.apply(lambda x: x[2]).astype('Int64'),
+            'iyear': date_components['iyear'],
+            'imonth': date_components['imonth'],
+            'iday': date_components['iday'],
             'country_txt': df['Country'].str.strip(),
             'city': df['City'].str.strip(),
             'region_txt': df['Country'].str.strip().map(region_mapping).fillna('Unknown'),
@@ -100,27 +134,28 @@ def transform_worldwide_terrorism_data(df: pd.DataFrame) -> pd.DataFrame:
             'gname': df['Perpetrator'].fillna('Unknown'),
             'weaptype1_txt': df['Weapon'].fillna('Unknown'),
             'source_db': 'RAND',
-            'provstate': pd.Series([None] * len(df), dtype='object'),
-            'latitude': pd.Series([None] * len(df), dtype='float64'),
-            'longitude': pd.Series([None] * len(df), dtype='float64')
+            'provstate': pd.Series([None] * len(df), index=df.index, dtype='object'),
+            'latitude': pd.Series([None] * len(df), index=df.index, dtype='float64'),
+            'longitude': pd.Series([None] * len(df), index=df.index, dtype='float64')
         })
         return transformed_df
     except Exception as e:
         print(f"Error transforming RAND data: {e}")
         return pd.DataFrame()
 
-def read_and_process_files() -> Tuple[pd.DataFrame, pd.DataFrame]:
+def read_and_process_files(keep_nan: bool = False) -> Tuple[pd.DataFrame, pd.DataFrame]:
     try:
-        base_path = Path(__file__).resolve().parent.parent / "data"
         print("Reading GTD data...")
         gtd_data = read_csv_data(
-            base_path / "globalterrorismdb.csv",
-            dtype_mapping=GTD_DTYPE_MAPPING
+            BASE_PATH / GTD_FILE,
+            dtype_mapping=GTD_DTYPE_MAPPING,
+            keep_nan=keep_nan
         )
         print(f"Read {len(gtd_data)} GTD records")
         print("Reading RAND data...")
         rand_data = read_csv_data(
-            base_path / "RAND_Database_of_Worldwide_Terrorism_Incidents.csv"
+            BASE_PATH / RAND_FILE,
+            keep_nan=keep_nan
         )
         print(f"Read {len(rand_data)} RAND records")
         print("Transforming RAND data...")
@@ -129,4 +164,12 @@ def read_and_process_files() -> Tuple[pd.DataFrame, pd.DataFrame]:
         return gtd_data, rand_transformed
     except Exception as e:
         print(f"Error in read_and_process_files: {e}")
-        return pd.DataFrame(), pd.DataFrame()
\ No newline at end of file
+        return pd.DataFrame(), pd.DataFrame()
+
+def stream_files(chunk_size: int) -> Iterator[Tuple[str, pd.DataFrame]]:
+    print(f"Streaming GTD data in chunks of {chunk_size}...")
+    for chunk in read_csv_chunks(BASE_PATH / GTD_FILE, chunk_size, dtype_mapping=GTD_DTYPE_MAPPING):
+        yield 'GTD', chunk
+    print(f"Streaming RAND data in chunks of {chunk_size}...")
+    for chunk in read_csv_chunks(BASE_PATH / RAND_FILE, chunk_size):
+        yield 'RAND', chunk
@@ -0,0 +1,144 @@
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Tuple, Union
+from app.utils.metrics import metrics
+from app.utils.ttl_cache import TTLCache
+
+MISSING = object()
+PRUNE_EVERY_WRITES = 1000
+
+class MemoStore:
+    """Two-tier memo: an in-process LRU in front of a shared SQLite file.
+
+    A stored value of None is a negative entry ("looked up, nothing there") and lives for `negative_ttl`.
+    Lookups that find nothing at all return MISSING.
+    """
+
+    def __init__(
+            self,
+            namespace: str,
+            path: Union[str, Path],
+            memory_size: int,
+            ttl: float,
+            negative_ttl: float,
+            max_rows: int
+    ):
+        self.namespace = namespace
+        self.path = Path(path)
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_rows = max_rows
+        self._memory = TTLCache(maxsize=memory_size, ttl=ttl)
+        self._lock = threading.Lock()
+        self._conn = None
+        self._writes = 0
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS memo ("
+                "namespace TEXT NOT NULL, key TEXT NOT NULL, value TEXT, expires_at REAL NOT NULL, "
+                "PRIMARY KEY (namespace, key)) WITHOUT ROWID"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS ix_memo_expires_at ON memo (namespace, expires_at)")
+            self._conn = conn
+        return self._conn
+
+    def _count(self, result: str, value: int = 1):
+        if value:
+            metrics.inc('memo_lookups_total', value, cache=self.namespace, result=result)
+
+    def get(self, key: str) -> Any:
+        return self.get_many([key]).get(key, MISSING)
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        started = time.perf_counter()
+        found, wanted = {}, []
+        for key in dict.fromkeys(keys):
+            value = self._memory.get(key, MISSING)
+            if value is MISSING:
+                wanted.append(key)
+            else:
+                found[key] = value
+        memory_hits = len(found)
+        if wanted:
+            now = time.time()
+            with self._lock:
+                conn = self._connection()
+                rows = []
+                for start in range(0, len(wanted), 500):
+                    chunk = wanted[start:start + 500]
+                    rows += conn.execute(
+                        f"SELECT key, value, expires_at FROM memo WHERE namespace = ? AND expires_at > ? "
+                        f"AND key IN ({','.join('?' * len(chunk))})",
+                        [self.namespace, now, *chunk]
+                    ).fetchall()
+            for key, value, expires_at in rows:
+                found[key] = None if value is None else json.loads(value)
+                self._memory.put(key, found[key], ttl=expires_at - now)
+        self._count('memory', memory_hits)
+        self._count('disk', len(found) - memory_hits)
+        self._count('miss', len(wanted) - (len(found) - memory_hits))
+        metrics.inc('memo_lookup_seconds_total', time.perf_counter() - started, cache=self.namespace)
+        return found
+
+    def put(self, key: str, value: Any):
+        self.put_many([(key, value)])
+
+    def put_many(self, items: Iterable[Tuple[str, Any]]):
+        now = time.time()
+        rows: List[Tuple[str, str, Any, float]] = []
+        for key, value in items:
+            ttl = self.ttl if value is not None else self.negative_ttl
+            self._memory.put(key, value, ttl=ttl)
+            rows.append((self.namespace, key, None if value is None else json.dumps(value), now + ttl))
+        if not rows:
+            return
+        with self._lock:
+            conn = self._connection()
+            conn.execute("BEGIN")
+            conn.executemany("INSERT OR REPLACE INTO memo (namespace, key, value, expires_at) VALUES (?, ?, ?, ?)", rows)
+            conn.execute("COMMIT")
+            self._writes += len(rows)
+            if self._writes >= PRUNE_EVERY_WRITES:
+                self._writes = 0
+                self._prune(conn, now)
+        metrics.inc('memo_writes_total', len(rows), cache=self.namespace)
+
+    def _prune(self, conn: sqlite3.Connection, now: float):
+        conn.execute("DELETE FROM memo WHERE namespace = ? AND expires_at <= ?", (self.namespace, now))
+        # past the row budget, drop the entries closest to expiry first
+        conn.execute(
+            "DELETE FROM memo WHERE namespace = ? AND key IN ("
+            "SELECT key FROM memo WHERE namespace = ? ORDER BY expires_at "
+            "LIMIT MAX((SELECT COUNT(*) FROM memo WHERE namespace = ?) - ?, 0))",
+            (self.namespace, self.namespace, self.namespace, self.max_rows)
+        )
+
+    def prune(self):
+        with self._lock:
+            self._prune(self._connection(), time.time())
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connection().execute(
+                "SELECT COUNT(*) FROM memo WHERE namespace = ? AND expires_at > ?", (self.namespace, time.time())
+            ).fetchone()[0]
+
+    def clear(self):
+        self._memory.clear()
+        with self._lock:
+            self._connection().execute("DELETE FROM memo WHERE namespace = ?", (self.namespace,))
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
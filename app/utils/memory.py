@@ -0,0 +1,30 @@
+import os
+import resource
+from typing import Dict
+
+_PAGE_SIZE = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+
+def peak_rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def current_rss_mb() -> float:
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * _PAGE_SIZE / (1024 * 1024)
+    except (OSError, IndexError, ValueError):
+        return peak_rss_mb()
+
+class MemoryReport:
+    def __init__(self):
+        self.stages: Dict[str, float] = {}
+
+    def sample(self, stage: str) -> float:
+        rss = current_rss_mb()
+        self.stages[stage] = max(self.stages.get(stage, 0.0), rss)
+        return rss
+
+    def print_report(self):
+        print("Memory high-water marks per stage:")
+        for stage, rss in self.stages.items():
+            print(f"  {stage}: {rss:.1f} MB")
+        print(f"  process peak: {peak_rss_mb():.1f} MB")
@@ -0,0 +1,197 @@
+import functools
+import json
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple, Union
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from app.utils.memory import current_rss_mb
+
+RSS_SAMPLE_INTERVAL = 0.25
+
+_Key = Tuple[str, Tuple[Tuple[str, str], ...]]
+
+class MetricsRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters: Dict[_Key, float] = {}
+        self.gauges: Dict[_Key, float] = {}
+
+    @staticmethod
+    def _key(name: str, labels: Dict[str, Any]) -> _Key:
+        return name, tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+    def inc(self, name: str, value: float = 1.0, **labels):
+        key = self._key(name, labels)
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0.0) + value
+
+    def set(self, name: str, value: float, **labels):
+        with self._lock:
+            self.gauges[self._key(name, labels)] = value
+
+    def set_max(self, name: str, value: float, **labels):
+        key = self._key(name, labels)
+        with self._lock:
+            self.gauges[key] = max(self.gauges.get(key, 0.0), value)
+
+    def get(self, name: str, **labels) -> float:
+        key = self._key(name, labels)
+        with self._lock:
+            return self.counters.get(key, self.gauges.get(key, 0.0))
+
+    def snapshot(self) -> Tuple[Dict[_Key, float], Dict[_Key, float]]:
+        with self._lock:
+            return dict(self.counters), dict(self.gauges)
+
+    def reset_gauges(self):
+        with self._lock:
+            self.gauges.clear()
+
+    def render_prometheus(self) -> str:
+        lines = []
+        with self._lock:
+            for kind, values in (('counter', self.counters), ('gauge', self.gauges)):
+                seen = set()
+                for (name, labels), value in sorted(values.items()):
+                    if name not in seen:
+                        lines.append(f"# TYPE {name} {kind}")
+                        seen.add(name)
+                    label_text = ",".join(f'{k}="{v}"' for k, v in labels)
+                    lines.append(f"{name}{{{label_text}}} {value}" if label_text else f"{name} {value}")
+        return "\n".join(lines) + "\n"
+
+metrics = MetricsRegistry()
+
+_local = threading.local()
+_active_stages: Dict[Tuple[int, int], str] = {}
+_active_lock = threading.Lock()
+_sampler: Optional[threading.Thread] = None
+
+def current_stage() -> str:
+    stack = getattr(_local, 'stages', None)
+    return stack[-1] if stack else 'none'
+
+def _sample_rss():
+    while True:
+        time.sleep(RSS_SAMPLE_INTERVAL)
+        with _active_lock:
+            stages = set(_active_stages.values())
+        if stages:
+            rss = current_rss_mb() * 1024 * 1024
+            for name in stages:
+                metrics.set_max('ingest_stage_peak_rss_bytes', rss, stage=name)
+
+def _ensure_sampler():
+    global _sampler
+    if _sampler is None:
+        _sampler = threading.Thread(target=_sample_rss, name='rss-sampler', daemon=True)
+        _sampler.start()
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    _ensure_sampler()
+    stack = getattr(_local, 'stages', None)
+    if stack is None:
+        stack = _local.stages = []
+    stack.append(name)
+    token = (threading.get_ident(), len(stack))
+    with _active_lock:
+        _active_stages[token] = name
+    metrics.set_max('ingest_stage_peak_rss_bytes', current_rss_mb() * 1024 * 1024, stage=name)
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.inc('ingest_stage_seconds_total', time.perf_counter() - started, stage=name)
+        metrics.inc('ingest_stage_calls_total', stage=name)
+        metrics.set_max('ingest_stage_peak_rss_bytes', current_rss_mb() * 1024 * 1024, stage=name)
+        with _active_lock:
+            _active_stages.pop(token, None)
+        stack.pop()
+
+def timed_stage(name: str) -> Callable:
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with stage(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_started', []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info['query_started'].pop()
+    name = current_stage()
+    metrics.inc('sql_statements_total', stage=name)
+    metrics.inc('sql_seconds_total', time.perf_counter() - started, stage=name)
+
+def _handle_error(context):
+    started = context.connection.info.get('query_started') if context.connection is not None else None
+    if started:
+        started.pop()
+    metrics.inc('sql_errors_total', stage=current_stage())
+
+def _timer(phase: str):
+    def before(session, *args):
+        session.info[f'{phase}_started'] = time.perf_counter()
+
+    def after(session, *args):
+        started = session.info.pop(f'{phase}_started', None)
+        if started is not None:
+            metrics.inc(f'db_{phase}_seconds_total', time.perf_counter() - started, stage=current_stage())
+    return before, after
+
+_commit_before, _commit_after = _timer('commit')
+_flush_before, _flush_after = _timer('flush')
+
+def instrument_engine(engine: Engine):
+    if getattr(engine, '_metrics_instrumented', False):
+        return
+    event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+    event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+    event.listen(engine, 'handle_error', _handle_error)
+    engine._metrics_instrumented = True
+    if not event.contains(Session, 'after_commit', _commit_after):
+        event.listen(Session, 'before_commit', _commit_before)
+        event.listen(Session, 'after_commit', _commit_after)
+        event.listen(Session, 'before_flush', _flush_before)
+        event.listen(Session, 'after_flush_postexec', _flush_after)
+
+def start_run() -> Dict[_Key, float]:
+    metrics.reset_gauges()
+    return metrics.snapshot()[0]
+
+def run_report(baseline: Optional[Dict[_Key, float]] = None) -> Dict[str, Any]:
+    baseline = baseline or {}
+    counters, gauges = metrics.snapshot()
+    counters = {key: value - baseline.get(key, 0.0) for key, value in counters.items()}
+    stages = {}
+    for (name, labels), value in list(counters.items()) + list(gauges.items()):
+        label_map = dict(labels)
+        if 'stage' not in label_map:
+            continue
+        stages.setdefault(label_map['stage'], {})[name] = value
+    for values in stages.values():
+        seconds = values.get('ingest_stage_seconds_total', 0.0)
+        db_seconds = values.get('sql_seconds_total', 0.0)
+        values['python_seconds'] = max(seconds - db_seconds, 0.0)
+    return {
+        "generated_at": time.time(),
+        "stages": stages,
+        "totals": {
+            name: value for (name, labels), value in counters.items() if not labels
+        }
+    }
+
+def write_run_report(path: Union[str, Path], baseline: Optional[Dict[_Key, float]] = None) -> Path:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(run_report(baseline), indent=2, sort_keys=True))
+    print(f"Wrote run report to {path}")
+    return path
@@ -0,0 +1,150 @@
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Union
+
+DEFAULT_BASELINE = Path(__file__).resolve().parent / "baseline.json"
+
+def _measure(
+        results: Dict[str, Dict[str, Any]],
+        name: str,
+        rows: Union[int, Callable[[Any], int]],
+        func: Callable[[], Any]
+) -> Any:
+    from app.utils.metrics import metrics, stage
+    stage_name = f"bench:{name}"
+    before = metrics.get('ingest_stage_seconds_total', stage=stage_name)
+    with stage(stage_name):
+        result = func()
+    seconds = metrics.get('ingest_stage_seconds_total', stage=stage_name) - before
+    if callable(rows):
+        rows = rows(result)
+    results[name] = {
+        'rows': rows,
+        'seconds': round(seconds, 3),
+        'rows_per_sec': round(rows / seconds, 1) if seconds else None,
+        'peak_rss_mb': round(metrics.get('ingest_stage_peak_rss_bytes', stage=stage_name) / (1024 * 1024), 1)
+    }
+    print(f"{name}: {rows} rows in {seconds:.2f}s ({results[name]['rows_per_sec']} rows/s), "
+          f"peak RSS {results[name]['peak_rss_mb']} MB")
+    return result
+
+def run(data_dir: Path, db_url: str, seed_mode: str, layout: str = 'normalized') -> Dict[str, Dict[str, Any]]:
+    os.environ['PSQL_URL'] = db_url
+    os.environ['SCHEMA_LAYOUT'] = layout
+    import app.utils.csv_reader as csv_reader
+    from app.db.elastic.config import settings
+    from app.db.psql.bulk_seed import seed_database_bulk
+    from app.db.psql.database import get_engine, reset_engine
+    from app.db.psql.init_data import standardize_data
+    from app.db.psql.models import Base
+    from app.db.psql.parallel_seed import seed_database_parallel
+    from app.db.psql.schema_layout import table_footprint
+    from app.service.export_service import ExportFilters, export_events, parquet_available
+    from app.service.sql_to_elastic_service import generate_actions
+
+    csv_reader.BASE_PATH = data_dir
+    settings.SCHEMA_LAYOUT = layout
+    settings.PSQL_URL = db_url
+    reset_engine()
+    engine = get_engine()
+    results: Dict[str, Dict[str, Any]] = {}
+    df_gtd, df_rand = _measure(
+        results, 'read_and_process_files',
+        lambda frames: sum(len(frame) for frame in frames),
+        csv_reader.read_and_process_files
+    )
+    total = len(df_gtd) + len(df_rand)
+    df_merged = _measure(results, 'standardize_data', total, lambda: standardize_data(df_gtd, df_rand))
+    del df_gtd, df_rand
+
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    if seed_mode == 'parallel':
+        seed = lambda: seed_database_parallel(df_merged)
+    else:
+        seed = lambda: seed_database_bulk(df_merged)
+    report = _measure(results, 'seed_database', len(df_merged), seed)
+    results['seed_database']['failed_rows'] = len(report.failed_rows)
+    results['schema'] = {'layout': layout, 'tables': table_footprint(engine)}
+    for table, footprint in results['schema']['tables'].items():
+        print(f"{table}: {footprint['rows']} rows, {footprint['bytes']} bytes")
+
+    stats = {'indexed': 0, 'failed': 0, 'skipped': 0, 'retried': 0}
+    _measure(
+        results, 'elastic_doc_mapping', report.inserted,
+        lambda: sum(1 for _ in generate_actions('benchmark', 2000, stats))
+    )
+    for export_format in ('ndjson', 'csv', 'parquet'):
+        if export_format == 'parquet' and not parquet_available():
+            continue
+        _measure(
+            results, f"export_{export_format}", report.inserted,
+            lambda: sum(len(chunk) for chunk in export_events(ExportFilters(), export_format))
+        )
+    return results
+
+def compare(results: Dict[str, Dict[str, Any]], baseline: Dict[str, Dict[str, Any]], threshold: float) -> bool:
+    ok = True
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if not previous:
+            continue
+        if previous.get('rows_per_sec') and current.get('rows_per_sec'):
+            floor = previous['rows_per_sec'] * (1 - threshold)
+            if current['rows_per_sec'] < floor:
+                print(f"REGRESSION {name}: {current['rows_per_sec']} rows/s < {floor:.1f} "
+                      f"(baseline {previous['rows_per_sec']})")
+                ok = False
+        if previous.get('peak_rss_mb') and current.get('peak_rss_mb'):
+            ceiling = previous['peak_rss_mb'] * (1 + threshold)
+            if current['peak_rss_mb'] > ceiling:
+                print(f"REGRESSION {name}: peak RSS {current['peak_rss_mb']} MB > {ceiling:.1f} "
+                      f"(baseline {previous['peak_rss_mb']})")
+                ok = False
+    return ok
+
+def main(argv: Optional[list] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the ingest pipeline on synthetic data")
+    parser.add_argument('--gtd-rows', type=int, default=200_000)
+    parser.add_argument('--rand-rows', type=int, default=40_000)
+    parser.add_argument('--scale', type=float, default=1.0, help="multiplier applied to both row counts")
+    parser.add_argument('--data-dir', type=Path, help="reuse or create synthetic files here")
+    parser.add_argument('--db-url', help="defaults to a temporary SQLite database")
+    parser.add_argument('--seed-mode', choices=['bulk', 'parallel'], default='bulk')
+    parser.add_argument('--layout', choices=['normalized', 'compact'], default='normalized')
+    parser.add_argument('--baseline', type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument('--threshold', type=float, default=0.2, help="allowed relative regression")
+    parser.add_argument('--update-baseline', action='store_true')
+    parser.add_argument('--output', type=Path, help="write this run's results as JSON")
+    args = parser.parse_args(argv)
+
+    work_dir = Path(tempfile.mkdtemp(prefix='gtd_bench_'))
+    data_dir = args.data_dir or work_dir / 'data'
+    db_url = args.db_url or f"sqlite:///{work_dir / 'bench.db'}"
+    # before any app import: the settings would otherwise pick up PSQL_URL from the shell or app/.env
+    os.environ['PSQL_URL'] = db_url
+
+    from app.utils.csv_reader import GTD_FILE
+    from benchmarks.synthetic_data import generate
+    if not (data_dir / GTD_FILE).exists():
+        generate(data_dir, int(args.gtd_rows * args.scale), int(args.rand_rows * args.scale))
+
+    started = time.perf_counter()
+    results = run(data_dir, db_url, args.seed_mode, args.layout)
+    print(f"Benchmark finished in {time.perf_counter() - started:.1f}s")
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2, sort_keys=True))
+
+    if args.update_baseline or not args.baseline.exists():
+        args.baseline.write_text(json.dumps(results, indent=2, sort_keys=True))
+        print(f"Wrote baseline {args.baseline}")
+        return 0
+    return 0 if compare(results, json.loads(args.baseline.read_text()), args.threshold) else 1
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,93 @@
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+def legacy_standardize_data(df_gtd, df_rand):
+    """The pre-plan implementation (TRANSFORM_VERSION 1), kept only as the comparison point."""
+    import pandas as pd
+    from app.db.psql.init_data import ATTACK_TYPE_MAPPING, COMMON_COLUMNS
+
+    def select_common_columns(df):
+        for col in COMMON_COLUMNS:
+            if col not in df.columns:
+                df[col] = None
+        df = df[COMMON_COLUMNS].copy()
+        for col in ['country_txt', 'city', 'region_txt', 'gname', 'summary']:
+            df[col] = df[col].fillna('Unknown')
+        return df
+
+    df_gtd, df_rand = df_gtd.copy(), df_rand.copy()
+    df_gtd['source_db'] = 'GTD'
+    df_gtd['standardized_attack_type'] = df_gtd.get('attacktype1_txt', 'Unknown')
+    df_gtd['attack_type_id'] = df_gtd.get('attacktype1', 9)
+    df_rand['attack_type_tuple'] = df_rand['weaptype1_txt'].map(lambda x: ATTACK_TYPE_MAPPING.get(x, ('Unknown', 9)))
+    df_rand['standardized_attack_type'] = df_rand['attack_type_tuple'].apply(lambda x: x[0])
+    df_rand['attack_type_id'] = df_rand['attack_type_tuple'].apply(lambda x: x[1])
+    df_rand.drop('attack_type_tuple', axis=1, inplace=True)
+    df_rand = df_rand.assign(
+        success=1, suicide=0, targtype1=14, targtype1_txt='Private Citizens & Property', property=0, propvalue=None
+    )
+    return pd.concat([select_common_columns(df_gtd), select_common_columns(df_rand)], ignore_index=True)
+
+def _profile(func: Callable[[], Any], repeats: int) -> Dict[str, Any]:
+    timings, peaks = [], []
+    for _ in range(repeats):
+        tracemalloc.start()
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+        peaks.append(tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+    return {
+        'seconds': round(statistics.median(timings), 3),
+        'peak_alloc_mb': round(max(peaks) / (1024 * 1024), 1)
+    }
+
+def run(data_dir: Path, repeats: int) -> Dict[str, Dict[str, Any]]:
+    import pandas as pd
+    import app.utils.csv_reader as csv_reader
+    from app.db.psql.init_data import standardize_data
+
+    csv_reader.BASE_PATH = data_dir
+    df_gtd, df_rand = csv_reader.read_and_process_files()
+    rows = len(df_gtd) + len(df_rand)
+    pd.testing.assert_frame_equal(standardize_data(df_gtd, df_rand), legacy_standardize_data(df_gtd, df_rand))
+
+    results: Dict[str, Dict[str, Any]] = {}
+    # the legacy timing includes the input copies it needs to avoid mutating the shared frames
+    for name, func in (('legacy', legacy_standardize_data), ('planned', standardize_data)):
+        results[name] = dict(_profile(lambda: func(df_gtd, df_rand), repeats), rows=rows)
+        results[name]['rows_per_sec'] = round(rows / results[name]['seconds'], 1)
+        print(f"{name}: {rows} rows in {results[name]['seconds']}s ({results[name]['rows_per_sec']} rows/s), "
+              f"peak allocations {results[name]['peak_alloc_mb']} MB")
+    return results
+
+def main(argv: Optional[list] = None) -> int:
+    parser = argparse.ArgumentParser(description="Compare the legacy and planned standardize_data on synthetic data")
+    parser.add_argument('--data-dir', type=Path, help="directory with the GTD/RAND CSVs (defaults to synthetic data)")
+    parser.add_argument('--gtd-rows', type=int, default=200_000)
+    parser.add_argument('--rand-rows', type=int, default=40_000)
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--output', type=Path, help="write this run's results as JSON")
+    args = parser.parse_args(argv)
+
+    # standardizing never touches the database; keep the app settings off the configured one
+    os.environ['PSQL_URL'] = 'sqlite://'
+    data_dir = args.data_dir
+    if data_dir is None:
+        from benchmarks.synthetic_data import generate
+        data_dir = generate(Path(tempfile.mkdtemp(prefix='gtd_standardize_')), args.gtd_rows, args.rand_rows)
+    results = run(data_dir, args.repeats)
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2, sort_keys=True))
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,97 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+DEFAULT_BASELINE = Path(__file__).resolve().parent / "startup_baseline.json"
+REPO_ROOT = Path(__file__).resolve().parent.parent
+HEAVY_MODULES = ['pandas', 'numpy', 'pyarrow', 'elasticsearch', 'aiohttp', 'app.db.psql.init_data']
+
+# runs in a fresh interpreter so every sample pays the full cold-start cost
+PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import app.main
+imported = time.perf_counter()
+client = app.main.app.test_client()
+response = client.get(sys.argv[1])
+answered = time.perf_counter()
+print(json.dumps({
+    'import_ms': (imported - started) * 1000,
+    'first_request_ms': (answered - imported) * 1000,
+    'status': response.status_code,
+    'heavy_modules': [name for name in json.loads(sys.argv[2]) if name in sys.modules]
+}))
+"""
+
+def sample(path: str, env: Dict[str, str]) -> Dict[str, Any]:
+    completed = subprocess.run(
+        [sys.executable, '-c', PROBE, path, json.dumps(HEAVY_MODULES)],
+        cwd=REPO_ROOT, env=env, capture_output=True, text=True, check=True
+    )
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+def run(paths: List[str], repeats: int, db_url: str) -> Dict[str, Dict[str, Any]]:
+    env = dict(os.environ, PSQL_URL=db_url, NEWS_SCHEDULER_ENABLED='false')
+    results: Dict[str, Dict[str, Any]] = {}
+    for path in paths:
+        samples = [sample(path, env) for _ in range(repeats)]
+        results[path] = {
+            'import_ms': round(statistics.median(s['import_ms'] for s in samples), 1),
+            'first_request_ms': round(statistics.median(s['first_request_ms'] for s in samples), 1),
+            'status': samples[-1]['status'],
+            'heavy_modules': samples[-1]['heavy_modules']
+        }
+        print(f"{path}: import {results[path]['import_ms']} ms, first request "
+              f"{results[path]['first_request_ms']} ms (HTTP {results[path]['status']}), "
+              f"heavy modules loaded: {results[path]['heavy_modules'] or 'none'}")
+    return results
+
+def compare(results: Dict[str, Dict[str, Any]], baseline: Dict[str, Dict[str, Any]], threshold: float) -> bool:
+    ok = True
+    for path, current in results.items():
+        previous = baseline.get(path)
+        if not previous:
+            continue
+        for measure in ('import_ms', 'first_request_ms'):
+            ceiling = previous[measure] * (1 + threshold)
+            if current[measure] > ceiling:
+                print(f"REGRESSION {path}: {measure} {current[measure]} > {ceiling:.1f} (baseline {previous[measure]})")
+                ok = False
+    return ok
+
+def main(argv: Optional[list] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark app import time and time-to-first-request")
+    parser.add_argument('--path', action='append', dest='paths', help="request to time (repeatable)")
+    parser.add_argument('--repeats', type=int, default=5)
+    parser.add_argument('--db-url', help="defaults to a temporary SQLite database")
+    parser.add_argument('--baseline', type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument('--threshold', type=float, default=0.2, help="allowed relative regression")
+    parser.add_argument('--update-baseline', action='store_true')
+    parser.add_argument('--output', type=Path, help="write this run's results as JSON")
+    args = parser.parse_args(argv)
+
+    db_url = args.db_url
+    if db_url is None:
+        db_url = f"sqlite:///{Path(tempfile.mkdtemp(prefix='gtd_startup_')) / 'startup.db'}"
+        os.environ['PSQL_URL'] = db_url
+        from sqlalchemy import create_engine
+        from app.db.psql.models import Base
+        Base.metadata.create_all(create_engine(db_url))
+    results = run(args.paths or ['/metrics', '/search?query=bomb&limit=1'], args.repeats, db_url)
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2, sort_keys=True))
+
+    if args.update_baseline or not args.baseline.exists():
+        args.baseline.write_text(json.dumps(results, indent=2, sort_keys=True))
+        print(f"Wrote baseline {args.baseline}")
+        return 0
+    return 0 if compare(results, json.loads(args.baseline.read_text()), args.threshold) else 1
+
+if __name__ == '__main__':
+    sys.exit(main())
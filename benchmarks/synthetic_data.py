@@ -0,0 +1,158 @@
+import argparse
+from pathlib import Path
+from typing import List, Optional
+import numpy as np
+import pandas as pd
+from app.db.psql.init_data import ATTACK_TYPE_MAPPING
+from app.utils.csv_reader import GTD_FILE, RAND_FILE
+
+WRITE_CHUNK_ROWS = 100_000
+
+REGIONS = [
+    'Middle East & North Africa', 'South Asia', 'Sub-Saharan Africa', 'South America',
+    'Western Europe', 'Southeast Asia', 'Central America & Caribbean', 'Eastern Europe',
+    'North America', 'East Asia', 'Central Asia', 'Australasia & Oceania'
+]
+ATTACK_TYPES = [
+    (1, 'Assassination'), (2, 'Armed Assault'), (3, 'Bombing/Explosion'),
+    (4, 'Hijacking'), (5, 'Hostage Taking (Barricade Incident)'),
+    (6, 'Hostage Taking (Kidnapping)'), (7, 'Facility/Infrastructure Attack'),
+    (8, 'Unarmed Assault'), (9, 'Unknown')
+]
+TARGET_TYPES = [
+    (1, 'Business'), (2, 'Government (General)'), (3, 'Police'), (4, 'Military'),
+    (5, 'Abortion Related'), (6, 'Airports & Aircraft'), (7, 'Government (Diplomatic)'),
+    (8, 'Educational Institution'), (9, 'Food or Water Supply'), (10, 'Journalists & Media'),
+    (11, 'Maritime'), (12, 'NGO'), (13, 'Other'), (14, 'Private Citizens & Property'),
+    (15, 'Religious Figures/Institutions'), (16, 'Telecommunication'),
+    (17, 'Terrorists/Non-State Militia'), (18, 'Tourists'), (19, 'Transportation'),
+    (20, 'Unknown'), (21, 'Utilities'), (22, 'Violent Political Party')
+]
+RAND_DATE_FORMATS = ['%d-%b-%y', '%d-%b-%Y', '%Y-%m-%d', '%m/%d/%Y']
+WORDS = np.array([
+    'explosive', 'device', 'detonated', 'near', 'market', 'assailants', 'opened', 'fire',
+    'on', 'police', 'checkpoint', 'convoy', 'attacked', 'village', 'kidnapped', 'workers',
+    'claimed', 'responsibility', 'no', 'group', 'suicide', 'bomber', 'targeted', 'officials'
+])
+
+def zipf_weights(size: int, exponent: float = 1.1) -> np.ndarray:
+    weights = 1.0 / np.arange(1, size + 1) ** exponent
+    return weights / weights.sum()
+
+class Vocabulary:
+    def __init__(self, rng: np.random.Generator, countries: int = 200, groups: int = 3500, cities_per_country: int = 60):
+        self.countries = np.array([f"Country {i}" for i in range(countries)])
+        self.country_regions = rng.choice(REGIONS, size=countries)
+        self.country_weights = zipf_weights(countries)
+        self.cities_per_country = cities_per_country
+        self.city_weights = zipf_weights(cities_per_country, 1.3)
+        self.country_centers = np.column_stack([rng.uniform(-40, 60, countries), rng.uniform(-120, 140, countries)])
+        self.groups = np.array(['Unknown'] + [f"Group {i}" for i in range(groups)])
+        group_weights = zipf_weights(groups, 1.2) * 0.55
+        self.group_weights = np.concatenate([[0.45], group_weights])
+
+def _summaries(rng: np.random.Generator, size: int) -> np.ndarray:
+    lengths = rng.integers(6, 30, size)
+    words = rng.choice(WORDS, size=int(lengths.sum()))
+    parts = np.split(words, np.cumsum(lengths)[:-1])
+    return np.array([" ".join(part).capitalize() + "." for part in parts], dtype=object)
+
+def _with_nans(rng: np.random.Generator, values: np.ndarray, share: float) -> np.ndarray:
+    values = values.astype(object) if values.dtype.kind in 'OU' else values.astype('float64')
+    values[rng.random(len(values)) < share] = None if values.dtype == object else np.nan
+    return values
+
+def gtd_chunk(rng: np.random.Generator, vocab: Vocabulary, size: int) -> pd.DataFrame:
+    country_idx = rng.choice(len(vocab.countries), size=size, p=vocab.country_weights)
+    city_idx = rng.choice(vocab.cities_per_country, size=size, p=vocab.city_weights)
+    centers = vocab.country_centers[country_idx]
+    attack = rng.choice(len(ATTACK_TYPES), size=size, p=zipf_weights(len(ATTACK_TYPES), 0.8))
+    target = rng.choice(len(TARGET_TYPES), size=size, p=zipf_weights(len(TARGET_TYPES), 0.9))
+    nkill = np.floor(rng.pareto(1.6, size))
+    nwound = np.floor(rng.pareto(1.3, size))
+    cities = np.char.add(np.char.add(vocab.countries[country_idx], ' City '), city_idx.astype(str)).astype(object)
+    cities[rng.random(size) < 0.03] = 'Unknown'
+    return pd.DataFrame({
+        'iyear': rng.integers(1970, 2018, size),
+        'imonth': np.where(rng.random(size) < 0.01, 0, rng.integers(1, 13, size)),
+        'iday': np.where(rng.random(size) < 0.02, 0, rng.integers(1, 29, size)),
+        'country_txt': vocab.countries[country_idx],
+        'region_txt': vocab.country_regions[country_idx],
+        'provstate': _with_nans(rng, np.char.add('Province ', (city_idx % 7).astype(str)), 0.1),
+        'city': cities,
+        'latitude': _with_nans(rng, centers[:, 0] + rng.normal(0, 2, size), 0.025),
+        'longitude': _with_nans(rng, centers[:, 1] + rng.normal(0, 2, size), 0.025),
+        'location': _with_nans(rng, np.full(size, 'Near the city center', dtype=object), 0.7),
+        'summary': _with_nans(rng, _summaries(rng, size), 0.4),
+        'success': (rng.random(size) < 0.89).astype(int),
+        'suicide': (rng.random(size) < 0.04).astype(int),
+        'attacktype1': [ATTACK_TYPES[i][0] for i in attack],
+        'attacktype1_txt': [ATTACK_TYPES[i][1] for i in attack],
+        'targtype1': [TARGET_TYPES[i][0] for i in target],
+        'targtype1_txt': [TARGET_TYPES[i][1] for i in target],
+        'gname': rng.choice(vocab.groups, size=size, p=vocab.group_weights),
+        'nkill': _with_nans(rng, nkill, 0.05),
+        'nkillus': _with_nans(rng, np.zeros(size), 0.3),
+        'nkillter': _with_nans(rng, np.floor(rng.pareto(3, size)), 0.4),
+        'nwound': _with_nans(rng, nwound, 0.08),
+        'nwoundus': _with_nans(rng, np.zeros(size), 0.3),
+        'nwoundte': _with_nans(rng, np.zeros(size), 0.4),
+        'property': rng.choice([1, 0, -9], size=size, p=[0.5, 0.4, 0.1]),
+        'propvalue': _with_nans(rng, rng.lognormal(8, 2, size).round(), 0.8),
+    })
+
+def rand_chunk(rng: np.random.Generator, vocab: Vocabulary, size: int) -> pd.DataFrame:
+    country_idx = rng.choice(len(vocab.countries), size=size, p=vocab.country_weights)
+    city_idx = rng.choice(vocab.cities_per_country, size=size, p=vocab.city_weights)
+    dates = pd.to_datetime('1968-01-01') + pd.to_timedelta(rng.integers(0, 15000, size), unit='D')
+    formats = rng.integers(0, len(RAND_DATE_FORMATS), size)
+    date_text = np.empty(size, dtype=object)
+    for i, fmt in enumerate(RAND_DATE_FORMATS):
+        mask = formats == i
+        date_text[mask] = dates[mask].strftime(fmt)
+    junk = rng.random(size)
+    date_text[junk < 0.01] = 'unknown'
+    date_text[(junk >= 0.01) & (junk < 0.02)] = None
+    weapons = np.array(list(ATTACK_TYPE_MAPPING) + ['Remote-detonated IED', 'Knife'])
+    fatalities = np.floor(rng.pareto(1.5, size)).astype(int).astype(str).astype(object)
+    fatalities[rng.random(size) < 0.05] = None
+    injuries = np.floor(rng.pareto(1.2, size)).astype(int).astype(str).astype(object)
+    injuries[rng.random(size) < 0.05] = 'N/A'
+    return pd.DataFrame({
+        'Date': date_text,
+        'City': np.char.add(np.char.add(vocab.countries[country_idx], ' City '), city_idx.astype(str)),
+        'Country': np.char.add(' ', vocab.countries[country_idx]),
+        'Perpetrator': _with_nans(rng, rng.choice(vocab.groups, size=size, p=vocab.group_weights), 0.05),
+        'Weapon': _with_nans(rng, rng.choice(weapons, size=size, p=zipf_weights(len(weapons), 0.7)), 0.05),
+        'Injuries': injuries,
+        'Fatalities': fatalities,
+        'Description': _with_nans(rng, _summaries(rng, size), 0.1),
+    })
+
+def _write(path: Path, chunks) -> int:
+    total = 0
+    for i, chunk in enumerate(chunks):
+        chunk.to_csv(path, mode='w' if i == 0 else 'a', header=i == 0, index=False, encoding='iso-8859-1')
+        total += len(chunk)
+    return total
+
+def _chunk_sizes(rows: int) -> List[int]:
+    return [min(WRITE_CHUNK_ROWS, rows - start) for start in range(0, rows, WRITE_CHUNK_ROWS)]
+
+def generate(output_dir: Path, gtd_rows: int, rand_rows: int, seed: Optional[int] = 8200) -> Path:
+    output_dir.mkdir(parents=True, exist_ok=True)
+    rng = np.random.default_rng(seed)
+    vocab = Vocabulary(rng)
+    gtd_total = _write(output_dir / GTD_FILE, (gtd_chunk(rng, vocab, size) for size in _chunk_sizes(gtd_rows)))
+    rand_total = _write(output_dir / RAND_FILE, (rand_chunk(rng, vocab, size) for size in _chunk_sizes(rand_rows)))
+    print(f"Wrote {gtd_total} GTD rows and {rand_total} RAND rows to {output_dir}")
+    return output_dir
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Generate synthetic GTD and RAND source files")
+    parser.add_argument('output_dir', type=Path)
+    parser.add_argument('--gtd-rows', type=int, default=200_000)
+    parser.add_argument('--rand-rows', type=int, default=40_000)
+    parser.add_argument('--seed', type=int, default=8200)
+    args = parser.parse_args()
+    generate(args.output_dir, args.gtd_rows, args.rand_rows, args.seed)
@@ -0,0 +1,68 @@
+import json
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Tuple
+import pytest
+
+# keep the tests away from whatever database a local .env points at
+os.environ['PSQL_URL'] = 'sqlite://'
+
+def send_json(handler: BaseHTTPRequestHandler, status: int, body, elastic: bool = False):
+    payload = json.dumps(body).encode()
+    handler.send_response(status)
+    handler.send_header('Content-Type', 'application/json')
+    if elastic:
+        handler.send_header('X-Elastic-Product', 'Elasticsearch')
+    handler.send_header('Content-Length', str(len(payload)))
+    handler.end_headers()
+    handler.wfile.write(payload)
+
+class ElasticStandIn(BaseHTTPRequestHandler):
+    """Answers the handful of Elasticsearch calls the services make and keeps bulk documents in `docs`."""
+    docs = {}
+    bulk_items: Callable = None
+
+    def log_message(self, *args):
+        pass
+
+    def _body(self) -> str:
+        return self.rfile.read(int(self.headers.get('Content-Length', 0))).decode()
+
+    def do_GET(self):
+        send_json(self, 200, {'version': {'number': '8.10.0'}, 'tagline': 'You Know, for Search'}, elastic=True)
+
+    def do_HEAD(self):
+        self.send_response(200)
+        self.send_header('X-Elastic-Product', 'Elasticsearch')
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def do_PUT(self):
+        body = self._body()
+        if '_bulk' not in self.path:
+            return send_json(self, 200, {'acknowledged': True}, elastic=True)
+        lines = [line for line in body.split('\n') if line]
+        actions = [(json.loads(action)['index'], json.loads(doc)) for action, doc in zip(lines[::2], lines[1::2])]
+        items = type(self).bulk_items(actions) if type(self).bulk_items else None
+        if items is None:
+            items = [{'index': {'_id': meta.get('_id'), 'status': 201}} for meta, _ in actions]
+        for (meta, doc), item in zip(actions, items):
+            if item['index']['status'] < 300:
+                self.docs[str(meta.get('_id'))] = doc
+        send_json(self, 200, {'errors': any(i['index']['status'] >= 300 for i in items), 'items': items, 'took': 1}, elastic=True)
+
+    do_POST = do_PUT
+
+def serve(handler) -> Tuple[ThreadingHTTPServer, str]:
+    server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/"
+
+@pytest.fixture
+def elastic_standin():
+    handler = type('Elastic', (ElasticStandIn,), {'docs': {}, 'bulk_items': None})
+    server, url = serve(handler)
+    yield handler, url
+    server.shutdown()
+    server.server_close()
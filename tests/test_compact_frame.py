@@ -0,0 +1,21 @@
+import pandas as pd
+from app.db.psql.fingerprint import add_fingerprints
+from app.utils.compact_frame import compact_event_frame
+
+def _events(latitude: float) -> pd.DataFrame:
+    return pd.DataFrame({
+        'source_db': ['GTD'], 'iyear': [2001], 'latitude': [latitude], 'longitude': [44.361488],
+        'nkill': [3.0], 'nwound': [None]
+    })
+
+def test_compaction_keeps_coordinates_in_double_precision():
+    compact = compact_event_frame(_events(33.31234567))
+    assert compact['latitude'].dtype == 'float64' and compact['longitude'].dtype == 'float64'
+    assert compact['latitude'].iloc[0] == 33.31234567
+    assert compact['nkill'].dtype == 'float32'
+
+def test_fingerprint_sees_sub_float32_coordinate_changes():
+    # these two latitudes collapse to the same float32 value
+    before, after = add_fingerprints(_events(33.31234567)), add_fingerprints(_events(33.31234568))
+    assert before['source_key'].iloc[0] == after['source_key'].iloc[0]
+    assert before['fingerprint'].iloc[0] != after['fingerprint'].iloc[0]
@@ -0,0 +1,13 @@
+import pandas as pd
+from app.db.psql.dedup import candidate_pairs
+
+def test_candidate_pairs_accept_nullable_dates():
+    df = pd.DataFrame({
+        'source_db': ['GTD', 'RAND', 'RAND'],
+        'country_txt': ['Iraq', 'Iraq', 'Iraq'],
+        'iyear': pd.array([2010, 2010, pd.NA], dtype='Int16'),
+        'imonth': pd.array([5, 5, 5], dtype='Int8'),
+        'iday': pd.array([3, 4, pd.NA], dtype='Int8')
+    })
+    pairs = candidate_pairs(df)
+    assert list(zip(pairs['gtd'], pairs['rand'])) == [(0, 1)]
@@ -0,0 +1,122 @@
+import time
+from collections import Counter
+from types import SimpleNamespace
+import pytest
+from elasticsearch import Elasticsearch
+from sqlalchemy import insert, select
+from app.db.elastic import elastic_connect
+from app.db.elastic.config import settings
+from app.db.psql import database
+from app.db.psql.checkpoints import ELASTIC_STAGE
+from app.db.psql.models import (
+    AttackType, Base, City, Country, Event, Location, Region, SeedCheckpoint, SeedDeadLetter, TerroristGroup
+)
+from app.service import sql_to_elastic_service
+from app.service.sql_to_elastic_service import transfer_data_to_elastic
+
+ALWAYS_THROTTLED, THROTTLED_TWICE, REJECTED, UNDATED = '5', '7', '9', '12'
+
+@pytest.fixture
+def transfer(tmp_path, monkeypatch, elastic_standin):
+    handler, es_url = elastic_standin
+    attempts = Counter()
+
+    def bulk_items(actions):
+        items = []
+        for meta, _ in actions:
+            doc_id = str(meta['_id'])
+            attempts[doc_id] += 1
+            status = 201
+            if doc_id == ALWAYS_THROTTLED or (doc_id == THROTTLED_TWICE and attempts[doc_id] <= 2):
+                status = 429
+            elif doc_id == REJECTED:
+                status = 400
+            item = {'_id': doc_id, 'status': status}
+            if status >= 300:
+                item['error'] = {'type': 'es_rejected_execution_exception' if status == 429 else 'mapper_parsing_exception'}
+            items.append({'index': item})
+        return items
+
+    handler.bulk_items = staticmethod(bulk_items)
+    sleeps = []
+    monkeypatch.setattr(sql_to_elastic_service, 'time', SimpleNamespace(sleep=sleeps.append, perf_counter=time.perf_counter))
+    for name, value in {
+        'ES_BULK_THREADS': 1, 'ES_BULK_CHUNK_SIZE': 4, 'ES_BULK_MAX_RETRIES': 3,
+        'ES_BULK_INITIAL_BACKOFF': 1.0, 'ES_BULK_MAX_BACKOFF': 2.5,
+        'PSQL_URL': f"sqlite:///{tmp_path / 'transfer.db'}"
+    }.items():
+        monkeypatch.setattr(settings, name, value)
+    client = Elasticsearch(es_url)
+    monkeypatch.setattr(elastic_connect, '_client', client)
+    database.reset_engine()
+    engine = database.get_engine()
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(insert(Region.__table__), [{'id': 1, 'name': 'Middle East'}])
+        conn.execute(insert(Country.__table__), [{'id': 1, 'name': 'Iraq', 'region_id': 1}])
+        conn.execute(insert(City.__table__), [{'id': 1, 'name': 'Baghdad', 'province': 'Baghdad', 'country_id': 1}])
+        conn.execute(insert(Location.__table__), [
+            {'id': 1, 'latitude': 33.3, 'longitude': 44.4, 'city_id': 1, 'country_id': 1, 'region_id': 1}
+        ])
+        conn.execute(insert(AttackType.__table__), [{'id': 1, 'name': 'Bombing/Explosion'}])
+        conn.execute(insert(TerroristGroup.__table__), [{'id': 1, 'group_name': 'ISIL'}])
+        conn.execute(insert(Event.__table__), [
+            {
+                'id': i,
+                'year': None if str(i) == UNDATED else 2010,
+                'month': 2,
+                'day': 31,
+                'summary': f'Event {i}',
+                'attack_type_id': 1,
+                'group_id': 1,
+                'location_id': 1,
+                'source_db': 'RAND' if i % 2 else 'GTD'
+            }
+            for i in range(1, 13)
+        ])
+    yield SimpleNamespace(handler=handler, attempts=attempts, sleeps=sleeps, engine=engine)
+    client.close()
+    database.reset_engine()
+
+def test_item_level_throttling_is_retried_with_capped_backoff(transfer):
+    stats = transfer_data_to_elastic('terror-test')
+
+    assert stats == {'indexed': 9, 'failed': 2, 'skipped': 1, 'retried': 5}
+    assert transfer.attempts[ALWAYS_THROTTLED] == settings.ES_BULK_MAX_RETRIES + 1
+    assert transfer.attempts[THROTTLED_TWICE] == 3
+    assert transfer.attempts[REJECTED] == 1 and transfer.attempts['1'] == 1
+    assert transfer.sleeps == [1.0, 2.0, 2.5]
+    assert UNDATED not in transfer.attempts
+
+def test_failed_documents_are_dead_lettered_and_the_window_checkpointed(transfer):
+    transfer_data_to_elastic('terror-test')
+
+    with transfer.engine.connect() as conn:
+        letters = {
+            row.source_offset: row.error
+            for row in conn.execute(select(SeedDeadLetter.__table__).where(SeedDeadLetter.stage == ELASTIC_STAGE))
+        }
+        checkpoints = conn.execute(select(SeedCheckpoint.__table__)).all()
+    assert set(letters) == {int(ALWAYS_THROTTLED), int(REJECTED)}
+    assert letters[int(ALWAYS_THROTTLED)] == 'Throttled after retries'
+    assert 'mapper_parsing_exception' in letters[int(REJECTED)]
+    assert [(c.stage, c.target, c.first_offset, c.last_offset, c.rows) for c in checkpoints] == [
+        (ELASTIC_STAGE, 'terror-test', 1, 11, 11)
+    ]
+
+def test_indexed_documents_follow_the_terror_event_shape(transfer):
+    transfer_data_to_elastic('terror-test')
+
+    assert set(transfer.handler.docs) == {str(i) for i in range(1, 12)} - {ALWAYS_THROTTLED, REJECTED}
+    assert transfer.handler.docs[THROTTLED_TWICE] == {
+        'title': 'Bombing/Explosion in Baghdad, Iraq by ISIL',
+        'content': 'Event 7',
+        # day 31 does not exist in February, so the date falls back to the first
+        'publication_date': '2010-02-01T00:00:00',
+        'category': 'historic_terror',
+        'location': 'Baghdad, Iraq',
+        'confidence': 1.0,
+        'source_url': 'historic_dataset_2',
+        'coordinates': {'lat': 33.3, 'lon': 44.4}
+    }
+    assert transfer.handler.docs['2']['source_url'] == 'historic_dataset'
@@ -0,0 +1,100 @@
+import csv
+import io
+import json
+import pytest
+from sqlalchemy import insert
+from app.db.elastic.config import settings
+from app.db.psql import database
+from app.db.psql.models import (
+    AttackType, Base, Casualties, City, Country, Event, Location, Region, TargetType, TerroristGroup
+)
+from app.service.export_service import EXPORT_COLUMNS, ExportFilters, export_events, row_batches
+
+EVENTS = 50
+
+@pytest.fixture
+def events_db(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, 'PSQL_URL', f"sqlite:///{tmp_path / 'export.db'}")
+    database.reset_engine()
+    engine = database.get_engine()
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(insert(Region.__table__), [{'id': 1, 'name': 'Middle East'}])
+        conn.execute(insert(Country.__table__), [
+            {'id': 1, 'name': 'Iraq', 'region_id': 1}, {'id': 2, 'name': 'Syria', 'region_id': 1}
+        ])
+        conn.execute(insert(City.__table__), [{'id': 1, 'name': 'Baghdad', 'province': 'Baghdad', 'country_id': 1}])
+        conn.execute(insert(Location.__table__), [
+            {'id': 1, 'latitude': 33.3, 'longitude': 44.4, 'city_id': 1, 'country_id': 1, 'region_id': 1},
+            {'id': 2, 'latitude': None, 'longitude': None, 'city_id': None, 'country_id': 2, 'region_id': 1}
+        ])
+        conn.execute(insert(AttackType.__table__), [{'id': 1, 'name': 'Bombing/Explosion'}])
+        conn.execute(insert(TargetType.__table__), [{'id': 1, 'name': 'Police'}])
+        conn.execute(insert(TerroristGroup.__table__), [{'id': 1, 'group_name': 'ISIL'}])
+        conn.execute(insert(Casualties.__table__), [{'id': 1, 'killed': 4, 'wounded': 2, 'property_damage': True}])
+        conn.execute(insert(Event.__table__), [
+            {
+                'id': i + 1,
+                'year': 2000 + i % 10,
+                'month': 1,
+                'day': 1,
+                'summary': f'Attack, "number" {i}',
+                'success': True,
+                'attack_type_id': 1,
+                'target_type_id': 1,
+                'group_id': 1 if i % 2 else None,
+                'location_id': 1 if i % 5 else 2,
+                # the compact layout keeps casualties on the event row itself
+                'casualties_id': 1 if i % 3 else None,
+                'killed': None if i % 3 else i,
+                'source_db': 'RAND' if i % 4 == 0 else 'GTD'
+            }
+            for i in range(EVENTS)
+        ])
+    yield engine
+    database.reset_engine()
+
+def test_row_batches_stream_in_fixed_size_partitions(events_db):
+    sizes = [len(rows) for rows in row_batches(ExportFilters(), batch_size=16)]
+    assert sizes == [16, 16, 16, 2]
+
+def test_ndjson_export_flattens_the_joined_view(events_db):
+    lines = b''.join(export_events(ExportFilters(), 'ndjson', batch_size=7)).decode().splitlines()
+    rows = [json.loads(line) for line in lines]
+    assert [row['event_id'] for row in rows] == list(range(1, EVENTS + 1))
+    assert list(rows[1]) == EXPORT_COLUMNS
+    assert rows[1] == {
+        **rows[1],
+        'city': 'Baghdad', 'country': 'Iraq', 'region': 'Middle East', 'group_name': 'ISIL',
+        'attack_type': 'Bombing/Explosion', 'target_type': 'Police', 'killed': 4, 'wounded': 2, 'latitude': 33.3
+    }
+    assert rows[3]['killed'] == 3 and rows[3]['wounded'] is None
+    assert rows[0]['country'] == 'Syria' and rows[0]['city'] is None
+
+def test_filters_apply_to_every_format(events_db):
+    filters = ExportFilters(year_from=2002, year_to=2004, country='Iraq', group='ISIL', source_db='GTD')
+    expected = [
+        i + 1 for i in range(EVENTS)
+        if 2002 <= 2000 + i % 10 <= 2004 and i % 5 and i % 2 and i % 4
+    ]
+    rows = list(csv.DictReader(io.StringIO(b''.join(export_events(filters, 'csv')).decode())))
+    assert [int(row['event_id']) for row in rows] == expected
+    assert rows[0]['summary'].startswith('Attack, "number"')
+
+    pq = pytest.importorskip('pyarrow.parquet')
+    data = b''.join(export_events(filters, 'parquet', batch_size=2))
+    parquet = pq.ParquetFile(io.BytesIO(data))
+    assert parquet.metadata.num_row_groups == (len(expected) + 1) // 2
+    assert parquet.read().column('event_id').to_pylist() == expected
+
+def test_export_endpoint_streams_and_validates(events_db, monkeypatch):
+    monkeypatch.setattr(settings, 'NEWS_SCHEDULER_ENABLED', False)
+    from app.main import app
+    client = app.test_client()
+    response = client.get('/export?format=csv&country=Syria')
+    assert response.status_code == 200
+    assert response.mimetype == 'text/csv'
+    assert 'events.csv' in response.headers['Content-Disposition']
+    assert len(response.data.decode().splitlines()) == 1 + EVENTS // 5
+    assert client.get('/export?format=xml').status_code == 400
+    assert client.get('/export?year_from=last').status_code == 400
@@ -0,0 +1,78 @@
+import time
+import pytest
+from sqlalchemy import create_engine, insert
+from app.db.elastic.config import settings
+from app.db.elastic.models import NewsCategory, NewsClassification
+from app.db.elastic.models.elastic_models import Coordinates
+from app.db.psql.models import Base, City, Country, Location
+from app.service import news_memo_service as memo
+from app.utils.memo_store import MISSING, MemoStore
+from app.utils.metrics import metrics
+
+@pytest.fixture
+def memo_path(tmp_path, monkeypatch):
+    path = tmp_path / 'memo.sqlite'
+    monkeypatch.setattr(settings, 'NEWS_MEMO_PATH', str(path))
+    memo.reset_memos()
+    yield path
+    memo.reset_memos()
+
+def test_store_reads_through_to_disk_and_expires(tmp_path):
+    store = MemoStore('test', tmp_path / 'memo.sqlite', memory_size=2, ttl=0.5, negative_ttl=0.2, max_rows=100)
+    store.put('a', {'x': 1})
+    store.put('missing-place', None)
+    other = MemoStore('test', tmp_path / 'memo.sqlite', memory_size=2, ttl=0.5, negative_ttl=0.2, max_rows=100)
+    disk_hits = metrics.get('memo_lookups_total', cache='test', result='disk')
+    assert other.get('a') == {'x': 1}
+    assert other.get('missing-place') is None
+    assert other.get('b') is MISSING
+    assert metrics.get('memo_lookups_total', cache='test', result='disk') == disk_hits + 2
+    time.sleep(0.3)
+    assert other.get('missing-place') is MISSING
+    assert store.get('missing-place') is MISSING
+    time.sleep(0.3)
+    assert other.get('a') is MISSING
+
+def test_store_prunes_past_its_row_budget(tmp_path):
+    store = MemoStore('test', tmp_path / 'memo.sqlite', memory_size=10, ttl=60, negative_ttl=60, max_rows=5)
+    store.put_many((f"k{i}", i) for i in range(20))
+    store.prune()
+    assert len(store) == 5
+    assert store.get_many([f"k{i}" for i in range(15, 20)]) == {f"k{i}": i for i in range(15, 20)}
+
+def test_classification_key_ignores_formatting():
+    assert memo.classification_key('Bombing in  Kabul!', 'Text') == memo.classification_key('bombing in kabul', ' text ')
+    assert memo.classification_key('Bombing in Kabul', 'Text') != memo.classification_key('Bombing in Herat', 'Text')
+
+def test_geocode_uses_warmed_places_and_caches_misses(memo_path):
+    engine = create_engine('sqlite://')
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(insert(Country.__table__), [{'id': 1, 'name': 'Afghanistan'}, {'id': 2, 'name': 'Iraq'}])
+        conn.execute(insert(City.__table__), [
+            {'id': 1, 'name': 'Kabul', 'country_id': 1},
+            {'id': 2, 'name': 'Baghdad', 'country_id': 2},
+            {'id': 3, 'name': 'Unknown', 'country_id': 2}
+        ])
+        conn.execute(insert(Location.__table__), [
+            {'latitude': 34.5, 'longitude': 69.2, 'city_id': 1, 'country_id': 1},
+            {'latitude': 34.6, 'longitude': 69.1, 'city_id': 1, 'country_id': 1},
+            {'latitude': 33.3, 'longitude': 44.4, 'city_id': 2, 'country_id': 2},
+            {'latitude': 30.0, 'longitude': 47.0, 'city_id': 3, 'country_id': 2}
+        ])
+    assert memo.warm_place_memo(engine) == 6
+    kabul = memo.geocode('Kabul, Kabul Province, Afghanistan')
+    assert kabul.latitude == pytest.approx(34.55)
+    assert memo.geocode('BAGHDAD') == Coordinates(latitude=33.3, longitude=44.4)
+    assert memo.geocode('Unknown') is None
+
+    unresolved = metrics.get('geocode_unresolved_total')
+    assert memo.geocode('Atlantis, Nowhere') is None
+    assert memo.geocode('Atlantis, Nowhere') is None
+    assert metrics.get('geocode_unresolved_total') == unresolved + 1
+
+def test_classifier_coordinates_are_remembered_for_the_place(memo_path):
+    located = NewsClassification(NewsCategory.TERROR_EVENT, 'Mosul, Iraq', 0.9, Coordinates(36.3, 43.1))
+    assert memo.resolve_coordinates(located) is located
+    unlocated = NewsClassification(NewsCategory.TERROR_EVENT, 'mosul, iraq', 0.7)
+    assert memo.resolve_coordinates(unlocated).coordinates == Coordinates(36.3, 43.1)
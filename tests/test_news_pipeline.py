@@ -0,0 +1,208 @@
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler
+import pytest
+from elasticsearch import Elasticsearch
+from app.db.elastic import elastic_connect
+from app.db.elastic.config import settings
+from app.service import news_memo_service
+from app.service import news_pipeline_service as news
+from tests.conftest import send_json, serve
+
+ARTICLES_PER_PAGE = 12
+
+class NewsStandIn(BaseHTTPRequestHandler):
+    pages = 2
+    date_time = '2026-10-16T10:00:00Z'
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        request = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        page = request['articlesPage']
+        if page > self.pages:
+            return send_json(self, 200, {'articles': {'results': []}})
+        results = [
+            {
+                'uri': f"a{(page - 1) * ARTICLES_PER_PAGE + i}",
+                'title': f"Bombing in city {page}-{i}" if i % 2 else f"Football match {page}-{i}",
+                'body': 'text ' * 20,
+                'url': f"http://news/{page}/{i}",
+                'dateTime': self.date_time
+            }
+            for i in range(ARTICLES_PER_PAGE)
+        ]
+        # the same story again, as the news API does across pages
+        results.append(dict(results[1], uri='a1', url='http://news/1/1', title='Bombing in city 1-1'))
+        send_json(self, 200, {'articles': {'results': results}})
+
+class ClassifierStandIn(BaseHTTPRequestHandler):
+    calls = 0
+    batches = []
+    peak = 0
+    running = 0
+    throttle_calls = {2}
+    delay = 0.05
+    lock = threading.Lock()
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        request = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        cls = type(self)
+        with cls.lock:
+            cls.calls += 1
+            call = cls.calls
+            cls.running += 1
+            cls.peak = max(cls.peak, cls.running)
+        try:
+            if call in cls.throttle_calls:
+                return send_json(self, 429, {'error': 'rate limited'})
+            time.sleep(cls.delay)
+            titles = [line for line in request['messages'][1]['content'].split('\n') if line.startswith('[')]
+            cls.batches.append(len(titles))
+            send_json(self, 200, {'choices': [{'message': {'content': json.dumps({'articles': [
+                {
+                    'index': int(title[1:title.index(']')]),
+                    'category': 'terror_event' if 'Bombing' in title else 'general_news',
+                    'location': 'Kabul, Afghanistan',
+                    'confidence': 0.8,
+                    'latitude': 34.5,
+                    'longitude': 69.2
+                }
+                for title in titles
+            ]})}}]})
+        finally:
+            with cls.lock:
+                cls.running -= 1
+
+@pytest.fixture
+def standins(elastic_standin, monkeypatch, tmp_path):
+    news_handler = type('News', (NewsStandIn,), {})
+    classifier = type('Classifier', (ClassifierStandIn,), {'batches': [], 'lock': threading.Lock()})
+    servers = []
+    for handler, setting in ((news_handler, 'NEWS_API_URL'), (classifier, 'GROQ_API_URL')):
+        server, url = serve(handler)
+        servers.append(server)
+        monkeypatch.setattr(settings, setting, url)
+    elastic, es_url = elastic_standin
+    client = Elasticsearch(es_url)
+    monkeypatch.setattr(elastic_connect, '_client', client)
+    for name, value in (
+            ('NEWS_API_KEY', 'news-key'), ('GROQ_API_KEY', 'groq-key'), ('NEWS_FETCH_PAGES', 3),
+            ('NEWS_CLASSIFY_BATCH_SIZE', 4), ('NEWS_CLASSIFY_CONCURRENCY', 3), ('NEWS_QUEUE_SIZE', 5),
+            ('NEWS_HTTP_BACKOFF', 0.01), ('NEWS_CYCLE_BUDGET_SECONDS', 30), ('INIT_STATE_DIR', str(tmp_path)),
+            ('NEWS_MEMO_PATH', str(tmp_path / 'memo.sqlite'))
+    ):
+        monkeypatch.setattr(settings, name, value)
+    news_memo_service.reset_memos()
+    news._seen_articles.clear()
+    news._deferred_articles.clear()
+    yield news_handler, classifier, elastic
+    news_memo_service.reset_memos()
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+def run_cycle(budget=None) -> news.NewsCycleReport:
+    async def cycle():
+        async with news.client_session() as session:
+            return await asyncio.wait_for(news.run_cycle(session, budget), timeout=20)
+    return asyncio.run(cycle())
+
+def test_cycle_classifies_in_batches_and_indexes(standins):
+    _, classifier, elastic = standins
+    report = run_cycle()
+    assert report.fetched == 2 * ARTICLES_PER_PAGE
+    assert report.duplicates == 2
+    assert report.classified == report.indexed == 2 * ARTICLES_PER_PAGE
+    assert report.failed == 0
+    assert max(classifier.batches) <= settings.NEWS_CLASSIFY_BATCH_SIZE
+    assert 1 < classifier.peak <= settings.NEWS_CLASSIFY_CONCURRENCY
+    # the throttled request was retried rather than failing its batch
+    assert sum(classifier.batches) == 2 * ARTICLES_PER_PAGE
+    doc = elastic.docs['a1']
+    assert doc['category'] == 'terror_event'
+    assert doc['location'] == 'Kabul, Afghanistan'
+    assert doc['coordinates'] == {'lat': 34.5, 'lon': 69.2}
+    assert doc['source_url'] == 'http://news/1/1'
+    assert doc['publication_date'].startswith('2026-10-16T10:00:00')
+    assert elastic.docs['a0']['category'] == 'general_news'
+
+def test_second_cycle_skips_indexed_articles(standins):
+    _, classifier, _ = standins
+    run_cycle()
+    calls = classifier.calls
+    report = run_cycle()
+    assert report.fetched == 0
+    assert report.duplicates == 2 * ARTICLES_PER_PAGE + 2
+    assert classifier.calls == calls
+
+def test_more_classifiers_than_articles_finishes(standins, monkeypatch):
+    news_handler, _, _ = standins
+    monkeypatch.setattr(news_handler, 'pages', 1)
+    monkeypatch.setattr(settings, 'NEWS_CLASSIFY_CONCURRENCY', 8)
+    monkeypatch.setattr(settings, 'NEWS_QUEUE_SIZE', 50)
+    report = run_cycle()
+    assert report.indexed == ARTICLES_PER_PAGE
+
+def test_unparseable_dates_do_not_stall_the_cycle(standins, monkeypatch):
+    news_handler, _, elastic = standins
+    monkeypatch.setattr(news_handler, 'date_time', 1760608800)
+    report = run_cycle()
+    assert report.indexed == 2 * ARTICLES_PER_PAGE
+    assert elastic.docs['a0']['publication_date']
+
+def test_classifier_outage_fails_batches_without_hanging(standins, monkeypatch):
+    _, classifier, elastic = standins
+    monkeypatch.setattr(classifier, 'throttle_calls', set(range(1, 1000)))
+    monkeypatch.setattr(settings, 'NEWS_HTTP_RETRIES', 1)
+    report = run_cycle()
+    assert report.failed == 2 * ARTICLES_PER_PAGE
+    assert report.indexed == 0
+    assert not elastic.docs
+
+def test_deferred_articles_are_classified_next_cycle(standins, monkeypatch):
+    _, classifier, elastic = standins
+    monkeypatch.setattr(classifier, 'delay', 0.3)
+    first = run_cycle(budget=0.5)
+    assert first.deferred > 0
+    assert len(news._deferred_articles) == first.deferred
+    monkeypatch.setattr(classifier, 'delay', 0.0)
+    second = run_cycle()
+    assert not news._deferred_articles
+    assert len(elastic.docs) == 2 * ARTICLES_PER_PAGE
+    assert first.indexed + second.indexed == 2 * ARTICLES_PER_PAGE
+
+def test_scheduler_lock_is_exclusive_across_processes(tmp_path, monkeypatch):
+    import subprocess
+    import sys
+    lock_file = tmp_path / 'news_scheduler.lock'
+    monkeypatch.setattr(news, '_scheduler_lock', None)
+    assert news.acquire_scheduler_lock(lock_file)
+    try:
+        other = subprocess.run([
+            sys.executable, '-c',
+            'import sys; from pathlib import Path; from app.service import news_pipeline_service as n; '
+            f'sys.exit(0 if n.acquire_scheduler_lock(Path({str(lock_file)!r})) else 3)'
+        ], capture_output=True, text=True)
+        assert other.returncode == 3, other.stderr
+    finally:
+        news._scheduler_lock.close()
+
+def test_syndicated_copies_reuse_the_memoized_classification(standins):
+    _, classifier, elastic = standins
+    run_cycle()
+    calls = classifier.calls
+    # a fresh process-level view of "seen" articles, but the memo on disk survives
+    news._seen_articles.clear()
+    elastic.docs.clear()
+    news_memo_service.reset_memos()
+    report = run_cycle()
+    assert report.indexed == 2 * ARTICLES_PER_PAGE
+    assert classifier.calls == calls
+    assert elastic.docs['a1']['coordinates'] == {'lat': 34.5, 'lon': 69.2}
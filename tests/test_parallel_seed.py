@@ -0,0 +1,37 @@
+import pytest
+from sqlalchemy import select
+from app.db.elastic.config import settings
+from app.db.psql import database
+from app.db.psql.checkpoints import POSTGRES_STAGE
+from app.db.psql.init_data import standardize_data
+from app.db.psql.models import Base, SeedCheckpoint, SeedDeadLetter
+from app.db.psql.parallel_seed import seed_database_parallel
+import app.utils.csv_reader as csv_reader
+from benchmarks.synthetic_data import generate
+
+@pytest.fixture
+def merged(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, 'PSQL_URL', f"sqlite:///{tmp_path / 'parallel.db'}")
+    monkeypatch.setattr(csv_reader, 'BASE_PATH', generate(tmp_path / 'data', 300, 100))
+    database.reset_engine()
+    Base.metadata.create_all(database.get_engine())
+    df_gtd, df_rand = csv_reader.read_and_process_files()
+    yield standardize_data(df_gtd, df_rand)
+    database.reset_engine()
+
+def test_parallel_seed_reports_final_progress_and_dead_letters_per_batch(merged):
+    # rows without a target type never become facts; each must be dead-lettered with its own batch
+    unresolved = [3, 120, 121, 399]
+    merged.loc[unresolved, 'targtype1_txt'] = None
+    calls = []
+    report = seed_database_parallel(merged, workers=2, batch_size=50, progress=lambda *args: calls.append(args))
+
+    assert report.inserted == len(merged) - len(unresolved)
+    assert calls[-1] == (len(merged), len(merged))
+    with database.get_engine().connect() as conn:
+        letters = conn.execute(
+            select(SeedDeadLetter.source_offset).where(SeedDeadLetter.stage == POSTGRES_STAGE)
+        ).scalars().all()
+        checkpoints = conn.execute(select(SeedCheckpoint.first_offset, SeedCheckpoint.last_offset)).all()
+    assert sorted(letters) == unresolved
+    assert sum(last - first + 1 for first, last in checkpoints) == len(merged)
@@ -0,0 +1,44 @@
+import json
+import time
+import pytest
+from sqlalchemy import insert
+from app.db.elastic.config import settings
+from app.db.elastic.models import SearchParams
+from app.db.psql import database
+from app.db.psql.models import Base, Event
+from app.service.psql_search_service import search_events
+from app.utils.metrics import metrics
+
+@pytest.fixture
+def search_db(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, 'PSQL_URL', f"sqlite:///{tmp_path / 'search.db'}")
+    monkeypatch.setattr(settings, 'NEWS_SCHEDULER_ENABLED', False)
+    database.reset_engine()
+    engine = database.get_engine()
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(insert(Event.__table__), [
+            {'id': i, 'year': 2000 + i, 'month': 1, 'day': 1, 'summary': f'bomb attack {i}', 'source_db': 'GTD'}
+            for i in range(1, 11)
+        ])
+    yield engine
+    database.reset_engine()
+
+def test_search_rejects_unparseable_dates(search_db):
+    from app.main import app
+    client = app.test_client()
+    for query in ('start_date=yesterday', 'end_date=2005-13-01', 'cursor=last'):
+        response = client.get(f'/search?query=bomb&{query}')
+        assert response.status_code == 400, query
+        assert response.json['status'] == 'error'
+
+    lines = client.get('/search?query=bomb&start_date=2004-01-01&end_date=2006-06-30').data.decode().splitlines()
+    assert [json.loads(line)['id'] for line in lines[:-1]] == [6, 5, 4]
+
+def test_search_time_excludes_the_time_spent_streaming(search_db, monkeypatch):
+    monkeypatch.setattr(settings, 'SEARCH_SLOW_QUERY_MS', 10_000)
+    before = metrics.get('search_seconds_total')
+    for _ in search_events(SearchParams(query='bomb', limit=5)):
+        # a slow client reading the response must not show up as a slow query
+        time.sleep(0.1)
+    assert metrics.get('search_seconds_total') - before < 0.3
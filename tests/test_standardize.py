@@ -0,0 +1,37 @@
+import numpy as np
+import pandas as pd
+from app.db.psql.init_data import COMMON_COLUMNS, standardize_data, standardize_gtd, standardize_rand
+
+def _sources():
+    df_gtd = pd.DataFrame({
+        'iyear': [2001, 2002], 'country_txt': ['Iraq', None], 'attacktype1_txt': ['Bombing/Explosion', None],
+        'attacktype1': [3, 9], 'propvalue': [1500.0, np.nan]
+    }, index=[10, 11])
+    df_rand = pd.DataFrame({
+        'iyear': [1999, 2000, 2001], 'source_db': ['RAND'] * 3,
+        'weaptype1_txt': ['Firearms', 'Remote-detonated IED', None]
+    }, index=[5, 6, 7])
+    return df_gtd, df_rand
+
+def test_standardize_leaves_inputs_untouched():
+    df_gtd, df_rand = _sources()
+    before = df_gtd.copy(), df_rand.copy()
+    standardize_gtd(df_gtd)
+    standardize_rand(df_rand)
+    standardize_data(df_gtd, df_rand)
+    pd.testing.assert_frame_equal(df_gtd, before[0])
+    pd.testing.assert_frame_equal(df_rand, before[1])
+
+def test_standardize_maps_weapons_and_fills_plan_defaults():
+    df_gtd, df_rand = _sources()
+    rand = standardize_rand(df_rand)
+    assert list(rand.columns) == COMMON_COLUMNS and list(rand.index) == [5, 6, 7]
+    assert list(rand['standardized_attack_type']) == ['Armed Assault', 'Unknown', 'Unknown']
+    assert list(rand['attack_type_id']) == [2, 9, 9]
+    assert set(rand['targtype1']) == {14} and rand['propvalue'].isna().all()
+
+    merged = standardize_data(df_gtd, df_rand)
+    assert list(merged['source_db']) == ['GTD', 'GTD', 'RAND', 'RAND', 'RAND']
+    assert list(merged['country_txt']) == ['Iraq'] + ['Unknown'] * 4
+    assert merged['propvalue'].dtype == np.float64
+    assert list(merged.index) == list(range(5))